@@ -0,0 +1,92 @@
+"""Bulk sync of IQ Option ACTIVES opcodes into the active_options table."""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import logging
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import literal_column
+from sqlalchemy.dialects.postgresql import insert
+
+from src.servicios.models import ActiveOption
+
+logger = logging.getLogger(__name__)
+
+# Hash of the last opcode map written by this process
+_last_synced_hash: Optional[str] = None
+_sync_lock = Lock()
+
+
+def opcode_map_hash(actives_opcode: Dict[Any, Any]) -> str:
+    """Stable hash of a ``get_all_ACTIVES_OPCODE()`` map, independent of key order."""
+    payload = json.dumps({str(k): v for k, v in actives_opcode.items()}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _rows(actives_opcode: Dict[Any, Any], now: datetime.datetime) -> List[Dict[str, Any]]:
+    # Keyed by the stored opcode: one statement cannot touch the same row twice
+    rows = {
+        str(opcode): {
+            "opcode": str(opcode),
+            "name": str(opcode_data) if opcode_data else None,
+            "is_enabled": True,
+            "last_updated": now,
+            "created_at": now,
+        }
+        for opcode, opcode_data in actives_opcode.items()
+    }
+    return list(rows.values())
+
+
+def upsert_statement(actives_opcode: Dict[Any, Any], now: Optional[datetime.datetime] = None):
+    """
+    ``INSERT ... ON CONFLICT (opcode) DO UPDATE`` for every opcode of the map.
+
+    New opcodes are inserted; existing ones are re-enabled and get a new
+    ``last_updated`` (their name is left as is). Each returned row tells
+    whether it was inserted (``xmax = 0``) or updated.
+    """
+    now = now or datetime.datetime.utcnow()
+    statement = insert(ActiveOption).values(_rows(actives_opcode, now))
+    return statement.on_conflict_do_update(
+        index_elements=[ActiveOption.opcode],
+        set_={"is_enabled": True, "last_updated": statement.excluded.last_updated},
+    ).returning(literal_column("xmax = 0").label("inserted"))
+
+
+def sync_active_options(session: Any, actives_opcode: Dict[Any, Any],
+                        force: bool = False) -> Optional[Tuple[int, int]]:
+    """
+    Store the opcode map in one round trip, unless it is unchanged since the last sync.
+
+    Args:
+        session: SQLAlchemy session (committed here)
+        actives_opcode: ``client.get_all_ACTIVES_OPCODE()`` output
+        force: Write even if the map is unchanged
+
+    Returns:
+        (inserted, updated) counts, or None if the write was skipped
+    """
+    global _last_synced_hash
+    digest = opcode_map_hash(actives_opcode)
+    with _sync_lock:
+        if not force and digest == _last_synced_hash:
+            return None
+        if not actives_opcode:
+            return 0, 0
+        inserted_flags = session.execute(upsert_statement(actives_opcode)).scalars().all()
+        session.commit()
+        _last_synced_hash = digest
+    inserted = sum(1 for flag in inserted_flags if flag)
+    return inserted, len(inserted_flags) - inserted
+
+
+def reset_sync_state():
+    """Forget the last synced hash, so the next sync writes."""
+    global _last_synced_hash
+    with _sync_lock:
+        _last_synced_hash = None
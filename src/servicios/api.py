@@ -8,22 +8,26 @@ import os
 import secrets
 from functools import wraps
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import bcrypt
 import jwt
 import yaml  # type: ignore[import-not-found]
-from flask import Flask, jsonify, request
+from flask import Flask, g, jsonify, request
 
 from src.servicios.iqoption_auth import authenticate
 
-from src.servicios.database import get_session
+from src.servicios.active_options import sync_active_options
+from src.servicios.database import get_scoped_session, remove_scoped_session
+from src.servicios.iq_account import drop_account_session, get_account_session
+from src.servicios.market_status import drop_market_status_cache, get_market_status_cache
+from src.servicios.trade_results import drop_trade_resolver
 from src.servicios.models import User
 from src.servicios.models import TradingSession
-from src.servicios.models import ActiveOption
 from src.servicios.models import TradingBot, TradingSignal, BotStatus, SignalStatus
 from src.servicios.trading_bot_service import TradingBotService
 from src.servicios.trading_strategies import STRATEGIES
+from src.servicios.user_identity import get_identity_cache
 import json
 
 logger = logging.getLogger(__name__)
@@ -104,9 +108,16 @@ _active_sessions: Dict[str, Any] = {}
 _active_bots: Dict[int, TradingBotService] = {}  # bot_id -> TradingBotService
 
 
-def _generate_token(username: str) -> str:
+@app.teardown_appcontext
+def _remove_db_session(exc):
+    """Return the request's scoped session connection to the shared pool."""
+    remove_scoped_session()
+
+
+def _generate_token(username: str, user_id: int) -> str:
     payload = {
         "username": username,
+        "user_id": user_id,
         "exp": datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=24),
     }
     token = jwt.encode(payload, app.config["SECRET_KEY"], algorithm="HS256")
@@ -127,6 +138,8 @@ def token_required(f):
         try:
             data = jwt.decode(token, app.config["SECRET_KEY"], algorithms=["HS256"])
             current_user = data["username"]
+            # Tokens issued before the claim existed fall back to an email lookup
+            g.user_id = data.get("user_id")
         except jwt.ExpiredSignatureError:
             return jsonify({"message": "Token has expired"}), 401
         except jwt.InvalidTokenError:
@@ -137,6 +150,11 @@ def token_required(f):
     return decorated
 
 
+def _current_user_id(session: Any, current_user: str) -> Optional[int]:
+    """ID of the authenticated user (None if unknown or inactive), cached across requests."""
+    return get_identity_cache().resolve(session, current_user, g.get("user_id"))
+
+
 @app.route("/login", methods=["POST"])
 def login():
     data = request.get_json(silent=True) or {}
@@ -147,7 +165,7 @@ def login():
     if not username or not password:
         return jsonify({"message": "Username and password required"}), 400
 
-    session = get_session()
+    session = get_scoped_session()
     user = session.query(User).filter_by(email=username).first()
 
     # Encode password for bcrypt
@@ -227,12 +245,16 @@ def login():
     # Manage IQ Option client session
     existing_client = _active_sessions.get(username)
     if existing_client is not None:
+        drop_market_status_cache(existing_client)
+        drop_account_session(existing_client)
+        drop_trade_resolver(existing_client)
         _shutdown_client(existing_client)
 
     if auth_result.client is not None:
         _active_sessions[username] = auth_result.client
 
-    token = _generate_token(username)
+    token = _generate_token(username, user.id)
+    get_identity_cache().put(username, user.id, True)
 
     # Manage database trading session
     old_tradingsession = session.query(TradingSession).filter_by(user_id=user.id, is_active=True).first()
@@ -256,8 +278,12 @@ def login():
 @app.route("/logout", methods=["POST"])
 @token_required
 def logout(current_user):
+    get_identity_cache().invalidate(current_user)
     client = _active_sessions.pop(current_user, None)
     if client is not None:
+        drop_market_status_cache(client)
+        drop_account_session(client)
+        drop_trade_resolver(client)
         _shutdown_client(client)
 
     return (
@@ -361,6 +387,7 @@ def reset_practice_balance(current_user):
     
     try:
         result = client.reset_practice_balance()
+        get_account_session(client).invalidate_balance()
         #logger.info("AQUI")
         if result:
             logger.info("Practice balance reset successfully for user %s", current_user)
@@ -432,37 +459,20 @@ def get_all_actives_opcode(current_user):
                 500,
             )
         
-        # Store actives in database
-        session = get_session()
+        # Store actives in database (one upsert, skipped when the map is unchanged)
+        force = request.args.get("force", "").lower() in ("1", "true", "yes")
+        session = get_scoped_session()
         try:
-            stored_count = 0
-            updated_count = 0
-            
-            # actives_opcode is typically a dict with opcode as key
-            for opcode, opcode_data in actives_opcode.items():
-                # Check if this opcode already exists
-                existing_active = session.query(ActiveOption).filter_by(opcode=str(opcode)).first()
-                
-                if existing_active:
-                    # Update existing record
-                    existing_active.is_enabled = True
-                    existing_active.last_updated = datetime.datetime.utcnow()
-                    updated_count += 1
-                else:
-                    # Create new record
-                    new_active = ActiveOption(
-                        opcode=str(opcode),
-                        name=str(opcode_data) if opcode_data else None,
-                        is_enabled=True
-                    )
-                    session.add(new_active)
-                    stored_count += 1
-            
-            session.commit()
-            logger.info(
-                "Actives OPCODE stored for user %s: %d new, %d updated", 
-                current_user, stored_count, updated_count
-            )
+            counts = sync_active_options(session, actives_opcode, force=force)
+            unchanged = counts is None
+            stored_count, updated_count = counts or (0, 0)
+            if unchanged:
+                logger.info("Actives OPCODE unchanged since last sync; database write skipped")
+            else:
+                logger.info(
+                    "Actives OPCODE stored for user %s: %d new, %d updated", 
+                    current_user, stored_count, updated_count
+                )
             
         except Exception as db_error:
             session.rollback()
@@ -490,6 +500,7 @@ def get_all_actives_opcode(current_user):
                     "user": current_user,
                     "stored": stored_count,
                     "updated": updated_count,
+                    "unchanged": unchanged,
                 }
             ),
             200,
@@ -599,24 +610,16 @@ def check_market(current_user, active_id):
         }), 401
     
     try:
-        # Get all opened actives
-        all_actives = None
-        try:
-            all_actives = client.get_all_open_time()
-        except Exception as e:
-            logger.warning(f"Error getting open time data: {e}")
-        
-        # Check if our active is in the list
+        # Look up our active in the shared market status snapshot
         is_open = False
         binary_available = False
         turbo_available = False
         
-        if all_actives and active_id in all_actives:
-            active_info = all_actives[active_id]
-            if isinstance(active_info, dict):
-                binary_available = active_info.get("binary", {}).get("enabled", False)
-                turbo_available = active_info.get("turbo", {}).get("enabled", False)
-                is_open = binary_available or turbo_available
+        status = get_market_status_cache(client).get(active_id)
+        if status:
+            binary_available = status["binary"]
+            turbo_available = status["turbo"]
+            is_open = binary_available or turbo_available
         
         # Get current balance
         balance = 0.0
@@ -679,10 +682,9 @@ def get_open_actives(current_user):
     try:
         all_actives = None
         try:
-            # Try to get live data
-            logger.info("Attempting to get live market data...")
-            all_actives = client.get_all_open_time()
-            logger.info(f"get_all_open_time returned: {type(all_actives)}, length: {len(all_actives) if all_actives else 0}")
+            # Read the shared market status snapshot (live data, cached per client)
+            all_actives = get_market_status_cache(client).get_all()
+            logger.info(f"Market status snapshot has {len(all_actives)} actives")
         except Exception as e:
             logger.warning(f"Error getting all open time: {e}")
         
@@ -706,18 +708,14 @@ def get_open_actives(current_user):
         
         # Process live data
         open_actives = []
-        for active_id, info in all_actives.items():
-            if isinstance(info, dict):
-                binary = info.get("binary", {})
-                turbo = info.get("turbo", {})
-                
-                if binary.get("enabled") or turbo.get("enabled"):
-                    open_actives.append({
-                        "active_id": active_id,
-                        "binary_enabled": binary.get("enabled", False),
-                        "turbo_enabled": turbo.get("enabled", False),
-                        "recommended": active_id in ["EURUSD", "GBPUSD", "USDJPY", "AUDUSD", "EURJPY"]
-                    })
+        for active_id, status in all_actives.items():
+            if status["binary"] or status["turbo"]:
+                open_actives.append({
+                    "active_id": active_id,
+                    "binary_enabled": status["binary"],
+                    "turbo_enabled": status["turbo"],
+                    "recommended": active_id in ["EURUSD", "GBPUSD", "USDJPY", "AUDUSD", "EURJPY"]
+                })
         
         if len(open_actives) == 0:
             logger.warning("Live data returned empty list, using common actives")
@@ -756,10 +754,10 @@ def create_bot(current_user):
     data = request.get_json(silent=True) or {}
     
     # Get user from database
-    session = get_session()
+    session = get_scoped_session()
     try:
-        user = session.query(User).filter_by(email=current_user).first()
-        if not user:
+        user_id = _current_user_id(session, current_user)
+        if user_id is None:
             return jsonify({"message": "User not found"}), 404
         
         # Validate required fields
@@ -776,7 +774,7 @@ def create_bot(current_user):
         
         # Create bot
         new_bot = TradingBot(
-            user_id=user.id,
+            user_id=user_id,
             name=data["name"],
             active_id=data["active_id"],
             strategy=data["strategy"],
@@ -822,13 +820,13 @@ def create_bot(current_user):
 @token_required
 def list_bots(current_user):
     """List all bots for the current user."""
-    session = get_session()
+    session = get_scoped_session()
     try:
-        user = session.query(User).filter_by(email=current_user).first()
-        if not user:
+        user_id = _current_user_id(session, current_user)
+        if user_id is None:
             return jsonify({"message": "User not found"}), 404
         
-        bots = session.query(TradingBot).filter_by(user_id=user.id).all()
+        bots = session.query(TradingBot).filter_by(user_id=user_id).all()
         
         bots_data = [{
             "id": bot.id,
@@ -857,13 +855,13 @@ def list_bots(current_user):
 @token_required
 def get_bot(current_user, bot_id):
     """Get details of a specific bot."""
-    session = get_session()
+    session = get_scoped_session()
     try:
-        user = session.query(User).filter_by(email=current_user).first()
-        if not user:
+        user_id = _current_user_id(session, current_user)
+        if user_id is None:
             return jsonify({"message": "User not found"}), 404
         
-        bot = session.query(TradingBot).filter_by(id=bot_id, user_id=user.id).first()
+        bot = session.query(TradingBot).filter_by(id=bot_id, user_id=user_id).first()
         if not bot:
             return jsonify({"message": "Bot not found"}), 404
         
@@ -911,13 +909,13 @@ def start_bot(current_user, bot_id):
             "error": "Please login first"
         }), 401
     
-    session = get_session()
+    session = get_scoped_session()
     try:
-        user = session.query(User).filter_by(email=current_user).first()
-        if not user:
+        user_id = _current_user_id(session, current_user)
+        if user_id is None:
             return jsonify({"message": "User not found"}), 404
         
-        bot = session.query(TradingBot).filter_by(id=bot_id, user_id=user.id).first()
+        bot = session.query(TradingBot).filter_by(id=bot_id, user_id=user_id).first()
         if not bot:
             return jsonify({"message": "Bot not found"}), 404
         
@@ -951,13 +949,13 @@ def start_bot(current_user, bot_id):
 @token_required
 def stop_bot(current_user, bot_id):
     """Stop a trading bot."""
-    session = get_session()
+    session = get_scoped_session()
     try:
-        user = session.query(User).filter_by(email=current_user).first()
-        if not user:
+        user_id = _current_user_id(session, current_user)
+        if user_id is None:
             return jsonify({"message": "User not found"}), 404
         
-        bot = session.query(TradingBot).filter_by(id=bot_id, user_id=user.id).first()
+        bot = session.query(TradingBot).filter_by(id=bot_id, user_id=user_id).first()
         if not bot:
             return jsonify({"message": "Bot not found"}), 404
         
@@ -986,13 +984,13 @@ def stop_bot(current_user, bot_id):
 @token_required
 def get_bot_signals(current_user, bot_id):
     """Get trading signals for a specific bot."""
-    session = get_session()
+    session = get_scoped_session()
     try:
-        user = session.query(User).filter_by(email=current_user).first()
-        if not user:
+        user_id = _current_user_id(session, current_user)
+        if user_id is None:
             return jsonify({"message": "User not found"}), 404
         
-        bot = session.query(TradingBot).filter_by(id=bot_id, user_id=user.id).first()
+        bot = session.query(TradingBot).filter_by(id=bot_id, user_id=user_id).first()
         if not bot:
             return jsonify({"message": "Bot not found"}), 404
         
@@ -1050,13 +1048,13 @@ def get_bot_signals(current_user, bot_id):
 @token_required
 def delete_bot(current_user, bot_id):
     """Delete a trading bot."""
-    session = get_session()
+    session = get_scoped_session()
     try:
-        user = session.query(User).filter_by(email=current_user).first()
-        if not user:
+        user_id = _current_user_id(session, current_user)
+        if user_id is None:
             return jsonify({"message": "User not found"}), 404
         
-        bot = session.query(TradingBot).filter_by(id=bot_id, user_id=user.id).first()
+        bot = session.query(TradingBot).filter_by(id=bot_id, user_id=user_id).first()
         if not bot:
             return jsonify({"message": "Bot not found"}), 404
         
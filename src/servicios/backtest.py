@@ -0,0 +1,283 @@
+"""Offline backtesting of IQ Option and Binance strategies over historical candles."""
+
+from __future__ import annotations
+
+import logging
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Union
+
+import numpy as np
+
+from src.servicios.binance_strategies import BinanceStrategy
+from src.servicios.candles import OHLCV
+from src.servicios.market_data import FETCH_LIMIT
+from src.servicios.trading_strategies import TradingStrategy
+
+logger = logging.getLogger(__name__)
+
+Strategy = Union[TradingStrategy, BinanceStrategy]
+
+# Bars per analyze() window when replaying, the same window the live bots fetch
+DEFAULT_LOOKBACK = FETCH_LIMIT
+DEFAULT_PAYOUT = 0.8
+DEFAULT_FEE_RATE = 0.001
+
+
+@dataclass
+class BacktestTrade:
+    """One simulated trade. Indexes point into the backtested candles."""
+    side: str  # "call"/"put" for binary options, "long" for spot
+    entry_index: int
+    exit_index: int
+    entry_time: int  # epoch ms
+    exit_time: int
+    entry_price: float
+    exit_price: float
+    amount: float
+    result: str  # "won", "lost" or "equal"
+    profit_loss: float
+
+
+@dataclass
+class BacktestResult:
+    """Trades of a backtest, in closing order, and the statistics derived from them."""
+    initial_balance: float
+    trades: List[BacktestTrade] = field(default_factory=list)
+    signal_count: int = 0
+
+    @property
+    def total_pnl(self) -> float:
+        return float(sum(t.profit_loss for t in self.trades))
+
+    @property
+    def final_balance(self) -> float:
+        return self.initial_balance + self.total_pnl
+
+    @property
+    def wins(self) -> int:
+        return sum(1 for t in self.trades if t.result == "won")
+
+    @property
+    def losses(self) -> int:
+        return sum(1 for t in self.trades if t.result == "lost")
+
+    @property
+    def win_rate(self) -> float:
+        """Won trades over decided (won or lost) trades, 0.0 without any."""
+        decided = self.wins + self.losses
+        return self.wins / decided if decided else 0.0
+
+    @property
+    def equity(self) -> np.ndarray:
+        """Balance after each closed trade, starting with the initial balance."""
+        pnl = np.fromiter((t.profit_loss for t in self.trades), dtype=np.float64, count=len(self.trades))
+        return self.initial_balance + np.concatenate(([0.0], np.cumsum(pnl)))
+
+    @property
+    def max_drawdown(self) -> float:
+        """Largest drop of the equity curve from a previous peak."""
+        equity = self.equity
+        return float(np.max(np.maximum.accumulate(equity) - equity))
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "trades": len(self.trades),
+            "signals": self.signal_count,
+            "wins": self.wins,
+            "losses": self.losses,
+            "win_rate": self.win_rate,
+            "total_pnl": self.total_pnl,
+            "final_balance": self.final_balance,
+            "max_drawdown": self.max_drawdown,
+        }
+
+
+def replay_signals(strategy: Strategy, candles: OHLCV, lookback: int = DEFAULT_LOOKBACK) -> np.ndarray:
+    """
+    Signals of ``strategy`` at every bar, calling ``analyze`` once per bar.
+
+    Bar ``i`` is evaluated as the newest bar of a ``lookback`` window ending at
+    it, the way a bot sees its candle feed. The strategy must be fresh (no bars
+    seen yet).
+
+    Returns:
+        int8 array: 1 for call/BUY, -1 for put/SELL, 0 for no signal
+    """
+    signals = np.zeros(len(candles), dtype=np.int8)
+    for i in range(len(candles)):
+        signal = strategy.analyze(candles[max(i + 1 - lookback, 0):i + 1], float(candles.close[i]))
+        if signal is not None:
+            signals[i] = 1 if signal.signal_type.lower() in ("call", "buy") else -1
+    return signals
+
+
+def signal_series(strategy: Strategy, candles: OHLCV, vectorized: bool = True,
+                  lookback: int = DEFAULT_LOOKBACK) -> np.ndarray:
+    """
+    Signals of ``strategy`` at every bar.
+
+    Uses the strategy's vectorized ``signal_series`` when it has one (the
+    indicators run once over the whole array) and falls back to
+    ``replay_signals`` otherwise or when ``vectorized`` is False.
+    """
+    if vectorized:
+        signals = strategy.signal_series(candles, lookback)
+        if signals is not None:
+            return signals
+        logger.info(f"{type(strategy).__name__} has no vectorized signals; replaying bar by bar")
+    return replay_signals(strategy, candles, lookback)
+
+
+def _binary_outcome(side: str, entry_price: float, exit_price: float) -> str:
+    if exit_price == entry_price:
+        return "equal"
+    went_up = exit_price > entry_price
+    return "won" if went_up == (side == "call") else "lost"
+
+
+def backtest_binary(strategy: TradingStrategy, candles: OHLCV, duration_bars: int = 1,
+                    payout: float = DEFAULT_PAYOUT, initial_amount: float = 1.0,
+                    max_amount: Optional[float] = None, initial_balance: float = 1000.0,
+                    max_open_positions: int = 1, vectorized: bool = True,
+                    lookback: int = DEFAULT_LOOKBACK) -> BacktestResult:
+    """
+    Simulate an IQ Option bot trading ``strategy`` on historical candles.
+
+    A signal at bar ``i`` opens an option at that bar's close which expires at
+    the close of bar ``i + duration_bars``. Wins pay ``amount * payout``,
+    losses cost the stake and ties return it. Stakes come from
+    ``get_next_amount`` with the results applied in opening order, as the live
+    bot does, and signals are skipped while ``max_open_positions`` options are
+    open or the balance cannot cover the stake.
+
+    Args:
+        strategy: Fresh strategy instance (e.g. from ``get_strategy``)
+        candles: Historical candles, oldest bar first
+        duration_bars: Option duration in bars
+        payout: Profit per unit staked on a win (0.8 = 80%)
+        initial_amount: Base stake
+        max_amount: Stake cap (no cap if None)
+        initial_balance: Starting balance
+        max_open_positions: Options open at the same time
+        vectorized: Use the strategy's one-pass ``signal_series`` when available
+        lookback: Window size when replaying ``analyze`` bar by bar
+
+    Returns:
+        BacktestResult with the trades in closing order
+    """
+    if duration_bars <= 0:
+        raise ValueError("duration_bars must be positive")
+    max_amount = math.inf if max_amount is None else max_amount
+    signals = signal_series(strategy, candles, vectorized, lookback)
+    closes, timestamps = candles.close, candles.timestamp
+
+    result = BacktestResult(initial_balance=initial_balance, signal_count=int(np.count_nonzero(signals)))
+    balance = initial_balance
+    last_result: Optional[str] = None
+    last_amount = initial_amount
+    open_trades: Deque[BacktestTrade] = deque()
+
+    def settle_until(index: int):
+        nonlocal balance, last_result, last_amount
+        # Every option lasts duration_bars, so they expire in opening order
+        while open_trades and open_trades[0].exit_index <= index:
+            trade = open_trades.popleft()
+            trade.result = _binary_outcome(trade.side, trade.entry_price, trade.exit_price)
+            if trade.result == "won":
+                trade.profit_loss = trade.amount * payout
+            elif trade.result == "lost":
+                trade.profit_loss = -trade.amount
+            balance += trade.amount + trade.profit_loss
+            last_result, last_amount = trade.result, trade.amount
+            result.trades.append(trade)
+
+    last_entry = len(candles) - duration_bars
+    for index in np.flatnonzero(signals[:max(last_entry, 0)]).tolist():
+        settle_until(index)
+        if len(open_trades) >= max_open_positions:
+            continue
+        amount = strategy.get_next_amount(last_result, last_amount, initial_amount, max_amount)
+        if balance < amount:
+            continue
+        exit_index = index + duration_bars
+        balance -= amount
+        open_trades.append(BacktestTrade(
+            side="call" if signals[index] > 0 else "put",
+            entry_index=index,
+            exit_index=exit_index,
+            entry_time=int(timestamps[index]),
+            exit_time=int(timestamps[exit_index]),
+            entry_price=float(closes[index]),
+            exit_price=float(closes[exit_index]),
+            amount=amount,
+            result="",
+            profit_loss=0.0,
+        ))
+    settle_until(len(candles))
+    return result
+
+
+def backtest_spot(strategy: BinanceStrategy, candles: OHLCV, initial_balance: float = 1000.0,
+                  initial_amount: float = 10.0, max_amount: Optional[float] = None,
+                  fee_rate: float = DEFAULT_FEE_RATE, vectorized: bool = True,
+                  lookback: int = DEFAULT_LOOKBACK) -> BacktestResult:
+    """
+    Simulate a Binance spot bot trading ``strategy`` on historical candles.
+
+    Mirrors the live bot: a BUY signal without a position buys
+    ``get_position_size(balance)`` clamped to [initial_amount, max_amount] of
+    quote asset at the bar's close, a SELL signal with a position sells all of
+    it. Both fills pay ``fee_rate``. A position still open at the end is not
+    counted.
+
+    Args:
+        strategy: Fresh strategy instance (e.g. from ``get_binance_strategy``)
+        candles: Historical candles, oldest bar first
+        initial_balance: Starting quote balance (USDT)
+        initial_amount: Minimum order size in quote asset
+        max_amount: Maximum order size (no cap if None)
+        fee_rate: Commission per fill (0.001 = 0.1%)
+        vectorized: Use the strategy's one-pass ``signal_series`` when available
+        lookback: Window size when replaying ``analyze`` bar by bar
+
+    Returns:
+        BacktestResult with one trade per closed position
+    """
+    max_amount = math.inf if max_amount is None else max_amount
+    signals = signal_series(strategy, candles, vectorized, lookback)
+    closes, timestamps = candles.close, candles.timestamp
+
+    result = BacktestResult(initial_balance=initial_balance, signal_count=int(np.count_nonzero(signals)))
+    balance = initial_balance
+    entry_index: Optional[int] = None
+    cost = quantity = 0.0
+
+    for index in np.flatnonzero(signals).tolist():
+        price = float(closes[index])
+        if signals[index] > 0 and entry_index is None:
+            amount = max(min(strategy.get_position_size(balance), max_amount), initial_amount)
+            if balance < amount or price <= 0:
+                continue
+            balance -= amount
+            entry_index, cost = index, amount
+            quantity = amount * (1 - fee_rate) / price
+        elif signals[index] < 0 and entry_index is not None:
+            proceeds = quantity * price * (1 - fee_rate)
+            balance += proceeds
+            profit_loss = proceeds - cost
+            result.trades.append(BacktestTrade(
+                side="long",
+                entry_index=entry_index,
+                exit_index=index,
+                entry_time=int(timestamps[entry_index]),
+                exit_time=int(timestamps[index]),
+                entry_price=float(closes[entry_index]),
+                exit_price=price,
+                amount=cost,
+                result="won" if profit_loss > 0 else "lost" if profit_loss < 0 else "equal",
+                profit_loss=profit_loss,
+            ))
+            entry_index = None
+    return result
@@ -0,0 +1,238 @@
+"""In-memory Binance account snapshot kept current by the user data stream."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from threading import Lock, RLock, Timer
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Set, Tuple
+
+from src.servicios.database import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Called with every executionReport that filled (part of) an order
+FillCallback = Callable[[Dict[str, Any]], None]
+# Builds a started websocket manager for (api_key, api_secret, testnet)
+UserManagerFactory = Callable[[str, str, bool], Any]
+
+OPEN_ORDER_STATUSES = ("NEW", "PARTIALLY_FILLED")
+# Fills kept per account for callers that look them up after the fact
+MAX_RECENT_FILLS = 200
+# Wait before reopening a user socket that reported an error
+RECONNECT_SECONDS = 5.0
+
+
+def _default_manager(api_key: str, api_secret: str, testnet: bool) -> Any:
+    from binance import ThreadedWebsocketManager
+
+    manager = ThreadedWebsocketManager(api_key, api_secret, testnet=testnet)
+    manager.start()
+    return manager
+
+
+class BinanceAccountStream:
+    """
+    Balances, open orders and fills of one Binance API key, pushed by the user data stream.
+
+    The snapshot is seeded with one throttled ``get_account_state`` call and
+    then updated from ``outboundAccountPosition``, ``balanceUpdate`` and
+    ``executionReport`` events (python-binance creates the listenKey and keeps
+    it alive). Reads are dictionary lookups. While the socket is down the
+    snapshot reports itself as not live and callers use REST; reconnecting
+    re-seeds it so nothing missed in between is kept stale.
+    """
+
+    def __init__(self, client: Any, manager_factory: UserManagerFactory = _default_manager):
+        self.client = client
+        self._manager_factory = manager_factory
+        self._manager: Any = None
+        self._socket: Optional[str] = None
+        self._balances: Dict[str, Tuple[float, float]] = {}  # asset -> (free, locked)
+        self._open_orders: Dict[int, Dict[str, Any]] = {}
+        self._fills: Deque[Dict[str, Any]] = deque(maxlen=MAX_RECENT_FILLS)
+        self._fill_listeners: Dict[Hashable, FillCallback] = {}
+        self._users: Set[Hashable] = set()
+        self._seeded = False
+        self._timer: Optional[Timer] = None
+        self._lock = RLock()
+
+    @property
+    def live(self) -> bool:
+        """True while the snapshot is seeded and the user socket is connected."""
+        return self._seeded and self._socket is not None
+
+    def start(self) -> bool:
+        """Seed the snapshot over REST and open the user socket. Returns True if live."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            try:
+                if self._manager is None:
+                    self._manager = self._manager_factory(self.client.api_key, self.client.api_secret,
+                                                          self.client.testnet)
+                # Open the socket first so events racing the seed are not lost
+                self._socket = self._manager.start_user_socket(callback=self._handle)
+                self._seed()
+                logger.info("Binance user data stream started")
+            except Exception as e:
+                logger.error(f"Could not start Binance user data stream: {e}")
+                self._socket = None
+                self._schedule_restart()
+            return self.live
+
+    def _seed(self):
+        # Through the wrapper so the weight-20/80 seed calls count against the venue budget
+        account, open_orders = self.client.get_account_state()
+        with self._lock:
+            self._balances = {
+                b["asset"]: (float(b["free"]), float(b["locked"])) for b in account.get("balances", [])
+            }
+            self._open_orders = {int(o["orderId"]): o for o in open_orders}
+            self._seeded = True
+
+    def _schedule_restart(self):
+        with self._lock:
+            if self._timer is not None or not self._users:
+                return
+            self._timer = Timer(RECONNECT_SECONDS, self.start)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _handle(self, event: Dict[str, Any]):
+        """User socket callback."""
+        try:
+            event_type = event.get("e")
+            if event_type == "error":
+                logger.warning(f"Binance user data stream error: {event.get('m')}; reconnecting")
+                with self._lock:
+                    self._socket = None
+                    self._seeded = False
+                self._schedule_restart()
+            elif event_type == "outboundAccountPosition":
+                with self._lock:
+                    for balance in event.get("B", []):
+                        self._balances[balance["a"]] = (float(balance["f"]), float(balance["l"]))
+            elif event_type == "balanceUpdate":
+                with self._lock:
+                    free, locked = self._balances.get(event["a"], (0.0, 0.0))
+                    self._balances[event["a"]] = (free + float(event["d"]), locked)
+            elif event_type == "executionReport":
+                self._on_execution_report(event)
+        except Exception as e:
+            logger.error(f"Error handling Binance user data event: {e}", exc_info=True)
+
+    def _on_execution_report(self, report: Dict[str, Any]):
+        order_id = int(report["i"])
+        with self._lock:
+            if report.get("X") in OPEN_ORDER_STATUSES:
+                self._open_orders[order_id] = report
+            else:
+                self._open_orders.pop(order_id, None)
+            if report.get("x") != "TRADE":
+                return
+            fill = {
+                "order_id": order_id,
+                "symbol": report["s"],
+                "side": report["S"],
+                "quantity": float(report["l"]),
+                "price": float(report["L"]),
+                "commission": float(report.get("n") or 0.0),
+                "commission_asset": report.get("N"),
+                "status": report.get("X"),
+                "time": int(report.get("T") or time.time() * 1000),
+            }
+            self._fills.append(fill)
+            listeners = list(self._fill_listeners.values())
+        for listener in listeners:
+            try:
+                listener(fill)
+            except Exception as e:
+                logger.error(f"Fill listener failed: {e}", exc_info=True)
+
+    def get_balance(self, asset: str) -> Optional[Tuple[float, float]]:
+        """(free, locked) of ``asset``, or None when the snapshot is not live."""
+        if not self.live:
+            return None
+        return self._balances.get(asset.upper(), (0.0, 0.0))
+
+    def get_free(self, asset: str) -> Optional[float]:
+        """Free balance of ``asset``, or None when the snapshot is not live."""
+        balance = self.get_balance(asset)
+        return balance[0] if balance else None
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [o for o in self._open_orders.values() if symbol is None or o.get("s", o.get("symbol")) == symbol]
+
+    def fills(self, symbol: Optional[str] = None, order_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Recent fills, oldest first."""
+        with self._lock:
+            return [f for f in self._fills
+                    if (symbol is None or f["symbol"] == symbol) and (order_id is None or f["order_id"] == order_id)]
+
+    def acquire(self, user_id: Hashable, on_fill: Optional[FillCallback] = None) -> bool:
+        """Register a user (e.g. a bot), starting the stream for the first one. Returns True if live."""
+        with self._lock:
+            self._users.add(user_id)
+            if on_fill:
+                self._fill_listeners[user_id] = on_fill
+            if self._socket is not None or self._timer is not None:
+                return self.live
+        return self.start()
+
+    def release(self, user_id: Hashable) -> bool:
+        """Unregister a user. Returns True once nobody uses the stream and it was closed."""
+        with self._lock:
+            self._users.discard(user_id)
+            self._fill_listeners.pop(user_id, None)
+            if self._users:
+                return False
+            self.close()
+            return True
+
+    def close(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._manager is not None:
+                try:
+                    self._manager.stop()
+                except Exception as e:
+                    logger.debug(f"Error stopping Binance user data stream: {e}")
+            self._manager, self._socket, self._seeded = None, None, False
+
+
+# Keyed by API key: bots sharing a key share one listenKey and snapshot
+_accounts: Dict[str, BinanceAccountStream] = {}
+_accounts_lock = Lock()
+
+
+def acquire_account_stream(client: Any, user_id: Hashable,
+                           on_fill: Optional[FillCallback] = None) -> Optional[BinanceAccountStream]:
+    """
+    Return the account stream of ``client``'s API key, registering ``user_id`` on it.
+
+    Returns None when the user data stream is disabled in settings.yaml.
+    """
+    stream_settings = get_settings().get("binance_stream") or {}
+    if not stream_settings.get("user_data", True):
+        return None
+    with _accounts_lock:
+        account = _accounts.get(client.api_key)
+        if account is None:
+            account = BinanceAccountStream(client)
+            _accounts[client.api_key] = account
+    account.acquire(user_id, on_fill)
+    return account
+
+
+def release_account_stream(api_key: str, user_id: Hashable):
+    """Unregister ``user_id``; the stream closes once its last user is gone."""
+    with _accounts_lock:
+        account = _accounts.get(api_key)
+        if account is not None and account.release(user_id):
+            del _accounts[api_key]
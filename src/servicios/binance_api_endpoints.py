@@ -6,11 +6,11 @@ from flask import request, jsonify
 from datetime import datetime
 
 from src.servicios.api import app, token_required
-from src.servicios.database import get_session
+from src.servicios.database import get_scoped_session
 from src.servicios.models import (
     BinanceBot, BinanceTrade, BinanceApiKey, BotStatus, User
 )
-from src.servicios.binance_client import BinanceClientWrapper
+from src.servicios.binance_client_pool import get_binance_client_pool
 from src.servicios.binance_bot_service import BinanceBotService
 
 logger = logging.getLogger(__name__)
@@ -32,17 +32,18 @@ def create_binance_api_key(current_user):
             if field not in data:
                 return jsonify({"message": f"Missing required field: {field}"}), 400
         
-        session = get_session()
+        session = get_scoped_session()
         try:
             # Test the API key first
             is_testnet = data.get('is_testnet', True)
-            client = BinanceClientWrapper(
+            pool = get_binance_client_pool()
+            client = pool.get(
                 api_key=data['api_key'],
                 api_secret=data['api_secret'],
                 testnet=is_testnet
             )
             
-            if not client.test_connection():
+            if not pool.check_health(client, force=True):
                 return jsonify({
                     "message": "Failed to connect with provided API credentials",
                     "error": "Invalid API key or secret"
@@ -83,7 +84,7 @@ def create_binance_api_key(current_user):
 @token_required
 def list_binance_api_keys(current_user):
     """List all Binance API keys for current user."""
-    session = get_session()
+    session = get_scoped_session()
     try:
         api_keys = session.query(BinanceApiKey).filter_by(
             user_id=current_user
@@ -109,7 +110,7 @@ def list_binance_api_keys(current_user):
 @token_required
 def get_binance_balance(current_user, key_id):
     """Get Binance account balance."""
-    session = get_session()
+    session = get_scoped_session()
     try:
         api_key = session.query(BinanceApiKey).filter_by(
             id=key_id,
@@ -120,7 +121,7 @@ def get_binance_balance(current_user, key_id):
         if not api_key:
             return jsonify({"message": "API key not found"}), 404
         
-        client = BinanceClientWrapper(
+        client = get_binance_client_pool().get(
             api_key=api_key.api_key,
             api_secret=api_key.api_secret,
             testnet=api_key.is_testnet
@@ -154,7 +155,7 @@ def create_binance_bot(current_user):
             if field not in data:
                 return jsonify({"message": f"Missing required field: {field}"}), 400
         
-        session = get_session()
+        session = get_scoped_session()
         try:
             # Verify API key belongs to user
             api_key = session.query(BinanceApiKey).filter_by(
@@ -216,7 +217,7 @@ def create_binance_bot(current_user):
 @token_required
 def list_binance_bots(current_user):
     """List all Binance bots for current user."""
-    session = get_session()
+    session = get_scoped_session()
     try:
         bots = session.query(BinanceBot).filter_by(
             user_id=current_user
@@ -244,7 +245,7 @@ def list_binance_bots(current_user):
 @token_required
 def get_binance_bot(current_user, bot_id):
     """Get details of a specific Binance bot."""
-    session = get_session()
+    session = get_scoped_session()
     try:
         bot = session.query(BinanceBot).filter_by(
             id=bot_id,
@@ -293,7 +294,7 @@ def get_binance_bot(current_user, bot_id):
 @token_required
 def start_binance_bot(current_user, bot_id):
     """Start a Binance trading bot."""
-    session = get_session()
+    session = get_scoped_session()
     try:
         bot = session.query(BinanceBot).filter_by(
             id=bot_id,
@@ -333,7 +334,7 @@ def start_binance_bot(current_user, bot_id):
 @token_required
 def stop_binance_bot(current_user, bot_id):
     """Stop a running Binance bot."""
-    session = get_session()
+    session = get_scoped_session()
     try:
         bot = session.query(BinanceBot).filter_by(
             id=bot_id,
@@ -368,7 +369,7 @@ def stop_binance_bot(current_user, bot_id):
 @token_required
 def get_binance_bot_trades(current_user, bot_id):
     """Get trade history for a Binance bot."""
-    session = get_session()
+    session = get_scoped_session()
     try:
         # Verify bot belongs to user
         bot = session.query(BinanceBot).filter_by(
@@ -427,7 +428,7 @@ def get_binance_bot_trades(current_user, bot_id):
 @token_required
 def delete_binance_bot(current_user, bot_id):
     """Delete a Binance bot."""
-    session = get_session()
+    session = get_scoped_session()
     try:
         bot = session.query(BinanceBot).filter_by(
             id=bot_id,
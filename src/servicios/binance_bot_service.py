@@ -7,18 +7,38 @@ import time
 import json
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
-from threading import Thread, Event
+from threading import Event
 
+from sqlalchemy import case, func
+
+from src.servicios.bot_scheduler import get_bot_scheduler
 from src.servicios.database import get_session
 from src.servicios.models import (
     BinanceBot, BinanceTrade, BinancePosition, BinanceApiKey,
     BotStatus, BinanceOrderSide
 )
+from src.servicios.binance_account import BinanceAccountStream, acquire_account_stream, release_account_stream
 from src.servicios.binance_client import BinanceClientWrapper
+from src.servicios.binance_client_pool import get_binance_client_pool
+from src.servicios.binance_stream import BinanceMarketStream, get_binance_stream
 from src.servicios.binance_strategies import get_binance_strategy, BinanceStrategy
+from src.servicios.candles import OHLCV, interval_to_seconds
+from src.servicios.candle_history import binance_page_fetcher
+from src.servicios.market_data import FETCH_LIMIT, FeedKey, get_market_data_hub
+from src.servicios.risk_ledger import DailyRiskLedger, utc_day_start
 
 logger = logging.getLogger(__name__)
 
+# Trade statuses that count towards max_trades_per_day
+COUNTED_TRADE_STATUSES = ['executed', 'filled', 'closed']
+# How often the in-memory daily ledger is reconciled against the database
+LEDGER_RECONCILE_SECONDS = 300
+# Default kline interval when the bot config does not set "interval"
+DEFAULT_INTERVAL = "5m"
+# Retry delays when market data is missing or a tick fails
+NO_DATA_RETRY_SECONDS = 30
+ERROR_RETRY_SECONDS = 60
+
 
 class BinanceBotService:
     """Service for managing Binance trading bot operations."""
@@ -35,9 +55,20 @@ class BinanceBotService:
         self.client: Optional[BinanceClientWrapper] = None
         self.strategy: Optional[BinanceStrategy] = None
         self.stop_event = Event()
-        self.thread: Optional[Thread] = None
         self.is_running = False
+        self.job_key = ("binance", bot_id)
         self.current_position: Optional[Dict[str, Any]] = None
+        self.ledger = DailyRiskLedger(bot_id, reconcile_seconds=LEDGER_RECONCILE_SECONDS)
+        self.interval = DEFAULT_INTERVAL
+        self.feed_key: Optional[FeedKey] = None
+        self.stream: Optional[BinanceMarketStream] = None
+        self.account: Optional[BinanceAccountStream] = None
+        
+        # Loop state carried between ticks
+        self._iteration = 0
+        self._last_buy_trade_id: Optional[int] = None
+        # Open time (ms) of the last closed bar given to the strategy
+        self._last_analyzed_bar: Optional[int] = None
         
         # Load bot configuration and initialize client
         self._load_config()
@@ -60,15 +91,16 @@ class BinanceBotService:
             if not api_key_obj:
                 raise ValueError(f"API key {self.bot_config.api_key_id} not found or inactive")
             
-            # Initialize Binance client
-            self.client = BinanceClientWrapper(
+            # Shared client of the API key (one HTTP session for all its bots and requests)
+            pool = get_binance_client_pool()
+            self.client = pool.get(
                 api_key=api_key_obj.api_key,
                 api_secret=api_key_obj.api_secret,
                 testnet=api_key_obj.is_testnet
             )
             
-            # Test connection
-            if not self.client.test_connection():
+            # Test connection (cached by the pool while it keeps succeeding)
+            if not pool.check_health(self.client):
                 raise ValueError("Failed to connect to Binance API")
             
             logger.info(f"Bot will trade {self.bot_config.symbol} on {self.bot_config.market_type}")
@@ -85,19 +117,48 @@ class BinanceBotService:
             if not self.strategy:
                 raise ValueError(f"Unknown strategy: {self.bot_config.strategy}")
             
+            # Bots on the same venue/symbol/interval share one candle feed
+            self.interval = strategy_config.get('interval', DEFAULT_INTERVAL)
+            venue = "binance-testnet" if api_key_obj.is_testnet else "binance"
+            self.feed_key = (venue, self.bot_config.symbol, self.interval)
+            
             logger.info(f"Loaded bot config: {self.bot_config.name} with strategy {self.bot_config.strategy}")
         finally:
             session.close()
     
     def start(self) -> bool:
-        """Start the trading bot in a separate thread."""
+        """Start the trading bot on the shared bot scheduler."""
         if self.is_running:
             logger.warning("Bot is already running")
             return False
         
+        if not self.bot_config or not self.strategy or not self.client:
+            logger.error("Bot configuration, strategy or client not loaded")
+            self._update_bot_status(BotStatus.ERROR.value)
+            return False
+        
+        logger.info(f"Binance bot {self.bot_id} main loop started")
+        logger.info(f"Trading: {self.bot_config.symbol} ({self.bot_config.market_type})")
+        logger.info(f"Strategy: {self.bot_config.strategy}")
+        
         self.stop_event.clear()
-        self.thread = Thread(target=self._run, daemon=True)
-        self.thread.start()
+        self._iteration = 0
+        self._last_buy_trade_id = None
+        self._last_analyzed_bar = None
+        get_market_data_hub().subscribe(self.feed_key, self.bot_id, self._fetch_candles)
+        self._warm_start()
+        # Push mode: klines/prices arrive over the websocket and a new bar wakes the bot
+        self.stream = get_binance_stream(self.client.testnet)
+        if self.stream:
+            self.stream.subscribe(self.bot_config.symbol, self.interval, self.bot_id,
+                                  on_bar=lambda: get_bot_scheduler().wake(self.job_key))
+        # Balances and fills from the user data stream instead of signed REST calls per tick
+        self.account = acquire_account_stream(self.client, self.bot_id, on_fill=self._on_fill)
+        if not get_bot_scheduler().add(self.job_key, self._tick, self.stop_event, on_exit=self._finish):
+            logger.warning(f"Binance bot {self.bot_id} is already scheduled")
+            self._release()
+            return False
+        get_binance_client_pool().hold(self.client, self.job_key)
         self.is_running = True
         
         # Update bot status in database
@@ -112,11 +173,10 @@ class BinanceBotService:
             logger.warning("Bot is not running")
             return False
         
-        self.stop_event.set()
-        if self.thread:
-            self.thread.join(timeout=10)
+        get_bot_scheduler().cancel(self.job_key, timeout=10)
         
         self.is_running = False
+        self._release()
         self._update_bot_status(BotStatus.STOPPED.value)
         
         logger.info(f"Binance bot {self.bot_id} stopped")
@@ -137,64 +197,86 @@ class BinanceBotService:
         finally:
             session.close()
     
+    def _seed_ledger(self, session):
+        """Reconcile the daily ledger with one aggregate query over today's trades."""
+        today_start = utc_day_start()
+        row = session.query(
+            func.count(case((BinanceTrade.status.in_(COUNTED_TRADE_STATUSES), 1))),
+            func.coalesce(func.sum(BinanceTrade.profit_loss), 0.0),
+        ).filter(
+            BinanceTrade.bot_id == self.bot_id,
+            BinanceTrade.created_at >= today_start
+        ).group_by(BinanceTrade.bot_id).first()
+        
+        trade_count, total_pnl = row if row else (0, 0.0)
+        self.ledger.seed(trade_count, total_pnl, today_start)
+    
     def _check_limits(self, session) -> bool:
         """Check if bot has reached daily limits."""
         if not self.bot_config:
             return False
         
-        today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.ledger.roll_over()
+        if self.ledger.needs_reconcile():
+            self._seed_ledger(session)
         
         # Check max trades per day
-        today_trades = session.query(BinanceTrade).filter(
-            BinanceTrade.bot_id == self.bot_id,
-            BinanceTrade.created_at >= today_start,
-            BinanceTrade.status.in_(['executed', 'filled', 'closed'])
-        ).count()
-        
+        today_trades = self.ledger.trade_count
         if today_trades >= self.bot_config.max_trades_per_day:
             logger.info(f"Bot {self.bot_id} reached max trades per day: {today_trades}")
             return False
         
+        total_pnl = self.ledger.realized_pnl
+        
         # Check daily loss limit
-        if self.bot_config.max_daily_loss:
-            trades = session.query(BinanceTrade).filter(
-                BinanceTrade.bot_id == self.bot_id,
-                BinanceTrade.created_at >= today_start,
-                BinanceTrade.profit_loss.isnot(None)
-            ).all()
-            
-            total_pnl = sum(t.profit_loss for t in trades if t.profit_loss)
-            
-            if total_pnl <= -abs(self.bot_config.max_daily_loss):
-                logger.info(f"Bot {self.bot_id} hit daily loss limit: {total_pnl:.2f} USDT")
-                return False
+        if self.bot_config.max_daily_loss and total_pnl <= -abs(self.bot_config.max_daily_loss):
+            logger.info(f"Bot {self.bot_id} hit daily loss limit: {total_pnl:.2f} USDT")
+            return False
         
         # Check daily gain limit
-        if self.bot_config.max_daily_gain:
-            trades = session.query(BinanceTrade).filter(
-                BinanceTrade.bot_id == self.bot_id,
-                BinanceTrade.created_at >= today_start,
-                BinanceTrade.profit_loss.isnot(None)
-            ).all()
-            
-            total_pnl = sum(t.profit_loss for t in trades if t.profit_loss)
-            
-            if total_pnl >= self.bot_config.max_daily_gain:
-                logger.info(f"Bot {self.bot_id} hit daily gain limit: {total_pnl:.2f} USDT")
-                return False
+        if self.bot_config.max_daily_gain and total_pnl >= self.bot_config.max_daily_gain:
+            logger.info(f"Bot {self.bot_id} hit daily gain limit: {total_pnl:.2f} USDT")
+            return False
         
         return True
     
+    def _fetch_candles(self, since: Optional[int] = None) -> OHLCV:
+        """Fetch klines opened at or after ``since`` for the shared market data feed."""
+        return self.client.get_klines(
+            symbol=self.bot_config.symbol,
+            interval=self.interval,
+            limit=FETCH_LIMIT,
+            start_time=since
+        )
+    
+    def _warm_start(self):
+        """Seed the candle feed from the local candle history plus a short gap fill."""
+        try:
+            fetch_page = binance_page_fetcher(self.client, self.bot_config.symbol, self.interval)
+            get_market_data_hub().warm_start(self.feed_key, fetch_page)
+        except Exception as e:
+            logger.warning(f"Could not warm-start candles for bot {self.bot_id}: {e}")
+    
+    def _current_price(self) -> Optional[float]:
+        """Streamed book ticker price, falling back to a REST ticker request."""
+        price = self.stream.get_price(self.bot_config.symbol) if self.stream else None
+        return price or self.client.get_symbol_price(self.bot_config.symbol)
+    
+    def _free_balance(self, asset: str) -> float:
+        """Free balance from the account snapshot, falling back to REST while it is not live."""
+        free = self.account.get_free(asset) if self.account else None
+        return free if free is not None else self.client.get_account_balance(asset)
+    
     def _get_current_position(self, session) -> Optional[Dict[str, Any]]:
         """Get current open position if any."""
         # For spot trading, check if we have base asset
         if self.bot_config.market_type == "spot":
             # Extract base asset from symbol (e.g., "BTC" from "BTCUSDT")
             base_asset = self.bot_config.symbol.replace("USDT", "").replace("BUSD", "")
-            balance = self.client.get_account_balance(base_asset)
+            balance = self._free_balance(base_asset)
             
             if balance > 0:
-                current_price = self.client.get_symbol_price(self.bot_config.symbol)
+                current_price = self._current_price()
                 return {
                     'type': 'spot',
                     'asset': base_asset,
@@ -207,6 +289,46 @@ class BinanceBotService:
         # This is a simplified version for spot trading
         return None
     
+    def _on_fill(self, fill: Dict[str, Any]):
+        """
+        Record an executionReport fill of one of this bot's orders in its trade row.
+        
+        Fills of orders placed by other bots on the same API key, or of an order
+        whose row is not saved yet (it is then saved from the REST fills), are ignored.
+        """
+        if fill['symbol'] != self.bot_config.symbol:
+            return
+        session = get_session()
+        try:
+            trade = session.query(BinanceTrade).filter_by(
+                bot_id=self.bot_id, order_id=str(fill['order_id'])
+            ).first()
+            if not trade:
+                return
+            # Every fill of the order seen so far, this one included
+            fills = self.account.fills(order_id=fill['order_id']) if self.account else [fill]
+            quantity = sum(f['quantity'] for f in fills)
+            notional = sum(f['quantity'] * f['price'] for f in fills)
+            trade.quantity = quantity
+            trade.quote_quantity = notional
+            trade.commission = sum(f['commission'] for f in fills)
+            trade.commission_asset = fill['commission_asset']
+            if quantity > 0:
+                if trade.order_side == BinanceOrderSide.BUY.value:
+                    trade.entry_price = notional / quantity
+                else:
+                    trade.exit_price = notional / quantity
+            if fill['status'] == 'FILLED':
+                trade.status = 'filled'
+            trade.executed_at = datetime.utcfromtimestamp(fill['time'] / 1000)
+            session.commit()
+            logger.debug(f"Recorded fill of order {fill['order_id']} on trade {trade.id}")
+        except Exception as e:
+            logger.error(f"Error recording fill of order {fill.get('order_id')}: {e}")
+            session.rollback()
+        finally:
+            session.close()
+    
     def _execute_buy(self, amount_usdt: float, signal: Any, session) -> Optional[int]:
         """Execute a buy order."""
         try:
@@ -248,6 +370,7 @@ class BinanceBotService:
             
             session.add(trade)
             session.commit()
+            self.ledger.record_trade()
             
             logger.info(f"✅ BUY order executed: Order ID {order['orderId']}")
             logger.info(f"   Quantity: {trade.quantity if trade.quantity else 'N/A'}")
@@ -322,8 +445,11 @@ class BinanceBotService:
                     
                     logger.info(f"   P&L: {pnl:.2f} USDT ({trade.profit_loss_percent:.2f}%)")
             
+            realized_pnl = trade.profit_loss
             session.add(trade)
             session.commit()
+            self.ledger.record_trade()
+            self.ledger.record_result(realized_pnl)
             
             logger.info(f"✅ SELL order executed: Order ID {order['orderId']}")
             logger.info(f"   Price: {avg_price if avg_price else 'N/A'}")
@@ -335,121 +461,129 @@ class BinanceBotService:
             logger.error(f"Error executing sell order: {e}", exc_info=True)
             return None
     
-    def _run(self):
-        """Main bot loop."""
-        logger.info(f"Binance bot {self.bot_id} main loop started")
-        logger.info(f"Trading: {self.bot_config.symbol} ({self.bot_config.market_type})")
-        logger.info(f"Strategy: {self.bot_config.strategy}")
-        
-        if not self.bot_config or not self.strategy or not self.client:
-            logger.error("Bot configuration, strategy or client not loaded")
-            self._update_bot_status(BotStatus.ERROR.value)
-            return
-        
-        iteration = 0
-        last_buy_trade_id = None
+    def _until_next_bar(self) -> float:
+        """Seconds until the bot should analyze again: right after the current bar closes."""
+        delay = get_bot_scheduler().until_bar_close(interval_to_seconds(self.interval))
+        logger.info(f"Waiting {delay:.0f} seconds for the next {self.interval} bar close...")
+        return delay
+    
+    def _tick(self) -> Optional[float]:
+        """
+        Run one iteration of the bot loop.
         
-        while not self.stop_event.is_set():
+        Returns:
+            Seconds until the next iteration, or None to stop the bot
+        """
+        try:
+            # Get market data
+            logger.info(f"Fetching market data for {self.bot_config.symbol}...")
+            # The first window holds every buffered bar so indicators start fully warmed up
+            candles = get_market_data_hub().get_candles(
+                self.feed_key, None if self._iteration == 0 else FETCH_LIMIT
+            )
+            
+            if not candles:
+                logger.warning(f"No candles received, waiting {NO_DATA_RETRY_SECONDS} seconds...")
+                return NO_DATA_RETRY_SECONDS
+            
+            # Evaluate the bar that just closed, not the one that has just opened
+            closed = candles.closed(interval_to_seconds(self.interval))
+            closed_bar = int(closed.timestamp[-1]) if len(closed) else None
+            if closed_bar is not None and closed_bar == self._last_analyzed_bar:
+                # A stream wake already analyzed this bar; this is the bar-close timer
+                logger.debug(f"Bar {closed_bar} already analyzed")
+                return self._until_next_bar()
+            
+            self._iteration += 1
+            logger.info(f"=== Bot iteration {self._iteration} ===")
+            logger.info(f"Successfully retrieved {len(candles)} candles")
+            
+            session = get_session()
             try:
-                iteration += 1
-                logger.info(f"=== Bot iteration {iteration} ===")
+                # Check limits
+                if not self._check_limits(session):
+                    logger.info(f"Bot {self.bot_id} stopped due to limits")
+                    return None
                 
-                session = get_session()
-                try:
-                    # Check limits
-                    if not self._check_limits(session):
-                        logger.info(f"Bot {self.bot_id} stopped due to limits")
-                        break
-                    
-                    # Check current position
-                    position = self._get_current_position(session)
-                    
-                    # Get market data
-                    logger.info(f"Fetching market data for {self.bot_config.symbol}...")
-                    # Use appropriate timeframe based on strategy
-                    interval = "5m"  # 5-minute candles
-                    candles = self.client.get_klines(
-                        symbol=self.bot_config.symbol,
-                        interval=interval,
-                        limit=100
-                    )
-                    
-                    if not candles:
-                        logger.warning("No candles received, waiting 30 seconds...")
-                        time.sleep(30)
-                        continue
-                    
-                    logger.info(f"Successfully retrieved {len(candles)} candles")
-                    
-                    # Get current price
-                    current_price = self.client.get_symbol_price(self.bot_config.symbol)
-                    if not current_price:
-                        logger.warning("Could not get current price, waiting 30 seconds...")
-                        time.sleep(30)
-                        continue
-                    
-                    logger.info(f"Current price: {current_price:.2f} USDT")
-                    
-                    # Analyze with strategy
-                    logger.info(f"Analyzing market with {self.bot_config.strategy} strategy...")
-                    signal = self.strategy.analyze(candles, current_price)
+                # Check current position
+                position = self._get_current_position(session)
+                
+                # Get current price
+                current_price = self._current_price()
+                if not current_price:
+                    logger.warning(f"Could not get current price, waiting {NO_DATA_RETRY_SECONDS} seconds...")
+                    return NO_DATA_RETRY_SECONDS
+                
+                logger.info(f"Current price: {current_price:.2f} USDT")
+                
+                # Analyze with strategy
+                logger.info(f"Analyzing market with {self.bot_config.strategy} strategy...")
+                signal = self.strategy.analyze(closed, current_price)
+                self._last_analyzed_bar = closed_bar
+                
+                if signal:
+                    logger.info(f"🎯 Signal detected: {signal.signal_type} - {signal.reason} (confidence: {signal.confidence:.2f})")
                     
-                    if signal:
-                        logger.info(f"🎯 Signal detected: {signal.signal_type} - {signal.reason} (confidence: {signal.confidence:.2f})")
+                    if signal.signal_type == "BUY" and not position:
+                        # We don't have a position, buy
+                        usdt_balance = self._free_balance("USDT")
+                        logger.info(f"USDT Balance: {usdt_balance:.2f}")
                         
-                        if signal.signal_type == "BUY" and not position:
-                            # We don't have a position, buy
-                            usdt_balance = self.client.get_account_balance("USDT")
-                            logger.info(f"USDT Balance: {usdt_balance:.2f}")
-                            
-                            # Calculate position size
-                            position_size = self.strategy.get_position_size(usdt_balance)
-                            position_size = min(position_size, self.bot_config.max_amount)
-                            position_size = max(position_size, self.bot_config.initial_amount)
-                            
-                            if usdt_balance < position_size:
-                                logger.warning(f"Insufficient balance: {usdt_balance:.2f} < {position_size:.2f}")
-                            else:
-                                trade_id = self._execute_buy(position_size, signal, session)
-                                if trade_id:
-                                    last_buy_trade_id = trade_id
-                                    # Wait a bit before next analysis
-                                    time.sleep(10)
-                        
-                        elif signal.signal_type == "SELL" and position:
-                            # We have a position, sell it
-                            trade_id = self._execute_sell(
-                                position['quantity'],
-                                signal,
-                                session,
-                                entry_trade_id=last_buy_trade_id
-                            )
-                            if trade_id:
-                                last_buy_trade_id = None  # Reset after selling
-                                time.sleep(10)
+                        # Calculate position size
+                        position_size = self.strategy.get_position_size(usdt_balance)
+                        position_size = min(position_size, self.bot_config.max_amount)
+                        position_size = max(position_size, self.bot_config.initial_amount)
                         
+                        if usdt_balance < position_size:
+                            logger.warning(f"Insufficient balance: {usdt_balance:.2f} < {position_size:.2f}")
                         else:
-                            if signal.signal_type == "BUY" and position:
-                                logger.info("BUY signal but already have position, ignoring")
-                            elif signal.signal_type == "SELL" and not position:
-                                logger.info("SELL signal but no position to sell, ignoring")
-                    else:
-                        logger.info("No signal detected, continuing to monitor...")
+                            trade_id = self._execute_buy(position_size, signal, session)
+                            if trade_id:
+                                self._last_buy_trade_id = trade_id
+                    
+                    elif signal.signal_type == "SELL" and position:
+                        # We have a position, sell it
+                        trade_id = self._execute_sell(
+                            position['quantity'],
+                            signal,
+                            session,
+                            entry_trade_id=self._last_buy_trade_id
+                        )
+                        if trade_id:
+                            self._last_buy_trade_id = None  # Reset after selling
                     
-                    # Wait before next analysis (30 seconds)
-                    logger.info("Waiting 30 seconds before next analysis...")
-                    for _ in range(30):
-                        if self.stop_event.is_set():
-                            break
-                        time.sleep(1)
+                    else:
+                        if signal.signal_type == "BUY" and position:
+                            logger.info("BUY signal but already have position, ignoring")
+                        elif signal.signal_type == "SELL" and not position:
+                            logger.info("SELL signal but no position to sell, ignoring")
+                else:
+                    logger.info("No signal detected, continuing to monitor...")
                 
-                finally:
-                    session.close()
+                return self._until_next_bar()
             
-            except Exception as e:
-                logger.error(f"Error in bot loop: {e}", exc_info=True)
-                self._update_bot_status(BotStatus.ERROR.value)
-                time.sleep(60)  # Wait 1 minute before retrying
+            finally:
+                session.close()
         
+        except Exception as e:
+            logger.error(f"Error in bot loop: {e}", exc_info=True)
+            get_binance_client_pool().mark_unhealthy(self.client)
+            self._update_bot_status(BotStatus.ERROR.value)
+            return ERROR_RETRY_SECONDS  # Wait 1 minute before retrying
+    
+    def _release(self):
+        """Drop the feed, stream, account stream and client pool registrations taken by ``start``."""
+        get_market_data_hub().unsubscribe(self.feed_key, self.bot_id)
+        if self.stream:
+            self.stream.unsubscribe(self.bot_config.symbol, self.interval, self.bot_id)
+            self.stream = None
+        if self.account:
+            release_account_stream(self.client.api_key, self.bot_id)
+            self.account = None
+        get_binance_client_pool().release(self.client, self.job_key)
+    
+    def _finish(self):
+        """Release shared resources once the bot's scheduler job ends."""
+        self._release()
         self._update_bot_status(BotStatus.STOPPED.value)
         logger.info(f"Binance bot {self.bot_id} main loop ended")
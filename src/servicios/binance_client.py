@@ -1,10 +1,16 @@
 """Binance API client wrapper with authentication."""
 
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
-from decimal import Decimal, ROUND_DOWN
+
+from src.servicios.binance_exchange_info import SymbolRules, get_exchange_info_cache
+from src.servicios.binance_rate_limit import (
+    ENDPOINT_WEIGHTS, PRIORITY_ACCOUNT, PRIORITY_MARKET_DATA, PRIORITY_ORDER,
+    RateLimitExceeded, get_weight_governor
+)
+from src.servicios.candles import OHLCV
 
 logger = logging.getLogger(__name__)
 
@@ -38,12 +44,23 @@ class BinanceClientWrapper:
             self.client = Client(api_key, api_secret)
             logger.warning("Initialized Binance PRODUCTION client - real money at risk!")
         
-        self._symbol_info_cache = {}
+        self._exchange_info = get_exchange_info_cache(testnet)
+        
+        # Every request of every client on this venue shares one weight budget
+        self._governor = get_weight_governor(testnet)
+        self.client.session.hooks['response'].append(self._governor.observe)
+    
+    def _throttle(self, endpoint: str, priority: int = PRIORITY_MARKET_DATA, orders: int = 0):
+        """Wait for room in the venue's weight budget before calling ``endpoint``."""
+        if not self._governor.acquire(ENDPOINT_WEIGHTS[endpoint], priority, orders=orders, account=self.api_key):
+            raise RateLimitExceeded(f"Binance weight budget exhausted; {endpoint} not sent")
     
     def test_connection(self) -> bool:
         """Test if API credentials are valid."""
         try:
+            self._throttle('ping', PRIORITY_ACCOUNT)
             self.client.ping()
+            self._throttle('account', PRIORITY_ACCOUNT)
             account = self.client.get_account()
             logger.info(f"Connection successful. Account status: {account['accountType']}")
             return True
@@ -57,6 +74,7 @@ class BinanceClientWrapper:
     def get_account_balance(self, asset: str = "USDT") -> float:
         """Get balance for a specific asset."""
         try:
+            self._throttle('account', PRIORITY_ACCOUNT)
             balance = self.client.get_asset_balance(asset=asset)
             if balance:
                 return float(balance['free'])
@@ -68,6 +86,7 @@ class BinanceClientWrapper:
     def get_all_balances(self) -> List[Dict[str, Any]]:
         """Get all non-zero balances."""
         try:
+            self._throttle('account', PRIORITY_ACCOUNT)
             account = self.client.get_account()
             balances = []
             for balance in account['balances']:
@@ -85,29 +104,35 @@ class BinanceClientWrapper:
             logger.error(f"Error getting balances: {e}")
             return []
     
-    def get_symbol_info(self, symbol: str) -> Optional[Dict[str, Any]]:
-        """Get trading rules and info for a symbol."""
-        if symbol in self._symbol_info_cache:
-            return self._symbol_info_cache[symbol]
-        
+    def _fetch_exchange_info(self) -> Dict[str, Any]:
+        self._throttle('exchange_info')
+        return self.client.get_exchange_info()
+    
+    def get_symbol_rules(self, symbol: str) -> Optional[SymbolRules]:
+        """Get the precompiled trading rules (lot size, tick size, min notional) of a symbol."""
         try:
-            exchange_info = self.client.get_symbol_info(symbol)
-            self._symbol_info_cache[symbol] = exchange_info
-            return exchange_info
+            return self._exchange_info.get(symbol, self._fetch_exchange_info)
         except Exception as e:
             logger.error(f"Error getting symbol info for {symbol}: {e}")
             return None
     
+    def get_symbol_info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Get trading rules and info for a symbol."""
+        rules = self.get_symbol_rules(symbol)
+        return rules.info if rules else None
+    
     def get_symbol_price(self, symbol: str) -> Optional[float]:
         """Get current price for a symbol."""
         try:
+            self._throttle('ticker_price')
             ticker = self.client.get_symbol_ticker(symbol=symbol)
             return float(ticker['price'])
         except Exception as e:
             logger.error(f"Error getting price for {symbol}: {e}")
             return None
     
-    def get_klines(self, symbol: str, interval: str, limit: int = 100) -> List[Dict[str, Any]]:
+    def get_klines(self, symbol: str, interval: str, limit: int = 100,
+                   start_time: Optional[int] = None) -> OHLCV:
         """
         Get candlestick data.
         
@@ -115,58 +140,62 @@ class BinanceClientWrapper:
             symbol: Trading pair (e.g., "BTCUSDT")
             interval: Kline interval (e.g., "1m", "5m", "15m", "1h", "4h", "1d")
             limit: Number of candles to retrieve (max 1000)
+            start_time: Only return klines opened at or after this time (ms)
         
         Returns:
-            List of candle dicts with OHLCV data
+            Columnar OHLCV series (empty on error)
         """
         try:
-            klines = self.client.get_klines(symbol=symbol, interval=interval, limit=limit)
-            
-            candles = []
-            for k in klines:
-                candles.append({
-                    'timestamp': k[0],
-                    'open': float(k[1]),
-                    'high': float(k[2]),
-                    'low': float(k[3]),
-                    'close': float(k[4]),
-                    'volume': float(k[5]),
-                    'close_time': k[6],
-                    'quote_volume': float(k[7]),
-                    'trades': int(k[8])
-                })
-            
-            return candles
+            params = {'symbol': symbol, 'interval': interval, 'limit': limit}
+            if start_time is not None:
+                params['startTime'] = start_time
+            self._throttle('klines')
+            klines = self.client.get_klines(**params)
+            return OHLCV.from_klines(klines)
         except Exception as e:
             logger.error(f"Error getting klines for {symbol}: {e}")
-            return []
+            return OHLCV.empty()
     
     def _format_quantity(self, symbol: str, quantity: float) -> str:
         """Format quantity according to symbol's LOT_SIZE filter."""
-        symbol_info = self.get_symbol_info(symbol)
-        if not symbol_info:
-            return str(quantity)
-        
-        # Find LOT_SIZE filter
-        lot_size_filter = None
-        for f in symbol_info['filters']:
-            if f['filterType'] == 'LOT_SIZE':
-                lot_size_filter = f
-                break
-        
-        if lot_size_filter:
-            step_size = float(lot_size_filter['stepSize'])
-            # Calculate precision from step size
-            precision = len(str(step_size).rstrip('0').split('.')[-1])
-            
-            # Round down to step size
-            quantity_decimal = Decimal(str(quantity))
-            step_decimal = Decimal(str(step_size))
-            rounded = (quantity_decimal // step_decimal) * step_decimal
-            
-            return f"{rounded:.{precision}f}"
+        rules = self.get_symbol_rules(symbol)
+        return rules.format_quantity(quantity) if rules else str(quantity)
+    
+    def _format_price(self, symbol: str, price: float) -> str:
+        """Format price according to symbol's PRICE_FILTER."""
+        rules = self.get_symbol_rules(symbol)
+        return rules.format_price(price) if rules else str(price)
+    
+    def _meets_min_notional(self, symbol: str, quantity: Optional[float] = None,
+                            price: Optional[float] = None, quote_quantity: Optional[float] = None) -> bool:
+        """
+        Check an order against the symbol's notional filter before sending it.
         
-        return str(quantity)
+        Args:
+            symbol: Trading pair
+            quantity: Base asset amount (rounded to the step size as it will be sent)
+            price: Limit price; market orders use the current price
+            quote_quantity: Quote amount of a quoteOrderQty market buy
+        """
+        rules = self.get_symbol_rules(symbol)
+        if not rules or not rules.min_notional:
+            return True
+        market = price is None
+        if quote_quantity:
+            notional = quote_quantity
+        elif not quantity:
+            return True
+        else:
+            if market and rules.min_notional_market:
+                price = self.get_symbol_price(symbol)
+            if price is None:
+                # Nothing to check against (or the filter skips market orders)
+                return True
+            notional = float(rules.format_quantity(quantity)) * float(rules.format_price(price))
+        if rules.meets_min_notional(notional, market=market):
+            return True
+        logger.error(f"Order for {symbol} not sent: notional {notional:.8f} below the minimum {rules.min_notional}")
+        return False
     
     def create_market_buy_order(self, symbol: str, quantity: Optional[float] = None, 
                                  quote_quantity: Optional[float] = None) -> Optional[Dict[str, Any]]:
@@ -182,14 +211,18 @@ class BinanceClientWrapper:
             Order response dict or None on error
         """
         try:
+            if not self._meets_min_notional(symbol, quantity=quantity, quote_quantity=quote_quantity):
+                return None
             if quantity:
                 # Buy specific amount of base asset
                 formatted_qty = self._format_quantity(symbol, quantity)
                 logger.info(f"Creating MARKET BUY order for {symbol}: {formatted_qty}")
+                self._throttle('order', PRIORITY_ORDER, orders=1)
                 order = self.client.order_market_buy(symbol=symbol, quantity=formatted_qty)
             elif quote_quantity:
                 # Buy with specific quote amount
                 logger.info(f"Creating MARKET BUY order for {symbol}: {quote_quantity} USDT")
+                self._throttle('order', PRIORITY_ORDER, orders=1)
                 order = self.client.order_market_buy(symbol=symbol, quoteOrderQty=quote_quantity)
             else:
                 logger.error("Must specify either quantity or quote_quantity")
@@ -207,8 +240,11 @@ class BinanceClientWrapper:
     def create_market_sell_order(self, symbol: str, quantity: float) -> Optional[Dict[str, Any]]:
         """Create a market sell order."""
         try:
+            if not self._meets_min_notional(symbol, quantity=quantity):
+                return None
             formatted_qty = self._format_quantity(symbol, quantity)
             logger.info(f"Creating MARKET SELL order for {symbol}: {formatted_qty}")
+            self._throttle('order', PRIORITY_ORDER, orders=1)
             order = self.client.order_market_sell(symbol=symbol, quantity=formatted_qty)
             logger.info(f"Order executed: {order['orderId']}")
             return order
@@ -222,12 +258,15 @@ class BinanceClientWrapper:
     def create_limit_buy_order(self, symbol: str, quantity: float, price: float) -> Optional[Dict[str, Any]]:
         """Create a limit buy order."""
         try:
+            if not self._meets_min_notional(symbol, quantity=quantity, price=price):
+                return None
             formatted_qty = self._format_quantity(symbol, quantity)
             logger.info(f"Creating LIMIT BUY order for {symbol}: {formatted_qty} @ {price}")
+            self._throttle('order', PRIORITY_ORDER, orders=1)
             order = self.client.order_limit_buy(
                 symbol=symbol,
                 quantity=formatted_qty,
-                price=str(price)
+                price=self._format_price(symbol, price)
             )
             logger.info(f"Order created: {order['orderId']}")
             return order
@@ -241,12 +280,15 @@ class BinanceClientWrapper:
     def create_limit_sell_order(self, symbol: str, quantity: float, price: float) -> Optional[Dict[str, Any]]:
         """Create a limit sell order."""
         try:
+            if not self._meets_min_notional(symbol, quantity=quantity, price=price):
+                return None
             formatted_qty = self._format_quantity(symbol, quantity)
             logger.info(f"Creating LIMIT SELL order for {symbol}: {formatted_qty} @ {price}")
+            self._throttle('order', PRIORITY_ORDER, orders=1)
             order = self.client.order_limit_sell(
                 symbol=symbol,
                 quantity=formatted_qty,
-                price=str(price)
+                price=self._format_price(symbol, price)
             )
             logger.info(f"Order created: {order['orderId']}")
             return order
@@ -260,6 +302,7 @@ class BinanceClientWrapper:
     def cancel_order(self, symbol: str, order_id: int) -> bool:
         """Cancel an open order."""
         try:
+            self._throttle('cancel_order', PRIORITY_ORDER)
             self.client.cancel_order(symbol=symbol, orderId=order_id)
             logger.info(f"Order {order_id} cancelled")
             return True
@@ -270,6 +313,7 @@ class BinanceClientWrapper:
     def get_order(self, symbol: str, order_id: int) -> Optional[Dict[str, Any]]:
         """Get order status."""
         try:
+            self._throttle('get_order', PRIORITY_ACCOUNT)
             order = self.client.get_order(symbol=symbol, orderId=order_id)
             return order
         except Exception as e:
@@ -280,17 +324,32 @@ class BinanceClientWrapper:
         """Get all open orders."""
         try:
             if symbol:
+                self._throttle('open_orders', PRIORITY_ACCOUNT)
                 orders = self.client.get_open_orders(symbol=symbol)
             else:
+                self._throttle('open_orders_all', PRIORITY_ACCOUNT)
                 orders = self.client.get_open_orders()
             return orders
         except Exception as e:
             logger.error(f"Error getting open orders: {e}")
             return []
     
+    def get_account_state(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Raw account (balances) and all open orders, for seeding a user data stream snapshot.
+        
+        Unlike the other getters this raises on error, so callers can tell a
+        failed call from an empty account.
+        """
+        self._throttle('account', PRIORITY_ACCOUNT)
+        account = self.client.get_account()
+        self._throttle('open_orders_all', PRIORITY_ACCOUNT)
+        return account, self.client.get_open_orders()
+    
     def get_24h_ticker(self, symbol: str) -> Optional[Dict[str, Any]]:
         """Get 24h price change statistics."""
         try:
+            self._throttle('ticker_24h')
             ticker = self.client.get_ticker(symbol=symbol)
             return {
                 'price': float(ticker['lastPrice']),
@@ -0,0 +1,217 @@
+"""Shared Binance clients, one per API key, reused by endpoints and bots."""
+
+from __future__ import annotations
+
+import logging
+import time
+from threading import Lock
+from typing import Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from src.servicios.binance_client import BinanceClientWrapper
+from src.servicios.database import get_settings
+
+logger = logging.getLogger(__name__)
+
+# (api_key, testnet)
+ClientKey = Tuple[str, bool]
+# Builds a client for (api_key, api_secret, testnet)
+ClientFactory = Callable[[str, str, bool], BinanceClientWrapper]
+
+# Clients nobody holds and nobody asked for in this long are closed
+DEFAULT_IDLE_TTL_SECONDS = 900
+# A successful connection check is trusted for this long
+DEFAULT_HEALTH_CHECK_SECONDS = 300
+
+
+class _PooledClient:
+    __slots__ = ("client", "api_secret", "holders", "last_used", "healthy", "checked_at")
+
+    def __init__(self, client: BinanceClientWrapper, api_secret: str):
+        self.client = client
+        self.api_secret = api_secret
+        self.holders: Set[Hashable] = set()
+        self.last_used = time.monotonic()
+        self.healthy: Optional[bool] = None  # None until checked
+        self.checked_at = 0.0
+
+
+class BinanceClientPool:
+    """
+    One ``BinanceClientWrapper`` (python-binance ``Client`` and keep-alive HTTP
+    session) per API key and venue.
+
+    Building a client opens a new session and pings the server, so endpoints
+    and bots ask the pool instead. Clients held by a running bot stay open;
+    the rest are closed once unused for ``idle_ttl`` seconds. The result of
+    ``test_connection`` is cached per client for ``health_check_seconds``, and
+    a failed check is retried on the next request.
+    """
+
+    def __init__(self, idle_ttl: float = DEFAULT_IDLE_TTL_SECONDS,
+                 health_check_seconds: float = DEFAULT_HEALTH_CHECK_SECONDS,
+                 client_factory: ClientFactory = BinanceClientWrapper):
+        self.idle_ttl = idle_ttl
+        self.health_check_seconds = health_check_seconds
+        self._client_factory = client_factory
+        self._entries: Dict[ClientKey, _PooledClient] = {}
+        # Replaced clients still held by running bots
+        self._retired: List[_PooledClient] = []
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, api_key: str, api_secret: str, testnet: bool = True) -> BinanceClientWrapper:
+        """
+        Return the shared client of an API key, creating it on first use.
+
+        A different secret for a pooled key (the key was re-created) only
+        replaces the pooled client once it passes ``test_connection``; a client
+        with rejected credentials is returned unpooled, so the caller's health
+        check fails. A replaced client that running bots still hold stays open
+        until the last of them releases it.
+
+        Args:
+            api_key: Binance API key
+            api_secret: Binance API secret
+            testnet: Use testnet (True) or production (False)
+        """
+        self.evict_idle()
+        key = (api_key, testnet)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.api_secret == api_secret:
+                entry.last_used = time.monotonic()
+                return entry.client
+            replacing = entry is not None
+        # Built outside the lock: the Client constructor does a network round trip
+        client = self._client_factory(api_key, api_secret, testnet)
+        if replacing and not client.test_connection():
+            logger.warning("New secret for a pooled Binance API key was rejected; keeping the pooled client")
+            return client
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.api_secret == api_secret:
+                # Another thread built one first; keep theirs
+                stale: Optional[BinanceClientWrapper] = client
+                client = entry.client
+                entry.last_used = time.monotonic()
+            else:
+                stale = None
+                if entry is not None:
+                    if entry.holders:
+                        self._retired.append(entry)
+                    else:
+                        stale = entry.client
+                new_entry = _PooledClient(client, api_secret)
+                if replacing:
+                    new_entry.healthy, new_entry.checked_at = True, time.monotonic()
+                self._entries[key] = new_entry
+        if stale is not None:
+            _close(stale)
+        return client
+
+    def _entry(self, client: BinanceClientWrapper) -> Optional[_PooledClient]:
+        """Pooled or retired entry of ``client``."""
+        entry = self._entries.get((client.api_key, client.testnet))
+        if entry is not None and entry.client is client:
+            return entry
+        return next((retired for retired in self._retired if retired.client is client), None)
+
+    def check_health(self, client: BinanceClientWrapper, force: bool = False) -> bool:
+        """
+        Whether the client's credentials work, running ``test_connection`` only
+        when the last check is older than ``health_check_seconds`` or failed.
+
+        Args:
+            client: Client returned by ``get``
+            force: Check now even if a recent result is cached
+        """
+        entry = self._entry(client)
+        if entry is None:
+            return client.test_connection()
+        now = time.monotonic()
+        if not force and entry.healthy and now - entry.checked_at < self.health_check_seconds:
+            return True
+        entry.healthy = client.test_connection()
+        entry.checked_at = now
+        return entry.healthy
+
+    def mark_unhealthy(self, client: BinanceClientWrapper):
+        """Force a connection check the next time ``check_health`` is called."""
+        entry = self._entry(client)
+        if entry is not None:
+            entry.healthy = False
+
+    def hold(self, client: BinanceClientWrapper, holder: Hashable):
+        """Keep the client open while ``holder`` (e.g. a running bot) uses it."""
+        with self._lock:
+            entry = self._entry(client)
+            if entry is not None:
+                entry.holders.add(holder)
+                entry.last_used = time.monotonic()
+
+    def release(self, client: BinanceClientWrapper, holder: Hashable):
+        """
+        Drop a hold; the client is closed once idle for ``idle_ttl`` seconds,
+        or right away if it was replaced and this was its last holder.
+        """
+        with self._lock:
+            entry = self._entry(client)
+            if entry is None:
+                return
+            entry.holders.discard(holder)
+            entry.last_used = time.monotonic()
+            retired = not entry.holders and entry in self._retired
+            if retired:
+                self._retired.remove(entry)
+        if retired:
+            _close(client)
+
+    def evict_idle(self) -> int:
+        """Close clients nobody holds that went unused for ``idle_ttl`` seconds. Returns how many."""
+        cutoff = time.monotonic() - self.idle_ttl
+        with self._lock:
+            idle = [key for key, entry in self._entries.items()
+                    if not entry.holders and entry.last_used < cutoff]
+            evicted = [self._entries.pop(key).client for key in idle]
+        for client in evicted:
+            _close(client)
+        if evicted:
+            logger.info(f"Closed {len(evicted)} idle Binance clients")
+        return len(evicted)
+
+    def close(self):
+        with self._lock:
+            clients = [entry.client for entry in [*self._entries.values(), *self._retired]]
+            self._entries.clear()
+            self._retired.clear()
+        for client in clients:
+            _close(client)
+
+
+def _close(client: BinanceClientWrapper):
+    try:
+        client.client.close_connection()
+    except Exception as e:
+        logger.debug(f"Error closing Binance client session: {e}")
+
+
+_pool: Optional[BinanceClientPool] = None
+_pool_lock = Lock()
+
+
+def get_binance_client_pool() -> BinanceClientPool:
+    """Return the process-wide Binance client pool configured from settings.yaml."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                pool_settings = get_settings().get("binance_clients") or {}
+                _pool = BinanceClientPool(
+                    idle_ttl=float(pool_settings.get("idle_ttl_seconds", DEFAULT_IDLE_TTL_SECONDS)),
+                    health_check_seconds=float(
+                        pool_settings.get("health_check_seconds", DEFAULT_HEALTH_CHECK_SECONDS)
+                    ),
+                )
+    return _pool
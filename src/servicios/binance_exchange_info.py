@@ -0,0 +1,179 @@
+"""Binance trading rules per symbol, bulk-loaded from exchangeInfo and precompiled."""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Set
+
+from src.servicios.database import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Returns the full exchangeInfo response ({"symbols": [...], ...})
+ExchangeInfoFetcher = Callable[[], Dict[str, Any]]
+
+# Trading rules rarely change; a refresh is one request for every symbol
+DEFAULT_TTL_SECONDS = 3600
+# Wait before retrying a failed refresh while expired rules are being served
+REFRESH_RETRY_SECONDS = 60
+
+ZERO = Decimal(0)
+
+
+def _precision(step: Decimal) -> int:
+    """Decimals of a step or tick size (0.00100000 -> 3)."""
+    return max(0, -step.normalize().as_tuple().exponent) if step else 0
+
+
+def _round_down(value: float, step: Decimal) -> Decimal:
+    amount = Decimal(str(value))
+    return (amount // step) * step if step else amount
+
+
+@dataclass(slots=True)
+class SymbolRules:
+    """LOT_SIZE, PRICE_FILTER and notional filters of one symbol, ready for order formatting."""
+
+    symbol: str
+    status: str
+    base_asset: str
+    quote_asset: str
+    step_size: Decimal = ZERO
+    min_qty: Decimal = ZERO
+    max_qty: Decimal = ZERO
+    quantity_precision: int = 0
+    tick_size: Decimal = ZERO
+    min_price: Decimal = ZERO
+    max_price: Decimal = ZERO
+    price_precision: int = 0
+    min_notional: Decimal = ZERO
+    min_notional_market: bool = True
+    info: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_symbol_info(cls, info: Dict[str, Any]) -> "SymbolRules":
+        """Compile one entry of exchangeInfo's ``symbols`` list."""
+        rules = cls(info["symbol"], info.get("status", ""), info.get("baseAsset", ""),
+                    info.get("quoteAsset", ""), info=info)
+        for f in info.get("filters", []):
+            filter_type = f.get("filterType")
+            if filter_type == "LOT_SIZE":
+                rules.step_size = Decimal(f["stepSize"])
+                rules.min_qty = Decimal(f["minQty"])
+                rules.max_qty = Decimal(f["maxQty"])
+                rules.quantity_precision = _precision(rules.step_size)
+            elif filter_type == "PRICE_FILTER":
+                rules.tick_size = Decimal(f["tickSize"])
+                rules.min_price = Decimal(f["minPrice"])
+                rules.max_price = Decimal(f["maxPrice"])
+                rules.price_precision = _precision(rules.tick_size)
+            elif filter_type in ("MIN_NOTIONAL", "NOTIONAL"):
+                rules.min_notional = Decimal(f["minNotional"])
+                rules.min_notional_market = bool(f.get("applyMinToMarket", f.get("applyToMarket", True)))
+        return rules
+
+    def meets_min_notional(self, notional: float, market: bool = False) -> bool:
+        """Whether an order worth ``notional`` quote units passes the notional filter."""
+        if not self.min_notional or (market and not self.min_notional_market):
+            return True
+        return Decimal(str(notional)) >= self.min_notional
+
+    def format_quantity(self, quantity: float) -> str:
+        """Quantity rounded down to the step size, as Binance expects it."""
+        if not self.step_size:
+            return str(quantity)
+        return f"{_round_down(quantity, self.step_size):.{self.quantity_precision}f}"
+
+    def format_price(self, price: float) -> str:
+        """Price rounded down to the tick size, as Binance expects it."""
+        if not self.tick_size:
+            return str(price)
+        return f"{_round_down(price, self.tick_size):.{self.price_precision}f}"
+
+
+class ExchangeInfoCache:
+    """
+    ``SymbolRules`` of every symbol of a venue, loaded with one exchangeInfo call.
+
+    Entries are refreshed all at once when older than ``ttl``; if that fails,
+    the expired entries are used and the refresh is retried after
+    ``REFRESH_RETRY_SECONDS``. A symbol that
+    is not in the cache triggers one refresh, shared with any caller already
+    waiting for it. A symbol that is still missing afterwards is remembered as
+    unknown until the next refresh, so repeated lookups cost no requests.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL_SECONDS):
+        self.ttl = ttl
+        self._rules: Dict[str, SymbolRules] = {}
+        self._unknown: Set[str] = set()
+        self._loaded_at = 0.0
+        self._lock = Lock()
+
+    def _expired(self) -> bool:
+        return time.monotonic() - self._loaded_at > self.ttl
+
+    def get(self, symbol: str, fetch: ExchangeInfoFetcher) -> Optional[SymbolRules]:
+        """
+        Rules of ``symbol``, refreshing the cache with ``fetch`` if needed.
+
+        Args:
+            symbol: Trading pair (e.g. "BTCUSDT")
+            fetch: Loads the full exchangeInfo (any client of the venue will do)
+
+        Returns:
+            The symbol's rules, or None if the exchange does not list it
+        """
+        symbol = symbol.upper()
+        rules = self._rules.get(symbol)
+        if rules is not None and not self._expired():
+            return rules
+        if symbol in self._unknown and not self._expired():
+            return None
+        with self._lock:
+            # Another caller may have refreshed while we waited
+            if self._expired() or (symbol not in self._rules and symbol not in self._unknown):
+                try:
+                    self._load(fetch())
+                except Exception:
+                    if self._rules:
+                        # Serve the expired rules for a while instead of retrying on every call
+                        self._loaded_at = time.monotonic() - self.ttl + REFRESH_RETRY_SECONDS
+                    # Expired rules beat none while the exchange is unreachable
+                    if symbol in self._rules:
+                        logger.warning(f"Could not refresh Binance exchange info; using cached rules for {symbol}")
+                        return self._rules[symbol]
+                    raise
+            if symbol not in self._rules:
+                self._unknown.add(symbol)
+            return self._rules.get(symbol)
+
+    def _load(self, exchange_info: Dict[str, Any]):
+        self._rules = {info["symbol"]: SymbolRules.from_symbol_info(info)
+                       for info in exchange_info.get("symbols", [])}
+        self._unknown = set()
+        self._loaded_at = time.monotonic()
+        logger.info(f"Loaded trading rules for {len(self._rules)} Binance symbols")
+
+    def clear(self):
+        with self._lock:
+            self._rules, self._unknown, self._loaded_at = {}, set(), 0.0
+
+
+_caches: Dict[bool, ExchangeInfoCache] = {}
+_caches_lock = Lock()
+
+
+def get_exchange_info_cache(testnet: bool) -> ExchangeInfoCache:
+    """Return the shared exchangeInfo cache of a Binance venue."""
+    with _caches_lock:
+        cache = _caches.get(testnet)
+        if cache is None:
+            client_settings = get_settings().get("binance_clients") or {}
+            cache = ExchangeInfoCache(float(client_settings.get("exchange_info_ttl_seconds", DEFAULT_TTL_SECONDS)))
+            _caches[testnet] = cache
+        return cache
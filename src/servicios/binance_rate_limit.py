@@ -0,0 +1,197 @@
+"""Process-wide Binance request-weight and order-rate governor."""
+
+from __future__ import annotations
+
+import logging
+import time
+from threading import Condition, Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.servicios.database import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Lower runs first when the budget is tight
+PRIORITY_ORDER = 0
+PRIORITY_ACCOUNT = 1
+PRIORITY_MARKET_DATA = 2
+
+# Request weight of the spot endpoints the client wrapper calls
+ENDPOINT_WEIGHTS = {
+    "ping": 1,
+    "account": 20,
+    "exchange_info": 20,
+    "ticker_price": 2,
+    "ticker_24h": 2,
+    "klines": 2,
+    "order": 1,
+    "cancel_order": 1,
+    "get_order": 4,
+    "open_orders": 6,
+    "open_orders_all": 80,
+}
+
+# Spot limits per IP (weight per minute) and per account (orders per 10 seconds)
+DEFAULT_WEIGHT_PER_MINUTE = 6000
+DEFAULT_ORDERS_PER_10S = 100
+# Fraction of each limit the governor lets through (the rest absorbs other processes on the IP)
+DEFAULT_SAFETY_MARGIN = 0.9
+# Fraction of the weight budget only orders may use, so market data cannot starve them
+DEFAULT_ORDER_RESERVE = 0.1
+# Calls that would have to wait longer than this fail instead
+DEFAULT_MAX_WAIT_SECONDS = 30.0
+# Wait after a 429/418 that came without a Retry-After header
+DEFAULT_BAN_SECONDS = 60.0
+
+WEIGHT_WINDOW_SECONDS = 60
+ORDER_WINDOW_SECONDS = 10
+
+
+class RateLimitExceeded(Exception):
+    """A call could not be scheduled within the allowed wait."""
+
+
+class WeightGovernor:
+    """
+    Request weight and order budget shared by every Binance client of a venue.
+
+    Binance counts weight per IP in fixed one-minute windows and orders per
+    account in ten-second windows, so the budget refills at each window
+    boundary. Each call is charged its known weight before it is sent, and the
+    ``X-MBX-USED-WEIGHT-1M``/``X-MBX-ORDER-COUNT-10S`` headers of every response
+    raise the count to what the server saw (other processes on the same IP
+    included). When the budget is spent, callers wait for the next window,
+    orders first; a 429/418 stops all calls until its ``Retry-After``.
+    """
+
+    def __init__(self, weight_per_minute: int = DEFAULT_WEIGHT_PER_MINUTE,
+                 orders_per_10s: int = DEFAULT_ORDERS_PER_10S,
+                 safety_margin: float = DEFAULT_SAFETY_MARGIN,
+                 order_reserve: float = DEFAULT_ORDER_RESERVE,
+                 max_wait_seconds: float = DEFAULT_MAX_WAIT_SECONDS,
+                 clock: Callable[[], float] = time.time):
+        self.weight_budget = int(weight_per_minute * safety_margin)
+        self.order_budget = max(1, int(orders_per_10s * safety_margin))
+        self.order_reserve = order_reserve
+        self.max_wait_seconds = max_wait_seconds
+        self._clock = clock
+        self._window = -1
+        self._used = 0
+        self._orders: Dict[Optional[str], Tuple[int, int]] = {}  # account -> (window, count)
+        self._banned_until = 0.0
+        self._waiting: List[int] = [0, 0, 0]
+        self._condition = Condition(Lock())
+
+    @property
+    def used_weight(self) -> int:
+        with self._condition:
+            self._roll(self._clock())
+            return self._used
+
+    def _roll(self, now: float):
+        window = int(now // WEIGHT_WINDOW_SECONDS)
+        if window != self._window:
+            self._window, self._used = window, 0
+            self._condition.notify_all()
+
+    def _order_count(self, account: Optional[str], now: float) -> int:
+        window, count = self._orders.get(account, (-1, 0))
+        return count if window == int(now // ORDER_WINDOW_SECONDS) else 0
+
+    def _wait_time(self, weight: int, priority: int, orders: int, account: Optional[str],
+                   now: float) -> Tuple[float, bool]:
+        """
+        Seconds until the call fits (0 if it can go now), and whether that wait
+        is known. Waiting behind higher-priority calls is not: it ends when they go.
+        """
+        if self._banned_until > now:
+            return self._banned_until - now, True
+        next_window = (self._window + 1) * WEIGHT_WINDOW_SECONDS - now
+        budget = self.weight_budget if priority == PRIORITY_ORDER else \
+            int(self.weight_budget * (1 - self.order_reserve))
+        if self._used + weight > budget:
+            return next_window, True
+        if orders and self._order_count(account, now) + orders > self.order_budget:
+            return ORDER_WINDOW_SECONDS - now % ORDER_WINDOW_SECONDS, True
+        if any(self._waiting[p] for p in range(priority)):
+            return next_window, False
+        return 0.0, True
+
+    def acquire(self, weight: int, priority: int = PRIORITY_MARKET_DATA, orders: int = 0,
+                account: Optional[str] = None) -> bool:
+        """
+        Wait until a call fits the budget and charge it.
+
+        Args:
+            weight: Request weight of the endpoint (see ``ENDPOINT_WEIGHTS``)
+            priority: ``PRIORITY_ORDER``, ``PRIORITY_ACCOUNT`` or ``PRIORITY_MARKET_DATA``
+            orders: Orders the call places (counted per account)
+            account: API key the orders count against
+
+        Returns:
+            False if the call would have to wait longer than ``max_wait_seconds``
+        """
+        deadline = self._clock() + self.max_wait_seconds
+        with self._condition:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    now = self._clock()
+                    self._roll(now)
+                    wait, known = self._wait_time(weight, priority, orders, account, now)
+                    if wait <= 0:
+                        self._used += weight
+                        if orders:
+                            self._orders[account] = (int(now // ORDER_WINDOW_SECONDS),
+                                                     self._order_count(account, now) + orders)
+                        return True
+                    if now + wait > deadline and (known or now >= deadline):
+                        return False
+                    self._condition.wait(wait if known else min(wait, deadline - now))
+            finally:
+                self._waiting[priority] -= 1
+                self._condition.notify_all()
+
+    def observe(self, response: Any, *args: Any, **kwargs: Any):
+        """``requests`` response hook: sync the counters with the server's and honour bans."""
+        headers = response.headers
+        now = self._clock()
+        with self._condition:
+            self._roll(now)
+            used = headers.get("X-MBX-USED-WEIGHT-1M") or headers.get("X-MBX-USED-WEIGHT")
+            if used is not None:
+                self._used = max(self._used, int(used))
+            order_count = headers.get("X-MBX-ORDER-COUNT-10S")
+            if order_count is not None:
+                account = response.request.headers.get("X-MBX-APIKEY") if response.request is not None else None
+                if isinstance(account, bytes):
+                    account = account.decode()
+                self._orders[account] = (int(now // ORDER_WINDOW_SECONDS),
+                                         max(self._order_count(account, now), int(order_count)))
+            if response.status_code in (418, 429):
+                retry_after = float(headers.get("Retry-After") or DEFAULT_BAN_SECONDS)
+                self._banned_until = max(self._banned_until, now + retry_after)
+                logger.warning(f"Binance rate limit hit ({response.status_code}); "
+                               f"pausing requests for {retry_after:.0f}s")
+        return response
+
+
+_governors: Dict[bool, WeightGovernor] = {}
+_governors_lock = Lock()
+
+
+def get_weight_governor(testnet: bool) -> WeightGovernor:
+    """Return the governor of a Binance venue, configured from settings.yaml."""
+    with _governors_lock:
+        governor = _governors.get(testnet)
+        if governor is None:
+            limit_settings = get_settings().get("binance_rate_limit") or {}
+            governor = WeightGovernor(
+                weight_per_minute=int(limit_settings.get("weight_per_minute", DEFAULT_WEIGHT_PER_MINUTE)),
+                orders_per_10s=int(limit_settings.get("orders_per_10s", DEFAULT_ORDERS_PER_10S)),
+                safety_margin=float(limit_settings.get("safety_margin", DEFAULT_SAFETY_MARGIN)),
+                order_reserve=float(limit_settings.get("order_reserve", DEFAULT_ORDER_RESERVE)),
+                max_wait_seconds=float(limit_settings.get("max_wait_seconds", DEFAULT_MAX_WAIT_SECONDS)),
+            )
+            _governors[testnet] = governor
+        return governor
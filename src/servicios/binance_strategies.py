@@ -3,7 +3,11 @@
 import logging
 from typing import List, Dict, Any, Optional
 from abc import ABC, abstractmethod
-import ta  # Technical Analysis library
+
+import numpy as np
+
+from src.servicios.candles import OHLCV
+from src.servicios.indicators import MACD, RSI, BarSync, BollingerBands, lagged
 
 logger = logging.getLogger(__name__)
 
@@ -34,12 +38,12 @@ class BinanceStrategy(ABC):
     """Abstract base class for Binance trading strategies."""
     
     @abstractmethod
-    def analyze(self, candles: List[Dict[str, Any]], current_price: float) -> Optional[BinanceSignal]:
+    def analyze(self, candles: OHLCV, current_price: float) -> Optional[BinanceSignal]:
         """
         Analyze market data and generate trading signal.
         
         Args:
-            candles: List of candle dicts with OHLCV data
+            candles: Columnar OHLCV series, oldest bar first
             current_price: Current market price
         
         Returns:
@@ -47,6 +51,21 @@ class BinanceStrategy(ABC):
         """
         pass
     
+    def signal_series(self, candles: OHLCV, lookback: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        Signals for every bar of ``candles`` in one pass, for backtesting.
+        
+        Args:
+            candles: Columnar OHLCV series, oldest bar first
+            lookback: Bars per ``analyze`` window (all bars up to ``i`` if None)
+        
+        Returns:
+            Array where element ``i`` is what ``analyze`` returns when bar ``i``
+            is the newest bar of the window (1 = BUY, -1 = SELL, 0 = none), or
+            None if the strategy has no vectorized form and must be replayed
+        """
+        return None
+    
     @abstractmethod
     def get_position_size(self, balance: float, risk_percent: float = 2.0) -> float:
         """
@@ -83,25 +102,24 @@ class BinanceRSIStrategy(BinanceStrategy):
         self.position_size_percent = config.get('position_size_percent', 5.0)
         self.stop_loss_percent = config.get('stop_loss_percent', 3.0)
         self.take_profit_percent = config.get('take_profit_percent', 6.0)
+        self.rsi = RSI(self.rsi_period)
+        self._bar_sync = BarSync()
         
         logger.info(f"Initialized RSI strategy: period={self.rsi_period}, "
                    f"oversold={self.oversold_level}, overbought={self.overbought_level}")
     
-    def analyze(self, candles: List[Dict[str, Any]], current_price: float) -> Optional[BinanceSignal]:
+    def analyze(self, candles: OHLCV, current_price: float) -> Optional[BinanceSignal]:
         """Analyze with RSI indicator."""
         if len(candles) < self.rsi_period + 1:
             logger.warning(f"Not enough candles for RSI calculation: {len(candles)} < {self.rsi_period + 1}")
             return None
         
         try:
-            # Extract close prices
-            closes = [c['close'] for c in candles]
-            
-            # Calculate RSI using ta library
-            import pandas as pd
-            df = pd.DataFrame({'close': closes})
-            rsi = ta.momentum.RSIIndicator(df['close'], window=self.rsi_period).rsi()
-            current_rsi = rsi.iloc[-1]
+            # Commit closed bars, then evaluate the forming one
+            self._bar_sync.feed(candles, self.rsi)
+            current_rsi = self.rsi.peek(candles.last_close)
+            if current_rsi is None:
+                return None
             
             logger.info(f"Current RSI: {current_rsi:.2f}")
             
@@ -140,6 +158,15 @@ class BinanceRSIStrategy(BinanceStrategy):
             logger.error(f"Error calculating RSI: {e}", exc_info=True)
             return None
     
+    def signal_series(self, candles: OHLCV, lookback: Optional[int] = None) -> Optional[np.ndarray]:
+        """Vectorized ``analyze``: RSI level of every bar."""
+        rsi = RSI(self.rsi_period).series(candles.close)
+        signals = np.zeros(len(rsi), dtype=np.int8)
+        signals[rsi < self.oversold_level] = 1
+        signals[rsi > self.overbought_level] = -1
+        signals[:self.rsi_period] = 0
+        return signals
+    
     def get_position_size(self, balance: float, risk_percent: float = 2.0) -> float:
         """Calculate position size."""
         return balance * (self.position_size_percent / 100)
@@ -166,10 +193,12 @@ class BinanceMACDStrategy(BinanceStrategy):
         self.position_size_percent = config.get('position_size_percent', 5.0)
         self.stop_loss_percent = config.get('stop_loss_percent', 2.5)
         self.take_profit_percent = config.get('take_profit_percent', 5.0)
+        self.macd = MACD(self.fast_period, self.slow_period, self.signal_period)
+        self._bar_sync = BarSync()
         
         logger.info(f"Initialized MACD strategy: {self.fast_period}/{self.slow_period}/{self.signal_period}")
     
-    def analyze(self, candles: List[Dict[str, Any]], current_price: float) -> Optional[BinanceSignal]:
+    def analyze(self, candles: OHLCV, current_price: float) -> Optional[BinanceSignal]:
         """Analyze with MACD indicator."""
         min_candles = self.slow_period + self.signal_period + 1
         if len(candles) < min_candles:
@@ -177,30 +206,15 @@ class BinanceMACDStrategy(BinanceStrategy):
             return None
         
         try:
-            import pandas as pd
-            closes = [c['close'] for c in candles]
-            df = pd.DataFrame({'close': closes})
-            
-            # Calculate MACD
-            macd_indicator = ta.trend.MACD(
-                df['close'],
-                window_fast=self.fast_period,
-                window_slow=self.slow_period,
-                window_sign=self.signal_period
-            )
-            
-            macd_line = macd_indicator.macd()
-            signal_line = macd_indicator.macd_signal()
-            histogram = macd_indicator.macd_diff()
+            self._bar_sync.feed(candles, self.macd)
             
-            # Get last two values to detect crossovers
-            current_macd = macd_line.iloc[-1]
-            current_signal = signal_line.iloc[-1]
-            current_hist = histogram.iloc[-1]
+            # Previous values are the committed bar, current ones the forming bar
+            current_macd, current_signal, current_hist = self.macd.peek_all(candles.last_close)
+            prev_macd = self.macd.value
+            prev_signal = self.macd.signal
             
-            prev_macd = macd_line.iloc[-2]
-            prev_signal = signal_line.iloc[-2]
-            prev_hist = histogram.iloc[-2]
+            if None in (current_macd, current_signal, prev_macd, prev_signal):
+                return None
             
             logger.info(f"MACD: {current_macd:.4f}, Signal: {current_signal:.4f}, Hist: {current_hist:.4f}")
             
@@ -238,6 +252,16 @@ class BinanceMACDStrategy(BinanceStrategy):
             logger.error(f"Error calculating MACD: {e}", exc_info=True)
             return None
     
+    def signal_series(self, candles: OHLCV, lookback: Optional[int] = None) -> Optional[np.ndarray]:
+        """Vectorized ``analyze``: MACD/signal line crossovers of every bar."""
+        macd, signal, _ = MACD(self.fast_period, self.slow_period, self.signal_period).series_all(candles.close)
+        prev_macd, prev_signal = lagged(macd), lagged(signal)
+        signals = np.zeros(len(macd), dtype=np.int8)
+        signals[(prev_macd < prev_signal) & (macd > signal)] = 1
+        signals[(prev_macd > prev_signal) & (macd < signal)] = -1
+        signals[:self.slow_period + self.signal_period] = 0
+        return signals
+    
     def get_position_size(self, balance: float, risk_percent: float = 2.0) -> float:
         """Calculate position size."""
         return balance * (self.position_size_percent / 100)
@@ -262,30 +286,22 @@ class BinanceBollingerBandsStrategy(BinanceStrategy):
         self.position_size_percent = config.get('position_size_percent', 5.0)
         self.stop_loss_percent = config.get('stop_loss_percent', 3.0)
         self.take_profit_percent = config.get('take_profit_percent', 4.0)
+        self.bands = BollingerBands(self.period, self.std_dev)
+        self._bar_sync = BarSync()
         
         logger.info(f"Initialized Bollinger Bands strategy: period={self.period}, std_dev={self.std_dev}")
     
-    def analyze(self, candles: List[Dict[str, Any]], current_price: float) -> Optional[BinanceSignal]:
+    def analyze(self, candles: OHLCV, current_price: float) -> Optional[BinanceSignal]:
         """Analyze with Bollinger Bands."""
         if len(candles) < self.period + 1:
             logger.warning(f"Not enough candles for BB: {len(candles)} < {self.period + 1}")
             return None
         
         try:
-            import pandas as pd
-            closes = [c['close'] for c in candles]
-            df = pd.DataFrame({'close': closes})
-            
-            # Calculate Bollinger Bands
-            bb_indicator = ta.volatility.BollingerBands(
-                df['close'],
-                window=self.period,
-                window_dev=self.std_dev
-            )
-            
-            upper_band = bb_indicator.bollinger_hband().iloc[-1]
-            lower_band = bb_indicator.bollinger_lband().iloc[-1]
-            middle_band = bb_indicator.bollinger_mavg().iloc[-1]
+            self._bar_sync.feed(candles, self.bands)
+            upper_band, middle_band, lower_band = self.bands.peek_bands(candles.last_close)
+            if middle_band is None:
+                return None
             
             logger.info(f"BB: Upper={upper_band:.2f}, Middle={middle_band:.2f}, Lower={lower_band:.2f}, Price={current_price:.2f}")
             
@@ -325,6 +341,17 @@ class BinanceBollingerBandsStrategy(BinanceStrategy):
             logger.error(f"Error calculating Bollinger Bands: {e}", exc_info=True)
             return None
     
+    def signal_series(self, candles: OHLCV, lookback: Optional[int] = None) -> Optional[np.ndarray]:
+        """Vectorized ``analyze``: closes touching the bands at every bar."""
+        closes = candles.close
+        upper, _, lower = BollingerBands(self.period, self.std_dev).series_bands(closes)
+        signals = np.zeros(len(closes), dtype=np.int8)
+        signals[closes >= upper] = -1
+        # Checked first in analyze, so it wins when both bands collapse onto the price
+        signals[closes <= lower] = 1
+        signals[:self.period] = 0
+        return signals
+    
     def get_position_size(self, balance: float, risk_percent: float = 2.0) -> float:
         """Calculate position size."""
         return balance * (self.position_size_percent / 100)
@@ -0,0 +1,245 @@
+"""Binance market data pushed over one multiplexed websocket per venue."""
+
+from __future__ import annotations
+
+import logging
+import time
+from threading import Lock, Thread, Timer
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from src.servicios.candles import OHLCV
+from src.servicios.database import get_settings
+from src.servicios.market_data import FeedKey, get_market_data_hub
+
+logger = logging.getLogger(__name__)
+
+# Called when a bar of a subscribed (symbol, interval) closes, i.e. the next one opens
+BarCallback = Callable[[], None]
+# Builds the websocket manager; defaults to python-binance's ThreadedWebsocketManager
+ManagerFactory = Callable[[bool], Any]
+
+# Book ticker prices older than this are not trusted (callers fall back to REST)
+DEFAULT_PRICE_MAX_AGE_SECONDS = 10.0
+# Subscription changes within this window share one socket restart (e.g. many bots starting)
+RESUBSCRIBE_DELAY_SECONDS = 0.5
+# Wait before reopening a socket that reported an error
+RECONNECT_SECONDS = 5.0
+
+
+def _default_manager(testnet: bool) -> Any:
+    from binance import ThreadedWebsocketManager
+
+    manager = ThreadedWebsocketManager(testnet=testnet)
+    manager.start()
+    return manager
+
+
+def kline_to_candles(kline: Dict[str, Any]) -> OHLCV:
+    """One-bar series from the ``k`` object of a kline stream event."""
+    return OHLCV(
+        [int(kline["t"])],
+        [float(kline["o"])],
+        [float(kline["h"])],
+        [float(kline["l"])],
+        [float(kline["c"])],
+        [float(kline["v"])],
+    )
+
+
+class BinanceMarketStream:
+    """
+    Kline and book ticker streams of every symbol bots trade on one Binance venue.
+
+    All ``<symbol>@kline_<interval>`` and ``<symbol>@bookTicker`` streams share
+    one multiplexed connection. Klines are pushed into the market data hub
+    feeds (the same feeds the REST fetchers fill), book tickers keep the latest
+    bid/ask per symbol, and subscribers are called as soon as a bar closes:
+    on the first kline of the next bar, once the final kline of the closed one
+    is in the feed, so ``OHLCV.closed`` gives them the window ending at it.
+    Bars missed while disconnected are recovered with a REST refresh of the
+    feed before streaming resumes; while the stream is down, feeds simply go
+    stale and fall back to REST.
+    """
+
+    def __init__(self, testnet: bool, price_max_age_seconds: float = DEFAULT_PRICE_MAX_AGE_SECONDS,
+                 manager_factory: ManagerFactory = _default_manager):
+        self.testnet = testnet
+        self.venue = "binance-testnet" if testnet else "binance"
+        self.price_max_age_seconds = price_max_age_seconds
+        self._manager_factory = manager_factory
+        self._manager: Any = None
+        self._socket: Optional[str] = None
+        self._streams: Tuple[str, ...] = ()
+        self._subscribers: Dict[Tuple[str, str], Dict[Hashable, Optional[BarCallback]]] = {}
+        self._books: Dict[str, Tuple[float, float, float]] = {}  # symbol -> (bid, ask, monotonic time)
+        self._bar_open: Dict[Tuple[str, str], int] = {}
+        self._gap_filling: Set[FeedKey] = set()
+        self._timer: Optional[Timer] = None
+        self._lock = Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self._socket is not None
+
+    def subscribe(self, symbol: str, interval: str, subscriber_id: Hashable,
+                  on_bar: Optional[BarCallback] = None):
+        """
+        Stream ``symbol``/``interval`` for a subscriber.
+
+        Args:
+            symbol: Trading pair (e.g. "BTCUSDT")
+            interval: Kline interval (e.g. "1m")
+            subscriber_id: Unique ID of the subscriber (e.g. the bot ID)
+            on_bar: Optional callback run when a bar closes (see the class docstring)
+        """
+        with self._lock:
+            self._subscribers.setdefault((symbol.upper(), interval), {})[subscriber_id] = on_bar
+        self._schedule_resubscribe()
+
+    def unsubscribe(self, symbol: str, interval: str, subscriber_id: Hashable):
+        with self._lock:
+            key = (symbol.upper(), interval)
+            subscribers = self._subscribers.get(key, {})
+            subscribers.pop(subscriber_id, None)
+            if not subscribers:
+                self._subscribers.pop(key, None)
+                self._bar_open.pop(key, None)
+        self._schedule_resubscribe()
+
+    def get_book(self, symbol: str) -> Optional[Tuple[float, float]]:
+        """Latest (bid, ask) of ``symbol``, or None if not streamed recently."""
+        book = self._books.get(symbol.upper())
+        if book is None or time.monotonic() - book[2] > self.price_max_age_seconds:
+            return None
+        return book[0], book[1]
+
+    def get_price(self, symbol: str) -> Optional[float]:
+        """Mid price of ``symbol`` from the book ticker, or None if not streamed recently."""
+        book = self.get_book(symbol)
+        return (book[0] + book[1]) / 2 if book else None
+
+    def _wanted_streams(self) -> Tuple[str, ...]:
+        with self._lock:
+            keys = list(self._subscribers)
+        streams = {f"{symbol.lower()}@kline_{interval}" for symbol, interval in keys}
+        streams.update(f"{symbol.lower()}@bookTicker" for symbol, _ in keys)
+        return tuple(sorted(streams))
+
+    def _schedule_resubscribe(self, delay: float = RESUBSCRIBE_DELAY_SECONDS):
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = Timer(delay, self._resubscribe)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _resubscribe(self, force: bool = False):
+        """Open a socket for the wanted streams and close the previous one."""
+        with self._lock:
+            self._timer = None
+        streams = self._wanted_streams()
+        if streams == self._streams and self._socket is not None and not force:
+            return
+
+        old_socket, self._socket, self._streams = self._socket, None, streams
+        try:
+            if streams:
+                if self._manager is None:
+                    self._manager = self._manager_factory(self.testnet)
+                self._socket = self._manager.start_multiplex_socket(callback=self._handle, streams=list(streams))
+                logger.info(f"Binance stream ({self.venue}) subscribed to {len(streams)} streams")
+        except Exception as e:
+            logger.error(f"Could not open Binance stream ({self.venue}): {e}")
+            self._schedule_resubscribe(RECONNECT_SECONDS)
+        if old_socket is not None:
+            try:
+                self._manager.stop_socket(old_socket)
+            except Exception as e:
+                logger.debug(f"Error closing Binance stream socket: {e}")
+
+    def _handle(self, message: Dict[str, Any]):
+        """Websocket callback for every multiplexed message."""
+        try:
+            data = message.get("data", message)
+            if data.get("e") == "error":
+                logger.warning(f"Binance stream ({self.venue}) error: {data.get('m')}; reconnecting")
+                self._socket = None
+                self._schedule_resubscribe(RECONNECT_SECONDS)
+            elif data.get("e") == "kline":
+                self._on_kline(data["k"])
+            elif "b" in data and "a" in data:
+                self._books[data["s"]] = (float(data["b"]), float(data["a"]), time.monotonic())
+        except Exception as e:
+            logger.error(f"Error handling Binance stream message: {e}", exc_info=True)
+
+    def _on_kline(self, kline: Dict[str, Any]):
+        symbol, interval, open_time = kline["s"], kline["i"], int(kline["t"])
+        key: FeedKey = (self.venue, symbol, interval)
+        feed = get_market_data_hub().get_feed(key)
+        candles = kline_to_candles(kline)
+        if feed is not None and key not in self._gap_filling:
+            if not feed.push(candles, closed=bool(kline.get("x"))):
+                self._fill_gap(key, candles)
+
+        previous = self._bar_open.get((symbol, interval))
+        self._bar_open[(symbol, interval)] = open_time
+        if previous is not None and open_time > previous:
+            with self._lock:
+                callbacks = [cb for cb in self._subscribers.get((symbol, interval), {}).values() if cb]
+            for callback in callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error(f"Bar callback for {symbol} {interval} failed: {e}", exc_info=True)
+
+    def _fill_gap(self, key: FeedKey, candles: OHLCV):
+        """Recover bars missed while disconnected with a REST refresh, off the socket thread."""
+        self._gap_filling.add(key)
+
+        def fill():
+            try:
+                feed = get_market_data_hub().get_feed(key)
+                if feed is not None:
+                    logger.info(f"Binance stream gap on {key}; refreshing over REST")
+                    feed.refresh(force=True)
+                    feed.push(candles)
+            finally:
+                self._gap_filling.discard(key)
+
+        Thread(target=fill, name="binance-stream-gap", daemon=True).start()
+
+    def close(self):
+        """Close the socket and stop the websocket manager."""
+        with self._lock:
+            self._subscribers.clear()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if self._manager is not None:
+            try:
+                self._manager.stop()
+            except Exception as e:
+                logger.debug(f"Error stopping Binance websocket manager: {e}")
+        self._manager, self._socket, self._streams = None, None, ()
+
+
+_streams: Dict[bool, BinanceMarketStream] = {}
+_streams_lock = Lock()
+
+
+def get_binance_stream(testnet: bool) -> Optional[BinanceMarketStream]:
+    """Return the shared market stream of a Binance venue, or None if streaming is disabled."""
+    stream_settings = get_settings().get("binance_stream") or {}
+    if not stream_settings.get("enabled", True):
+        return None
+    with _streams_lock:
+        stream = _streams.get(testnet)
+        if stream is None:
+            stream = BinanceMarketStream(
+                testnet,
+                price_max_age_seconds=float(
+                    stream_settings.get("price_max_age_seconds", DEFAULT_PRICE_MAX_AGE_SECONDS)
+                ),
+            )
+            _streams[testnet] = stream
+        return stream
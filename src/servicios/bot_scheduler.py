@@ -0,0 +1,195 @@
+"""Single event-loop scheduler that runs the ticks of every bot in the process."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Event, Lock, Thread
+from typing import Callable, Dict, Hashable, Optional
+
+from src.servicios.database import get_settings
+
+logger = logging.getLogger(__name__)
+
+# A tick does one unit of bot work and returns the seconds until the next one,
+# or None when the bot should stop. Ticks run on the executor, never on the loop.
+BotTick = Callable[[], Optional[float]]
+
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_BAR_CLOSE_OFFSET = 2.0
+ERROR_RETRY_SECONDS = 60.0
+
+
+def seconds_until_bar_close(timeframe_seconds: float, offset: float = 0.0,
+                            now: Optional[float] = None) -> float:
+    """
+    Seconds until ``offset`` seconds after the next close of a bar of ``timeframe_seconds``.
+
+    Bars are aligned to the epoch, as IQ Option and Binance candles are.
+    """
+    now = time.time() if now is None else now
+    next_wake = math.ceil((now - offset) / timeframe_seconds) * timeframe_seconds + offset
+    if next_wake <= now:
+        next_wake += timeframe_seconds
+    return next_wake - now
+
+
+class _Job:
+    def __init__(self, key: Hashable, tick: BotTick, stop_event: Event,
+                 on_exit: Optional[Callable[[], None]]):
+        self.key = key
+        self.tick = tick
+        self.stop_event = stop_event
+        self.on_exit = on_exit
+        self.wake: Optional[asyncio.Event] = None
+        self.done: Future = Future()
+
+
+class BotScheduler:
+    """
+    Runs bot ticks as coroutines on one asyncio loop in a background thread.
+
+    Waiting between ticks is an event-loop timer, so an idle bot costs a
+    suspended coroutine instead of an OS thread. The ticks themselves call
+    blocking SDKs and the database, so they run on a bounded thread pool that
+    caps how many bots do work at the same time.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS,
+                 bar_close_offset: float = DEFAULT_BAR_CLOSE_OFFSET):
+        self.max_workers = max_workers
+        self.bar_close_offset = bar_close_offset
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bot-tick")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[Thread] = None
+        self._jobs: Dict[Hashable, _Job] = {}
+        self._lock = Lock()
+
+    @property
+    def job_count(self) -> int:
+        return len(self._jobs)
+
+    def until_bar_close(self, timeframe_seconds: float) -> float:
+        """Delay a tick should return to run again right after the current bar closes."""
+        return seconds_until_bar_close(timeframe_seconds, self.bar_close_offset)
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                self._thread = Thread(target=run, name="bot-scheduler", daemon=True)
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+                logger.info(f"Bot scheduler started with {self.max_workers} workers")
+            return self._loop
+
+    def add(self, key: Hashable, tick: BotTick, stop_event: Event,
+            on_exit: Optional[Callable[[], None]] = None, first_delay: float = 0.0) -> bool:
+        """
+        Schedule a bot.
+
+        Args:
+            key: Unique job key (e.g. ("iqoption", bot_id))
+            tick: Callable run on the executor; returns the next delay or None to finish
+            stop_event: Setting this event ends the job after the current tick
+            on_exit: Optional callable run on the executor once the job ends
+            first_delay: Seconds to wait before the first tick
+
+        Returns:
+            False if a job with the same key is already scheduled
+        """
+        loop = self._ensure_loop()
+        with self._lock:
+            if key in self._jobs:
+                return False
+            job = _Job(key, tick, stop_event, on_exit)
+            self._jobs[key] = job
+        asyncio.run_coroutine_threadsafe(self._run(job, first_delay), loop)
+        return True
+
+    def cancel(self, key: Hashable, timeout: Optional[float] = 10) -> bool:
+        """
+        Stop a job and wait up to ``timeout`` seconds for its current tick to finish.
+
+        Returns:
+            True if the job ended within the timeout
+        """
+        job = self._jobs.get(key)
+        if job is None:
+            return True
+        job.stop_event.set()
+        self.wake(key)
+        try:
+            job.done.result(timeout=timeout)
+            return True
+        except Exception:
+            logger.warning(f"Bot job {key} did not finish within {timeout}s")
+            return False
+
+    def wake(self, key: Hashable):
+        """Run the next tick of a job now instead of waiting for its timer."""
+        job = self._jobs.get(key)
+        if job is not None and self._loop is not None:
+            self._loop.call_soon_threadsafe(lambda: job.wake and job.wake.set())
+
+    async def _sleep(self, job: _Job, delay: float):
+        try:
+            await asyncio.wait_for(job.wake.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+        job.wake.clear()
+
+    async def _run(self, job: _Job, first_delay: float):
+        loop = asyncio.get_running_loop()
+        job.wake = asyncio.Event()
+        try:
+            delay = first_delay
+            while not job.stop_event.is_set():
+                if delay > 0:
+                    await self._sleep(job, delay)
+                    if job.stop_event.is_set():
+                        break
+                try:
+                    delay = await loop.run_in_executor(self._executor, job.tick)
+                except Exception as e:
+                    logger.error(f"Unhandled error in bot job {job.key}: {e}", exc_info=True)
+                    delay = ERROR_RETRY_SECONDS
+                if delay is None:
+                    break
+            if job.on_exit:
+                await loop.run_in_executor(self._executor, job.on_exit)
+        except Exception as e:
+            logger.error(f"Error finishing bot job {job.key}: {e}", exc_info=True)
+        finally:
+            with self._lock:
+                self._jobs.pop(job.key, None)
+            job.done.set_result(None)
+
+
+_scheduler: Optional[BotScheduler] = None
+_scheduler_lock = Lock()
+
+
+def get_bot_scheduler() -> BotScheduler:
+    """Return the process-wide bot scheduler configured from settings.yaml."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                scheduler_settings = get_settings().get("scheduler") or {}
+                _scheduler = BotScheduler(
+                    max_workers=int(scheduler_settings.get("max_workers", DEFAULT_MAX_WORKERS)),
+                    bar_close_offset=float(scheduler_settings.get("bar_close_offset", DEFAULT_BAR_CLOSE_OFFSET)),
+                )
+    return _scheduler
@@ -0,0 +1,230 @@
+"""On-disk store of closed candles in append-only, memory-mapped column files."""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from threading import BoundedSemaphore, Lock, RLock
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from src.servicios.candles import OHLCV, interval_to_seconds
+from src.servicios.database import get_settings
+
+logger = logging.getLogger(__name__)
+
+# (venue, instrument, timeframe), the same key as market_data.FeedKey
+HistoryKey = Tuple[str, str, str]
+
+# Called with an open time (ms) and expected to return the next bars opened at
+# or after it, oldest first (an empty series once there is nothing newer)
+PageFetcher = Callable[[int], OHLCV]
+
+DEFAULT_PATH = "data/candles"
+# Little-endian on disk whatever the host, so files can be copied between machines
+COLUMN_DTYPES = {name: np.dtype("<i8" if name == "timestamp" else "<f8") for name in OHLCV.__slots__}
+# Bars per request when backfilling (the maximum both APIs return)
+BINANCE_PAGE_SIZE = 1000
+IQOPTION_PAGE_SIZE = 1000
+# Backfills hitting the exchanges at the same time (e.g. many bots started after a deploy)
+DEFAULT_MAX_CONCURRENT_BACKFILLS = 4
+
+
+class CandleHistory:
+    """
+    Historical candles per (venue, instrument, timeframe), one directory per key.
+
+    Each OHLCV column is a raw little-endian file (``timestamp.i8``,
+    ``close.f8``, ...) that only ever grows, so appending is a plain write and
+    reading is a memory map: ``read`` returns views into the page cache
+    without copying or parsing anything. Only closed bars are stored.
+    """
+
+    def __init__(self, root: str = DEFAULT_PATH,
+                 max_concurrent_backfills: int = DEFAULT_MAX_CONCURRENT_BACKFILLS):
+        self.root = root
+        self._locks: Dict[HistoryKey, RLock] = {}
+        self._locks_lock = Lock()
+        self._backfill_slots = BoundedSemaphore(max_concurrent_backfills)
+
+    def _lock(self, key: HistoryKey) -> RLock:
+        with self._locks_lock:
+            return self._locks.setdefault(key, RLock())
+
+    def directory(self, key: HistoryKey) -> str:
+        venue, instrument, timeframe = key
+        return os.path.join(self.root, venue, instrument.replace("/", "_"), timeframe)
+
+    def _column_path(self, key: HistoryKey, name: str) -> str:
+        return os.path.join(self.directory(key), f"{name}.{COLUMN_DTYPES[name].str[1:]}")
+
+    def count(self, key: HistoryKey) -> int:
+        """Number of stored bars (columns cut short by an interrupted append are ignored)."""
+        sizes = []
+        for name, dtype in COLUMN_DTYPES.items():
+            path = self._column_path(key, name)
+            sizes.append(os.path.getsize(path) // dtype.itemsize if os.path.exists(path) else 0)
+        return min(sizes)
+
+    def read(self, key: HistoryKey, start: Optional[int] = None, end: Optional[int] = None) -> OHLCV:
+        """
+        Stored bars opened in [start, end) (ms), as read-only memory-mapped views.
+
+        Args:
+            key: (venue, instrument, timeframe)
+            start: First open time to include (all bars if None)
+            end: Open time to stop before (up to the newest bar if None)
+        """
+        count = self.count(key)
+        if count == 0:
+            return OHLCV.empty()
+        candles = OHLCV(*(np.memmap(self._column_path(key, name), dtype=dtype, mode="r", shape=(count,))
+                          for name, dtype in COLUMN_DTYPES.items()))
+        first = 0 if start is None else int(np.searchsorted(candles.timestamp, start, side="left"))
+        last = count if end is None else int(np.searchsorted(candles.timestamp, end, side="left"))
+        return candles[first:last]
+
+    def last_timestamp(self, key: HistoryKey) -> Optional[int]:
+        """Open time (ms) of the newest stored bar, or None if nothing is stored."""
+        count = self.count(key)
+        if count == 0:
+            return None
+        with open(self._column_path(key, "timestamp"), "rb") as f:
+            f.seek((count - 1) * COLUMN_DTYPES["timestamp"].itemsize)
+            return int(np.frombuffer(f.read(COLUMN_DTYPES["timestamp"].itemsize), dtype=COLUMN_DTYPES["timestamp"])[0])
+
+    def append(self, key: HistoryKey, candles: OHLCV) -> int:
+        """
+        Append closed bars newer than the newest stored one.
+
+        Args:
+            key: (venue, instrument, timeframe)
+            candles: Chronologically sorted closed bars; older or duplicate bars are skipped
+
+        Returns:
+            Number of bars appended
+        """
+        with self._lock(key):
+            last_timestamp = self.last_timestamp(key)
+            if last_timestamp is not None:
+                candles = candles[int(np.searchsorted(candles.timestamp, last_timestamp, side="right")):]
+            if not len(candles):
+                return 0
+
+            os.makedirs(self.directory(key), exist_ok=True)
+            count = self.count(key)
+            for name, dtype in COLUMN_DTYPES.items():
+                with open(self._column_path(key, name), "ab") as f:
+                    # Drop the tail of a column written by an interrupted append
+                    f.truncate(count * dtype.itemsize)
+                    f.write(np.ascontiguousarray(getattr(candles, name), dtype=dtype).tobytes())
+            return len(candles)
+
+    def backfill(self, key: HistoryKey, fetch_page: PageFetcher, start: Optional[int] = None,
+                 end: Optional[int] = None) -> int:
+        """
+        Download closed bars page by page, from the newest stored bar (or ``start``
+        if that is later) up to ``end``.
+
+        Backfills of the same key run one at a time, so a second caller finds the
+        bars the first one stored instead of downloading them again.
+
+        Args:
+            key: (venue, instrument, timeframe)
+            fetch_page: Venue page fetcher, e.g. from ``binance_page_fetcher``
+            start: Open time (ms) to start from when nothing newer is stored
+            end: Stop once bars open at or after this time (ms); defaults to now
+
+        Returns:
+            Number of bars appended
+        """
+        timeframe_ms = interval_to_seconds(key[2]) * 1000
+        with self._lock(key):
+            last_timestamp = self.last_timestamp(key)
+            cursor = last_timestamp + timeframe_ms if last_timestamp is not None else None
+            if start is not None:
+                cursor = start if cursor is None else max(cursor, start)
+            if cursor is None:
+                raise ValueError("start is required when the history is empty")
+            now_ms = int(time.time() * 1000)
+            end = now_ms if end is None else min(end, now_ms)
+
+            appended = 0
+            # Only ask while a bar that has closed by now can be missing
+            while cursor < end and cursor + timeframe_ms <= now_ms:
+                with self._backfill_slots:
+                    page = fetch_page(cursor)
+                # Keep bars of the requested range that have already closed
+                keep = (page.timestamp >= cursor) & (page.timestamp < end) & (page.timestamp + timeframe_ms <= now_ms)
+                page = OHLCV(*(getattr(page, name)[keep] for name in OHLCV.__slots__))
+                if not len(page):
+                    break
+                appended += self.append(key, page)
+                cursor = int(page.timestamp[-1]) + timeframe_ms
+        if appended:
+            logger.info(f"Backfilled {appended} bars for {key}")
+        return appended
+
+    def catch_up(self, key: HistoryKey, fetch_page: PageFetcher, bars: int) -> OHLCV:
+        """
+        The newest ``bars`` closed bars, downloading only those not stored yet.
+
+        Used to warm-start candle feeds: with a current store this is at most
+        one short request per key, however many bots start.
+        """
+        timeframe_ms = interval_to_seconds(key[2]) * 1000
+        since = (int(time.time() * 1000) // timeframe_ms - bars) * timeframe_ms
+        self.backfill(key, fetch_page, start=since)
+        return self.read(key, start=since)
+
+
+def binance_page_fetcher(client: Any, symbol: str, interval: str) -> PageFetcher:
+    """Page fetcher over ``BinanceClient.get_klines``."""
+    def fetch(since: int) -> OHLCV:
+        return client.get_klines(symbol, interval, limit=BINANCE_PAGE_SIZE, start_time=since)
+    return fetch
+
+
+def iqoption_page_fetcher(client: Any, active_id: str, timeframe: str) -> PageFetcher:
+    """
+    Page fetcher over the IQ Option SDK's ``get_candles``.
+
+    ``get_candles`` returns the bars before an end time, so each page asks for
+    the ``IQOPTION_PAGE_SIZE`` bars after ``since`` and moves on through
+    ranges without bars (closed markets) until it finds some or reaches now.
+    """
+    seconds = interval_to_seconds(timeframe)
+
+    def fetch(since: int) -> OHLCV:
+        page_start = since / 1000
+        while page_start < time.time():
+            end_time = min(page_start + IQOPTION_PAGE_SIZE * seconds, time.time())
+            candles = OHLCV.from_iq_candles(client.get_candles(active_id, seconds, IQOPTION_PAGE_SIZE, end_time))
+            candles = candles[int(np.searchsorted(candles.timestamp, since, side="left")):]
+            if len(candles):
+                return candles
+            page_start = end_time
+        return OHLCV.empty()
+    return fetch
+
+
+_history: Optional[CandleHistory] = None
+_history_lock = Lock()
+
+
+def get_candle_history() -> CandleHistory:
+    """Return the process-wide candle history configured from settings.yaml."""
+    global _history
+    if _history is None:
+        with _history_lock:
+            if _history is None:
+                history_settings = get_settings().get("history") or {}
+                _history = CandleHistory(
+                    history_settings.get("path", DEFAULT_PATH),
+                    max_concurrent_backfills=int(
+                        history_settings.get("max_concurrent_backfills", DEFAULT_MAX_CONCURRENT_BACKFILLS)
+                    ),
+                )
+    return _history
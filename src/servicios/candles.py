@@ -0,0 +1,195 @@
+"""Candle containers backed by NumPy arrays."""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+FIELDS = ("open", "high", "low", "close", "volume")
+
+_INTERVAL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800, "M": 2592000}
+
+
+def interval_to_seconds(interval: str) -> int:
+    """Convert a timeframe string such as "1m", "5m", "4h" or "1d" to seconds."""
+    try:
+        return int(interval[:-1]) * _INTERVAL_UNITS[interval[-1]]
+    except (KeyError, ValueError, IndexError):
+        raise ValueError(f"Invalid interval: {interval}")
+
+
+class OHLCV:
+    """
+    Columnar candle series.
+
+    Holds contiguous float64 arrays for open/high/low/close/volume and an int64
+    array of bar open times (epoch milliseconds), oldest bar first. Slicing
+    returns views, so passing windows of a series around never copies data.
+    """
+
+    __slots__ = ("timestamp",) + FIELDS
+
+    def __init__(self, timestamp: Any, open: Any, high: Any, low: Any, close: Any, volume: Any):
+        self.timestamp = np.asarray(timestamp, dtype=np.int64)
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+
+    @classmethod
+    def empty(cls) -> "OHLCV":
+        return cls(*([[]] * 6))
+
+    @classmethod
+    def from_dicts(cls, candles: Iterable[Dict[str, Any]]) -> "OHLCV":
+        """Build a series from candle dicts with timestamp/open/high/low/close/volume keys."""
+        candles = list(candles)
+        return cls(
+            [int(c.get("timestamp") or 0) for c in candles],
+            *([float(c.get(field) or 0.0) for c in candles] for field in FIELDS),
+        )
+
+    @classmethod
+    def from_klines(cls, klines: Sequence[Sequence[Any]]) -> "OHLCV":
+        """Build a series from raw Binance kline rows ([open_time, open, high, low, close, volume, ...])."""
+        if not klines:
+            return cls.empty()
+        rows = np.asarray([k[:6] for k in klines], dtype=object)
+        return cls(rows[:, 0].astype(np.int64), *(rows[:, i].astype(np.float64) for i in range(1, 6)))
+
+    @classmethod
+    def from_iq_candles(cls, candles: Any) -> "OHLCV":
+        """Build a series from IQ Option ``get_candles`` output (``from`` in seconds, ``min``/``max``)."""
+        if not candles or not isinstance(candles, list):
+            return cls.empty()
+        # Candles may come as dicts or objects read by attribute
+        rows = [c if isinstance(c, dict) else vars(c) for c in candles]
+        rows = [r for r in rows if r.get("from")]
+        return cls(
+            [int(r["from"]) * 1000 for r in rows],
+            [float(r.get("open") or 0) for r in rows],
+            [float(r.get("max", r.get("high")) or 0) for r in rows],
+            [float(r.get("min", r.get("low")) or 0) for r in rows],
+            [float(r.get("close") or 0) for r in rows],
+            [float(r.get("volume") or 0) for r in rows],
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def __getitem__(self, index: slice) -> "OHLCV":
+        if not isinstance(index, slice):
+            raise TypeError("OHLCV only supports slicing; use the column arrays for single bars")
+        return OHLCV(*(getattr(self, name)[index] for name in self.__slots__))
+
+    def tail(self, count: int) -> "OHLCV":
+        """View of the newest ``count`` bars."""
+        return self[max(len(self) - count, 0):]
+
+    def closed(self, timeframe_seconds: float, now: Optional[float] = None) -> "OHLCV":
+        """
+        View without the newest bar if it is still forming at ``now`` (epoch seconds).
+
+        Strategies treat the newest bar of a window as the one being evaluated,
+        so right after a bar closes they must get the window ending at that bar,
+        not the one that has just opened and barely moved.
+        """
+        if not len(self):
+            return self
+        now = time.time() if now is None else now
+        if self.timestamp[-1] + timeframe_seconds * 1000 > now * 1000:
+            return self[:-1]
+        return self
+
+    @property
+    def last_close(self) -> Optional[float]:
+        return float(self.close[-1]) if len(self) else None
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Return the bars as a list of candle dicts (for JSON responses)."""
+        columns = {name: getattr(self, name).tolist() for name in self.__slots__}
+        return [{name: columns[name][i] for name in self.__slots__} for i in range(len(self))]
+
+
+class CandleRingBuffer:
+    """
+    Fixed-capacity ring buffer of OHLCV bars stored in contiguous NumPy arrays.
+
+    Every bar is written twice (at ``i`` and ``i + capacity``) so the most
+    recent ``n`` bars are always one contiguous slice and reads never need to
+    stitch the wrapped halves back together.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._columns = {
+            name: np.zeros(2 * capacity, dtype=np.int64 if name == "timestamp" else np.float64)
+            for name in OHLCV.__slots__
+        }
+        self._head = 0  # Next write position in [0, capacity)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        """Timestamp of the newest bar, or None when the buffer is empty."""
+        if self._size == 0:
+            return None
+        return int(self._columns["timestamp"][self._head - 1 + self.capacity])
+
+    def clear(self):
+        """Drop every buffered bar."""
+        self._head = 0
+        self._size = 0
+
+    def _write(self, positions: np.ndarray, candles: OHLCV, rows: slice):
+        for name, column in self._columns.items():
+            values = getattr(candles, name)[rows]
+            column[positions] = values
+            column[positions + self.capacity] = values
+
+    def merge(self, candles: OHLCV) -> int:
+        """
+        Merge a chronologically sorted series into the buffer.
+
+        Bars older than the newest buffered bar are ignored, a bar with the same
+        timestamp replaces it (the still-forming candle), and newer bars are
+        appended, overwriting the oldest ones when full.
+
+        Returns:
+            Number of bars appended
+        """
+        start = 0
+        last_timestamp = self.last_timestamp
+        if last_timestamp is not None:
+            start = int(np.searchsorted(candles.timestamp, last_timestamp, side="left"))
+            if start < len(candles) and candles.timestamp[start] == last_timestamp:
+                last_position = np.array([(self._head - 1) % self.capacity])
+                self._write(last_position, candles, slice(start, start + 1))
+                start += 1
+
+        added = len(candles) - start
+        if added <= 0:
+            return 0
+        # Only the newest `capacity` bars can survive the write
+        start = max(start, len(candles) - self.capacity)
+        count = len(candles) - start
+        positions = (self._head + np.arange(count)) % self.capacity
+        self._write(positions, candles, slice(start, None))
+        self._head = (self._head + count) % self.capacity
+        self._size = min(self._size + count, self.capacity)
+        return added
+
+    def snapshot(self, count: Optional[int] = None) -> OHLCV:
+        """Copy of the newest ``count`` bars (all buffered bars by default)."""
+        count = self._size if count is None else min(count, self._size)
+        end = self._head + self.capacity
+        window = slice(end - count, end)
+        return OHLCV(*(self._columns[name][window].copy() for name in OHLCV.__slots__))
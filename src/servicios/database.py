@@ -2,19 +2,39 @@
 
 import logging
 import os
-from typing import Any, Dict
+import threading
+from typing import Any, Dict, Optional
 
 import yaml
 from pathlib import Path
 from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import NullPool
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker, scoped_session, declarative_base
+from sqlalchemy.pool import QueuePool
 
 logger = logging.getLogger(__name__)
 
 SETTINGS_PATH = Path(__file__).resolve().parents[2] / "config" / "settings.yaml"
 Base = declarative_base()
 
+# Pool defaults used when config/settings.yaml has no ``database.pool`` section.
+DEFAULT_POOL_SETTINGS: Dict[str, Any] = {
+    "size": 5,
+    "max_overflow": 10,
+    "timeout": 30,
+    "recycle": 1800,
+    "pre_ping": True,
+}
+
+# Process-wide engine registry. The engine is created lazily on first use and
+# shared by the API and every bot service running in this process.
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+_settings: Optional[Dict[str, Any]] = None
+
+SessionFactory = sessionmaker()
+ScopedSession = scoped_session(SessionFactory)
+
 
 def _load_settings() -> Dict[str, Any]:
     """Load settings from YAML configuration file."""
@@ -37,9 +57,17 @@ def _load_settings() -> Dict[str, Any]:
     return data if isinstance(data, dict) else {}
 
 
+def get_settings() -> Dict[str, Any]:
+    """Return the parsed settings file, loading it once per process."""
+    global _settings
+    if _settings is None:
+        _settings = _load_settings()
+    return _settings
+
+
 def _get_db_url() -> str:
     """Build PostgreSQL connection URL from settings and environment variables."""
-    settings = _load_settings()
+    settings = get_settings()
     db_settings = settings.get("database", {})
     
     # Get values from environment or use defaults from settings
@@ -55,27 +83,76 @@ def _get_db_url() -> str:
     return db_url
 
 
-def get_engine():
-    """Create and return SQLAlchemy engine for PostgreSQL."""
+def _get_pool_settings() -> Dict[str, Any]:
+    """Merge the ``database.pool`` section of settings.yaml over the defaults."""
+    pool_settings = dict(DEFAULT_POOL_SETTINGS)
+    configured = (get_settings().get("database") or {}).get("pool") or {}
+    if isinstance(configured, dict):
+        pool_settings.update({k: v for k, v in configured.items() if v is not None})
+    return pool_settings
+
+
+def _create_engine() -> Engine:
+    """Build a new SQLAlchemy engine backed by a QueuePool."""
     db_url = _get_db_url()
+    pool_settings = _get_pool_settings()
     try:
         engine = create_engine(
             db_url,
             echo=False,  # Set to True for SQL query logging
-            pool_pre_ping=True,  # Test connections before using them
-            poolclass=NullPool,  # Use for development; consider QueuePool for production
+            poolclass=QueuePool,
+            pool_size=int(pool_settings["size"]),
+            max_overflow=int(pool_settings["max_overflow"]),
+            pool_timeout=float(pool_settings["timeout"]),
+            pool_recycle=int(pool_settings["recycle"]),
+            pool_pre_ping=bool(pool_settings["pre_ping"]),  # Test connections before using them
         )
-        return engine
     except Exception as e:
         logger.error("Failed to create database engine: %s", str(e))
         raise
+    logger.info(
+        "Database pool configured: size=%s, max_overflow=%s, recycle=%ss",
+        pool_settings["size"], pool_settings["max_overflow"], pool_settings["recycle"],
+    )
+    return engine
+
+
+def get_engine() -> Engine:
+    """Return the process-wide SQLAlchemy engine, creating it on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _create_engine()
+                SessionFactory.configure(bind=_engine)
+    return _engine
+
+
+def dispose_engine() -> None:
+    """Close pooled connections and drop the cached engine (e.g. after fork)."""
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            ScopedSession.remove()
+            _engine.dispose()
+            _engine = None
 
 
 def get_session():
-    """Create and return a database session."""
-    engine = get_engine()
-    Session = sessionmaker(bind=engine)
-    return Session()
+    """Create and return a new database session bound to the shared engine."""
+    get_engine()
+    return SessionFactory()
+
+
+def get_scoped_session():
+    """Return the thread-local session from the shared scoped_session registry."""
+    get_engine()
+    return ScopedSession()
+
+
+def remove_scoped_session() -> None:
+    """Close and discard the current thread's scoped session, if any."""
+    ScopedSession.remove()
 
 
 def init_db():
@@ -0,0 +1,380 @@
+"""Streaming technical indicators updated in constant time per bar."""
+
+from __future__ import annotations
+
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+import numpy as np
+
+from src.servicios.candles import OHLCV
+
+
+class Indicator(ABC):
+    """
+    Base class for stateful indicators.
+
+    ``update`` commits a closed bar and ``peek`` returns the value the indicator
+    would have if a bar with that price closed now, without changing state.
+    That lets strategies evaluate the still-forming bar every tick while only
+    committing each bar once. ``value`` holds the value after the last
+    committed bar and ``prev`` the one before it.
+    """
+
+    def __init__(self, period: int):
+        if period <= 0:
+            raise ValueError("period must be positive")
+        self.period = period
+        self.count = 0
+        self.value: Optional[float] = None
+        self.prev: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    def reset(self):
+        """Forget every committed bar."""
+        self.count = 0
+        self.value = None
+        self.prev = None
+
+    def update(self, price: float) -> Optional[float]:
+        """Commit a closed bar and return the new value (None while warming up)."""
+        self.count += 1
+        self.prev = self.value
+        self.value = self._update(float(price))
+        return self.value
+
+    @abstractmethod
+    def _update(self, price: float) -> Optional[float]:
+        pass
+
+    @abstractmethod
+    def peek(self, price: float) -> Optional[float]:
+        """Value if ``price`` were committed next, without mutating the indicator."""
+        pass
+
+    def _series(self, prices: np.ndarray, *attributes: str) -> Tuple[np.ndarray, ...]:
+        self.reset()
+        out = np.full((len(attributes), len(prices)), np.nan)
+        for i, price in enumerate(np.asarray(prices, dtype=np.float64).tolist()):
+            self.update(price)
+            for row, name in enumerate(attributes):
+                value = getattr(self, name)
+                if value is not None:
+                    out[row, i] = value
+        return tuple(out)
+
+    def series(self, prices: np.ndarray) -> np.ndarray:
+        """
+        Values after committing each price in turn (NaN while warming up), in one pass.
+
+        ``series(prices)[i]`` is exactly what ``peek(prices[i])`` returns once
+        ``prices[:i]`` were committed, so whole-history evaluations match the
+        bar-by-bar ones bit for bit. Resets the indicator first.
+        """
+        return self._series(prices, "value")[0]
+
+
+class SMA(Indicator):
+    """Simple moving average over a rolling window."""
+
+    def __init__(self, period: int):
+        super().__init__(period)
+        self._window: Deque[float] = deque(maxlen=period)
+        self._sum = 0.0
+
+    def reset(self):
+        super().reset()
+        self._window.clear()
+        self._sum = 0.0
+
+    def _update(self, price: float) -> Optional[float]:
+        if len(self._window) == self.period:
+            self._sum -= self._window[0]
+        self._window.append(price)
+        self._sum += price
+        return self._sum / self.period if len(self._window) == self.period else None
+
+    def peek(self, price: float) -> Optional[float]:
+        size = len(self._window)
+        if size + 1 < self.period:
+            return None
+        dropped = self._window[0] if size == self.period else 0.0
+        return (self._sum - dropped + price) / self.period
+
+
+class EMA(Indicator):
+    """
+    Exponential moving average with ``alpha = 2 / (period + 1)``.
+
+    Seeded with the first price and reported once ``period`` bars were seen,
+    matching ``pandas.Series.ewm(span=period, adjust=False, min_periods=period)``.
+    """
+
+    def __init__(self, period: int):
+        super().__init__(period)
+        self.alpha = 2.0 / (period + 1)
+        self._ema: Optional[float] = None
+
+    def reset(self):
+        super().reset()
+        self._ema = None
+
+    def _next(self, price: float) -> float:
+        return price if self._ema is None else self._ema + self.alpha * (price - self._ema)
+
+    def _update(self, price: float) -> Optional[float]:
+        self._ema = self._next(price)
+        return self._ema if self.count >= self.period else None
+
+    def peek(self, price: float) -> Optional[float]:
+        return self._next(price) if self.count + 1 >= self.period else None
+
+
+class RSI(Indicator):
+    """
+    Relative Strength Index.
+
+    With ``wilder=True`` gains and losses use Wilder smoothing
+    (``alpha = 1 / period``) seeded at zero on the first bar, the same
+    convention as ``ta.momentum.RSIIndicator``. With ``wilder=False`` they are
+    plain averages of the last ``period`` changes.
+    """
+
+    def __init__(self, period: int, wilder: bool = True):
+        super().__init__(period)
+        self.wilder = wilder
+        self._last_price: Optional[float] = None
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+        self._changes: Deque[Tuple[float, float]] = deque(maxlen=period)
+
+    def reset(self):
+        super().reset()
+        self._last_price = None
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+        self._changes.clear()
+
+    @staticmethod
+    def _rsi(avg_gain: float, avg_loss: float) -> float:
+        if avg_loss == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    def _averages(self, price: float) -> Tuple[float, float, int]:
+        """Gain/loss averages and number of changes after adding ``price``."""
+        change = price - self._last_price
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        if self.wilder:
+            alpha = 1.0 / self.period
+            return (
+                self._avg_gain + alpha * (gain - self._avg_gain),
+                self._avg_loss + alpha * (loss - self._avg_loss),
+                self.count,
+            )
+        changes = len(self._changes)
+        if changes == self.period:
+            old_gain, old_loss = self._changes[0]
+        else:
+            old_gain, old_loss = 0.0, 0.0
+        sum_gain = self._avg_gain * self.period - old_gain + gain
+        sum_loss = self._avg_loss * self.period - old_loss + loss
+        return sum_gain / self.period, sum_loss / self.period, min(changes + 1, self.period)
+
+    def _is_ready(self, bars: int, changes: int) -> bool:
+        # Wilder RSI needs `period` bars (ta's min_periods); the plain average needs `period` changes
+        return bars >= self.period if self.wilder else changes >= self.period
+
+    def _update(self, price: float) -> Optional[float]:
+        if self._last_price is None:
+            self._last_price = price
+            return None
+        change = price - self._last_price
+        self._avg_gain, self._avg_loss, changes = self._averages(price)
+        if not self.wilder:
+            self._changes.append((max(change, 0.0), max(-change, 0.0)))
+        self._last_price = price
+        if not self._is_ready(self.count, changes):
+            return None
+        return self._rsi(self._avg_gain, self._avg_loss)
+
+    def peek(self, price: float) -> Optional[float]:
+        if self._last_price is None:
+            return None
+        avg_gain, avg_loss, changes = self._averages(price)
+        if not self._is_ready(self.count + 1, changes):
+            return None
+        return self._rsi(avg_gain, avg_loss)
+
+
+class MACD(Indicator):
+    """
+    Moving Average Convergence Divergence.
+
+    ``value`` is the MACD line; ``signal`` and ``histogram`` (and their
+    ``prev_`` counterparts) are updated alongside it. Matches
+    ``ta.trend.MACD`` on the same price series.
+    """
+
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9):
+        super().__init__(slow_period)
+        self.fast = EMA(fast_period)
+        self.slow = EMA(slow_period)
+        self.signal_ema = EMA(signal_period)
+        self.signal: Optional[float] = None
+        self.histogram: Optional[float] = None
+        self.prev_signal: Optional[float] = None
+        self.prev_histogram: Optional[float] = None
+
+    def reset(self):
+        super().reset()
+        for ema in (self.fast, self.slow, self.signal_ema):
+            ema.reset()
+        self.signal = self.histogram = self.prev_signal = self.prev_histogram = None
+
+    def _update(self, price: float) -> Optional[float]:
+        fast = self.fast.update(price)
+        slow = self.slow.update(price)
+        self.prev_signal, self.prev_histogram = self.signal, self.histogram
+        if fast is None or slow is None:
+            return None
+        macd = fast - slow
+        self.signal = self.signal_ema.update(macd)
+        self.histogram = macd - self.signal if self.signal is not None else None
+        return macd
+
+    def peek_all(self, price: float) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+        """(macd, signal, histogram) if ``price`` were committed next."""
+        fast = self.fast.peek(price)
+        slow = self.slow.peek(price)
+        if fast is None or slow is None:
+            return None, None, None
+        macd = fast - slow
+        signal = self.signal_ema.peek(macd)
+        return macd, signal, (macd - signal) if signal is not None else None
+
+    def peek(self, price: float) -> Optional[float]:
+        return self.peek_all(price)[0]
+
+    def series_all(self, prices: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(macd, signal, histogram) arrays over ``prices``; see ``Indicator.series``."""
+        return self._series(prices, "value", "signal", "histogram")
+
+
+class BollingerBands(Indicator):
+    """
+    Bollinger Bands over a rolling window with population standard deviation.
+
+    ``value`` is the middle band; ``upper`` and ``lower`` follow it. Matches
+    ``ta.volatility.BollingerBands`` on the same price series.
+    """
+
+    def __init__(self, period: int = 20, std_dev: float = 2.0):
+        super().__init__(period)
+        self.std_dev = std_dev
+        self._window: Deque[float] = deque(maxlen=period)
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self.upper: Optional[float] = None
+        self.lower: Optional[float] = None
+
+    def reset(self):
+        super().reset()
+        self._window.clear()
+        self._sum = self._sum_sq = 0.0
+        self.upper = self.lower = None
+
+    def _bands(self, total: float, total_sq: float) -> Tuple[float, float, float]:
+        mean = total / self.period
+        std = math.sqrt(max(total_sq / self.period - mean * mean, 0.0))
+        return mean + self.std_dev * std, mean, mean - self.std_dev * std
+
+    def _update(self, price: float) -> Optional[float]:
+        if len(self._window) == self.period:
+            dropped = self._window[0]
+            self._sum -= dropped
+            self._sum_sq -= dropped * dropped
+        self._window.append(price)
+        self._sum += price
+        self._sum_sq += price * price
+        if len(self._window) < self.period:
+            return None
+        self.upper, middle, self.lower = self._bands(self._sum, self._sum_sq)
+        return middle
+
+    def peek_bands(self, price: float) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+        """(upper, middle, lower) if ``price`` were committed next."""
+        size = len(self._window)
+        if size + 1 < self.period:
+            return None, None, None
+        dropped = self._window[0] if size == self.period else 0.0
+        return self._bands(
+            self._sum - dropped + price,
+            self._sum_sq - dropped * dropped + price * price,
+        )
+
+    def peek(self, price: float) -> Optional[float]:
+        return self.peek_bands(price)[1]
+
+    def series_bands(self, prices: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(upper, middle, lower) arrays over ``prices``; see ``Indicator.series``."""
+        return self._series(prices, "upper", "value", "lower")
+
+
+def lagged(values: np.ndarray) -> np.ndarray:
+    """``values`` shifted one bar forward (element ``i`` holds ``values[i - 1]``, NaN first)."""
+    out = np.empty(len(values))
+    out[:1] = np.nan
+    out[1:] = values[:-1]
+    return out
+
+
+class BarSync:
+    """
+    Feeds each closed bar of successive candle windows to indicators exactly once.
+
+    The newest bar of every window is treated as still forming and is never
+    committed; strategies evaluate it with ``peek``.
+    """
+
+    def __init__(self):
+        self.last_timestamp: Optional[int] = None
+
+    def new_closes(self, candles: OHLCV) -> Tuple[np.ndarray, bool]:
+        """
+        Closes of bars that closed since the previous call.
+
+        Returns:
+            (closes, reset): when ``reset`` is True the window does not continue
+            the bars seen so far (first call or a gap) and indicators must be
+            reset before feeding ``closes``
+        """
+        closed = candles[:-1]
+        if not len(closed):
+            reset = self.last_timestamp is not None
+            self.last_timestamp = None
+            return closed.close, reset
+
+        reset = True
+        start = 0
+        if self.last_timestamp is not None:
+            index = int(np.searchsorted(closed.timestamp, self.last_timestamp))
+            if index < len(closed) and closed.timestamp[index] == self.last_timestamp:
+                start, reset = index + 1, False
+
+        self.last_timestamp = int(closed.timestamp[-1])
+        return closed.close[start:], reset
+
+    def feed(self, candles: OHLCV, *indicators: Indicator):
+        """Commit the newly closed bars of ``candles`` to ``indicators``, resetting them on a gap."""
+        closes, reset = self.new_closes(candles)
+        for indicator in indicators:
+            if reset:
+                indicator.reset()
+            for close in closes:
+                indicator.update(close)
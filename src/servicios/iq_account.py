@@ -0,0 +1,118 @@
+"""Balance mode and locally tracked balance of an IQ Option client."""
+
+from __future__ import annotations
+
+import logging
+import time
+from contextlib import contextmanager
+from threading import Lock, RLock
+from typing import Any, Dict, Iterator, Optional
+
+from src.servicios.database import get_settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BALANCE_RECONCILE_SECONDS = 300.0
+
+
+class AccountSession:
+    """
+    Account state of one IQ Option client, shared by every bot using it.
+
+    The balance mode (PRACTICE/REAL) is switched only when a caller needs a
+    different one, and the balance is kept locally: stakes are debited when a
+    trade opens, payouts credited when it closes, and the value is re-read
+    from the SDK every ``reconcile_seconds`` or after a mode switch. That keeps
+    ``change_balance``/``get_balance`` round trips off the order path.
+    """
+
+    def __init__(self, client: Any, reconcile_seconds: float = DEFAULT_BALANCE_RECONCILE_SECONDS):
+        self.client = client
+        self.reconcile_seconds = reconcile_seconds
+        self.mode: Optional[str] = None
+        self.balance: Optional[float] = None
+        self._balance_read_at: Optional[float] = None
+        # Reentrant: armed() holds it while callers read and update the balance
+        self._lock = RLock()
+
+    def ensure_mode(self, account_type: str):
+        """Switch the client to ``account_type`` unless it is already in that mode."""
+        account_type = account_type.upper()
+        with self._lock:
+            if self.mode == account_type:
+                return
+            logger.info(f"Setting account type to: {account_type}")
+            self.client.change_balance(account_type)
+            self.mode = account_type
+            self.invalidate_balance()
+
+    def invalidate_balance(self):
+        """Force the next ``get_balance`` to read the balance from the SDK."""
+        with self._lock:
+            self._balance_read_at = None
+
+    def _needs_reconcile(self) -> bool:
+        if self._balance_read_at is None or self.balance is None:
+            return True
+        return time.monotonic() - self._balance_read_at >= self.reconcile_seconds
+
+    def get_balance(self) -> float:
+        """Balance of the current mode, reconciled with the SDK when due."""
+        with self._lock:
+            if self._needs_reconcile():
+                self.balance = float(self.client.get_balance() or 0.0)
+                self._balance_read_at = time.monotonic()
+                logger.debug(f"Balance reconciled ({self.mode}): {self.balance}")
+            return self.balance
+
+    def record_open(self, amount: float):
+        """Debit the stake of a trade that was just opened."""
+        with self._lock:
+            if self.balance is not None:
+                self.balance -= amount
+
+    def record_close(self, amount: float, profit_loss: float, account_type: str):
+        """Credit the payout of a closed trade (stake plus profit, or nothing on a loss)."""
+        with self._lock:
+            # Results of trades opened in the other mode do not touch this balance
+            if self.balance is not None and self.mode == account_type.upper():
+                self.balance += amount + profit_loss
+
+    @contextmanager
+    def armed(self, account_type: str) -> Iterator["AccountSession"]:
+        """
+        Hold the account in ``account_type`` mode while placing an order.
+
+        Bots sharing a client with different account types would otherwise
+        switch the mode under each other between the check and ``buy()``.
+        """
+        with self._lock:
+            self.ensure_mode(account_type)
+            yield self
+
+
+# Keyed by id(client); each session holds its client, so the id cannot be reused while cached
+_sessions: Dict[int, AccountSession] = {}
+_sessions_lock = Lock()
+
+
+def get_account_session(client: Any) -> AccountSession:
+    """Return the shared account session of an IQ Option client."""
+    with _sessions_lock:
+        session = _sessions.get(id(client))
+        if session is None:
+            account_settings = get_settings().get("account") or {}
+            session = AccountSession(
+                client,
+                reconcile_seconds=float(
+                    account_settings.get("balance_reconcile_seconds", DEFAULT_BALANCE_RECONCILE_SECONDS)
+                ),
+            )
+            _sessions[id(client)] = session
+        return session
+
+
+def drop_account_session(client: Any):
+    """Forget the account session of a client that logged out."""
+    with _sessions_lock:
+        _sessions.pop(id(client), None)
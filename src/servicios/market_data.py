@@ -0,0 +1,265 @@
+"""Process-wide market data hub shared by all running bots."""
+
+from __future__ import annotations
+
+import logging
+import time
+from threading import Lock
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from src.servicios.candle_history import CandleHistory, PageFetcher, get_candle_history
+from src.servicios.candles import OHLCV, CandleRingBuffer, interval_to_seconds
+from src.servicios.database import get_settings
+
+logger = logging.getLogger(__name__)
+
+# (venue, instrument, timeframe), e.g. ("binance", "BTCUSDT", "5m")
+FeedKey = Tuple[str, str, str]
+# Called with the open time (ms) of the newest buffered bar, or None when the
+# buffer is empty, and expected to return at most FETCH_LIMIT bars from that
+# timestamp onwards. Candle timestamps are epoch milliseconds.
+CandleFetcher = Callable[[Optional[int]], OHLCV]
+CandleListener = Callable[[FeedKey, OHLCV], None]
+
+DEFAULT_REFRESH_SECONDS = 20.0
+DEFAULT_CAPACITY = 500
+FETCH_LIMIT = 100
+
+
+class CandleFeed:
+    """Shared candle feed for one (venue, instrument, timeframe) key."""
+
+    def __init__(self, key: FeedKey, refresh_seconds: float, capacity: int,
+                 history: Optional[CandleHistory] = None):
+        self.key = key
+        self.refresh_seconds = refresh_seconds
+        self.buffer = CandleRingBuffer(capacity)
+        self.history = history
+        self.timeframe_ms = interval_to_seconds(key[2]) * 1000
+        self.last_fetch: Optional[float] = None
+        self.last_fetch_time: Optional[float] = None  # Wall clock, for bar boundaries
+        self._fetchers: Dict[Hashable, CandleFetcher] = {}
+        self._listeners: Dict[Hashable, CandleListener] = {}
+        self._lock = Lock()
+        # Guards the subscriber dicts; unlike _lock it is never held during a fetch
+        self._subscribers_lock = Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._subscribers_lock:
+            return len(self._fetchers)
+
+    def add_subscriber(self, subscriber_id: Hashable, fetcher: CandleFetcher,
+                       listener: Optional[CandleListener] = None):
+        with self._subscribers_lock:
+            self._fetchers[subscriber_id] = fetcher
+            if listener:
+                self._listeners[subscriber_id] = listener
+
+    def remove_subscriber(self, subscriber_id: Hashable):
+        with self._subscribers_lock:
+            self._fetchers.pop(subscriber_id, None)
+            self._listeners.pop(subscriber_id, None)
+
+    def warm_start(self, candles: OHLCV) -> int:
+        """Seed an empty buffer with stored closed bars so the first refresh only fills the gap."""
+        with self._lock:
+            if len(self.buffer):
+                return 0
+            return self.buffer.merge(candles)
+
+    def _persist(self, candles: OHLCV, closed: bool = False):
+        """Append the closed bars of a fetch (all of them if ``closed``) to the candle history."""
+        if self.history is None or not len(candles):
+            return
+        if not closed:
+            closed_before = time.time() * 1000 - self.timeframe_ms
+            candles = candles[:int(np.searchsorted(candles.timestamp, closed_before, side="right"))]
+        try:
+            self.history.append(self.key, candles)
+        except Exception as e:
+            logger.warning(f"Could not store candles of {self.key}: {e}")
+
+    def push(self, candles: OHLCV, closed: bool = False) -> bool:
+        """
+        Merge bars pushed by a stream instead of fetched.
+
+        Args:
+            candles: Newest bar(s), e.g. one kline update
+            closed: True if the bars are final (the kline closed)
+
+        Returns:
+            False, without merging, when the buffer is empty or the bars do not
+            follow it; the history must be fetched with ``refresh(force=True)`` first
+        """
+        with self._lock:
+            last_timestamp = self.buffer.last_timestamp
+            # A lone streamed bar would make an empty feed look fresh and never get refilled
+            if last_timestamp is None or candles.timestamp[0] > last_timestamp + self.timeframe_ms:
+                return False
+            self.buffer.merge(candles)
+            self._persist(candles, closed)
+            self.last_fetch = time.monotonic()
+            self.last_fetch_time = time.time()
+            self._notify()
+            return True
+
+    def is_stale(self) -> bool:
+        if self.last_fetch is None:
+            return True
+        # A bar closed since the last fetch: bots woken at bar close need it now
+        timeframe_seconds = self.timeframe_ms / 1000
+        if time.time() // timeframe_seconds > self.last_fetch_time // timeframe_seconds:
+            return True
+        return time.monotonic() - self.last_fetch >= self.refresh_seconds
+
+    def refresh(self, force: bool = False) -> bool:
+        """Fetch new candles once on behalf of every subscriber. Returns True on success."""
+        with self._lock:
+            # Another subscriber may have refreshed while we waited for the lock
+            if not force and not self.is_stale():
+                return True
+
+            since = self.buffer.last_timestamp
+            if since is not None and time.time() * 1000 - since > FETCH_LIMIT * self.timeframe_ms:
+                # Too many bars missed for an incremental fetch: reload the window
+                self.buffer.clear()
+                since = None
+
+            with self._subscribers_lock:
+                fetchers = list(self._fetchers.values())
+            for fetcher in fetchers:
+                try:
+                    candles = fetcher(since)
+                except Exception as e:
+                    logger.warning(f"Candle fetch failed for {self.key}: {e}")
+                    continue
+                if not candles:
+                    continue
+
+                added = self.buffer.merge(candles)
+                self._persist(candles)
+                self.last_fetch = time.monotonic()
+                self.last_fetch_time = time.time()
+                logger.debug(
+                    f"Feed {self.key} refreshed: {len(candles)} fetched, {added} new bar(s), "
+                    f"{len(self.buffer)} buffered"
+                )
+                self._notify()
+                return True
+
+            return False
+
+    def _notify(self):
+        with self._subscribers_lock:
+            listeners = list(self._listeners.items())
+        if not listeners:
+            return
+        snapshot = self.buffer.snapshot()
+        for subscriber_id, listener in listeners:
+            try:
+                listener(self.key, snapshot)
+            except Exception as e:
+                logger.error(f"Market data listener {subscriber_id} failed: {e}", exc_info=True)
+
+    def snapshot(self, count: Optional[int] = None) -> OHLCV:
+        """Return the most recent ``count`` candles (all buffered candles by default)."""
+        # Stream pushes and refreshes write the columns one by one before moving the head
+        with self._lock:
+            return self.buffer.snapshot(count)
+
+
+class MarketDataHub:
+    """Registry of shared candle feeds keyed by (venue, instrument, timeframe)."""
+
+    def __init__(self, refresh_seconds: float = DEFAULT_REFRESH_SECONDS, capacity: int = DEFAULT_CAPACITY,
+                 history: Optional[CandleHistory] = None):
+        self.refresh_seconds = refresh_seconds
+        self.capacity = capacity
+        self.history = history
+        self._feeds: Dict[FeedKey, CandleFeed] = {}
+        self._lock = Lock()
+
+    def subscribe(self, key: FeedKey, subscriber_id: Hashable, fetcher: CandleFetcher,
+                  listener: Optional[CandleListener] = None) -> CandleFeed:
+        """
+        Subscribe a bot to a feed, creating the feed on first use.
+
+        Args:
+            key: (venue, instrument, timeframe) of the feed
+            subscriber_id: Unique ID of the subscriber (e.g. the bot ID)
+            fetcher: Callable returning new candles using the subscriber's client
+            listener: Optional callback invoked with every refreshed snapshot
+        """
+        with self._lock:
+            feed = self._feeds.get(key)
+            if feed is None:
+                feed = CandleFeed(key, self.refresh_seconds, self.capacity, self.history)
+                self._feeds[key] = feed
+                logger.info(f"Market data feed created: {key}")
+            feed.add_subscriber(subscriber_id, fetcher, listener)
+        return feed
+
+    def warm_start(self, key: FeedKey, fetch_page: PageFetcher) -> int:
+        """
+        Seed a new feed with the newest ``capacity`` bars from the candle history.
+
+        Only bars missing from the history are downloaded (through
+        ``fetch_page``, see ``candle_history``), so long-period indicators are
+        valid on the first tick without a full network reload. Feeds that
+        already hold bars are left alone.
+
+        Returns:
+            Number of bars loaded into the feed
+        """
+        feed = self._feeds.get(key)
+        if feed is None or self.history is None or len(feed.buffer):
+            return 0
+        added = feed.warm_start(self.history.catch_up(key, fetch_page, self.capacity))
+        logger.info(f"Feed {key} warm-started with {added} stored bar(s)")
+        return added
+
+    def unsubscribe(self, key: FeedKey, subscriber_id: Hashable):
+        """Remove a subscriber and drop the feed once nobody uses it."""
+        with self._lock:
+            feed = self._feeds.get(key)
+            if feed is None:
+                return
+            feed.remove_subscriber(subscriber_id)
+            if feed.subscriber_count == 0:
+                del self._feeds[key]
+                logger.info(f"Market data feed closed: {key}")
+
+    def get_feed(self, key: FeedKey) -> Optional[CandleFeed]:
+        return self._feeds.get(key)
+
+    def get_candles(self, key: FeedKey, count: Optional[int] = None) -> OHLCV:
+        """Return the latest candles for a feed, fetching only if the buffer is stale."""
+        feed = self._feeds.get(key)
+        if feed is None:
+            return OHLCV.empty()
+        if feed.is_stale():
+            feed.refresh()
+        return feed.snapshot(count)
+
+
+_hub: Optional[MarketDataHub] = None
+_hub_lock = Lock()
+
+
+def get_market_data_hub() -> MarketDataHub:
+    """Return the process-wide market data hub configured from settings.yaml."""
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                market_settings = get_settings().get("market_data") or {}
+                history_settings = get_settings().get("history") or {}
+                _hub = MarketDataHub(
+                    refresh_seconds=float(market_settings.get("refresh_seconds", DEFAULT_REFRESH_SECONDS)),
+                    capacity=int(market_settings.get("capacity", DEFAULT_CAPACITY)),
+                    history=get_candle_history() if history_settings.get("enabled", True) else None,
+                )
+    return _hub
@@ -0,0 +1,147 @@
+"""Cached IQ Option market open/closed status shared by bots and API endpoints."""
+
+from __future__ import annotations
+
+import logging
+import time
+from threading import Lock, Thread
+from typing import Any, Dict, Optional
+
+from src.servicios.database import get_settings
+
+logger = logging.getLogger(__name__)
+
+OPTION_TYPES = ("binary", "turbo", "digital")
+DEFAULT_TTL_SECONDS = 60.0
+
+
+def _is_enabled(info: Any) -> bool:
+    if not isinstance(info, dict):
+        return bool(info)
+    return bool(info.get("enabled", info.get("open", False)))
+
+
+def index_open_times(all_actives: Any) -> Dict[str, Dict[str, bool]]:
+    """
+    Index ``get_all_open_time()`` output by instrument.
+
+    Accepts both the per-option-type layout returned by iqoptionapi
+    (``{"turbo": {"EURUSD": {"open": True}}, ...}``) and a per-instrument
+    layout (``{"EURUSD": {"turbo": {"enabled": True}}, ...}``).
+
+    Returns:
+        {active_id: {"binary": bool, "turbo": bool, "digital": bool}}
+    """
+    if not isinstance(all_actives, dict):
+        return {}
+
+    index: Dict[str, Dict[str, bool]] = {}
+    if any(option_type in all_actives for option_type in OPTION_TYPES):
+        for option_type in OPTION_TYPES:
+            for active_id, info in (all_actives.get(option_type) or {}).items():
+                status = index.setdefault(active_id, dict.fromkeys(OPTION_TYPES, False))
+                status[option_type] = _is_enabled(info)
+        return index
+
+    for active_id, info in all_actives.items():
+        if isinstance(info, dict):
+            index[active_id] = {option_type: _is_enabled(info.get(option_type, {}))
+                                for option_type in OPTION_TYPES}
+    return index
+
+
+class MarketStatusCache:
+    """
+    Open-time snapshot for one IQ Option client, refreshed at most once per TTL.
+
+    ``get_all_open_time()`` fans out over every option type and takes
+    seconds, so readers get the cached snapshot and a stale snapshot is
+    refreshed in the background (only one refresh runs at a time). Only the
+    very first read blocks on the SDK.
+    """
+
+    def __init__(self, client: Any, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.fetched_at: Optional[float] = None
+        self._actives: Dict[str, Dict[str, bool]] = {}
+        self._refresh_lock = Lock()
+        self._state_lock = Lock()
+        self._refreshing = False
+
+    def is_stale(self) -> bool:
+        return self.fetched_at is None or time.monotonic() - self.fetched_at >= self.ttl_seconds
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload the snapshot from the SDK. Returns True on success."""
+        with self._refresh_lock:
+            # Another caller may have refreshed while we waited for the lock
+            if not force and not self.is_stale():
+                return True
+            try:
+                all_actives = self.client.get_all_open_time()
+            except Exception as e:
+                logger.warning(f"Error getting open time data: {e}")
+                return False
+            finally:
+                with self._state_lock:
+                    self._refreshing = False
+
+            actives = index_open_times(all_actives)
+            if not actives:
+                logger.warning("get_all_open_time returned no actives; keeping previous snapshot")
+                return False
+
+            self._actives = actives
+            self.fetched_at = time.monotonic()
+            logger.info(f"Market status refreshed: {len(actives)} actives")
+            return True
+
+    def _refresh_in_background(self):
+        with self._state_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        Thread(target=self.refresh, name="market-status-refresh", daemon=True).start()
+
+    def get_all(self) -> Dict[str, Dict[str, bool]]:
+        """Return the per-instrument snapshot, refreshing it if needed."""
+        if self.fetched_at is None:
+            self.refresh()
+        elif self.is_stale():
+            self._refresh_in_background()
+        return self._actives
+
+    def get(self, active_id: str) -> Optional[Dict[str, bool]]:
+        """Open status per option type for one instrument, or None if unknown."""
+        return self.get_all().get(active_id)
+
+    def is_open(self, active_id: str) -> bool:
+        """True if binary or turbo options are open for ``active_id``."""
+        status = self.get(active_id)
+        return bool(status and (status["binary"] or status["turbo"]))
+
+
+# Keyed by id(client); each cache holds its client, so the id cannot be reused while cached
+_caches: Dict[int, MarketStatusCache] = {}
+_caches_lock = Lock()
+
+
+def get_market_status_cache(client: Any) -> MarketStatusCache:
+    """Return the market status cache of an IQ Option client, shared by every caller."""
+    with _caches_lock:
+        cache = _caches.get(id(client))
+        if cache is None:
+            status_settings = get_settings().get("market_status") or {}
+            cache = MarketStatusCache(
+                client,
+                ttl_seconds=float(status_settings.get("ttl_seconds", DEFAULT_TTL_SECONDS)),
+            )
+            _caches[id(client)] = cache
+        return cache
+
+
+def drop_market_status_cache(client: Any):
+    """Forget the cache of a client that logged out."""
+    with _caches_lock:
+        _caches.pop(id(client), None)
@@ -0,0 +1,167 @@
+"""Parallel grid/random search over strategy configs using the backtest engine."""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import random
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.servicios.backtest import backtest_binary, backtest_spot
+from src.servicios.binance_strategies import get_binance_strategy
+from src.servicios.candles import OHLCV
+from src.servicios.trading_strategies import get_strategy
+
+logger = logging.getLogger(__name__)
+
+VENUES = ("iqoption", "binance")
+# Metrics where lower is better; every other metric is ranked highest first
+ASCENDING_METRICS = {"max_drawdown", "losses"}
+
+# Candles of the running sweep, memory-mapped once per worker process
+_worker_candles: Optional[OHLCV] = None
+
+
+class _ReadTracker(dict):
+    """Config dict that records which keys a strategy reads."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.read = set()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        self.read.add(key)
+        return super().get(key, default)
+
+    def __getitem__(self, key: Any) -> Any:
+        self.read.add(key)
+        return super().__getitem__(key)
+
+    def __contains__(self, key: Any) -> bool:
+        self.read.add(key)
+        return super().__contains__(key)
+
+
+def grid(param_space: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Every combination of the values in ``param_space`` ({"period": [7, 14], ...})."""
+    names = list(param_space)
+    return [dict(zip(names, values)) for values in itertools.product(*(param_space[n] for n in names))]
+
+
+def random_configs(param_space: Dict[str, Sequence[Any]], samples: int,
+                   seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Up to ``samples`` distinct combinations drawn at random from ``param_space``."""
+    configs = grid(param_space)
+    if samples >= len(configs):
+        return configs
+    return random.Random(seed).sample(configs, samples)
+
+
+def _save_candles(candles: OHLCV, directory: str):
+    for name in OHLCV.__slots__:
+        np.save(os.path.join(directory, f"{name}.npy"), getattr(candles, name))
+
+
+def _load_candles(directory: str) -> OHLCV:
+    return OHLCV(*(np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+                   for name in OHLCV.__slots__))
+
+
+def _init_worker(directory: str):
+    global _worker_candles
+    _worker_candles = _load_candles(directory)
+
+
+def _evaluate(venue: str, strategy_name: str, config: Dict[str, Any],
+              backtest_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Backtest one config on the worker's candles and return its results row."""
+    row: Dict[str, Any] = {"config": config}
+    try:
+        if venue == "binance":
+            strategy = get_binance_strategy(strategy_name, config)
+            result = backtest_spot(strategy, _worker_candles, **backtest_kwargs)
+        else:
+            strategy = get_strategy(strategy_name, config)
+            result = backtest_binary(strategy, _worker_candles, **backtest_kwargs)
+        row.update(result.summary())
+    except Exception as e:
+        row["error"] = str(e)
+    return row
+
+
+def _sort_key(metric: str):
+    sign = 1 if metric in ASCENDING_METRICS else -1
+
+    def key(row: Dict[str, Any]):
+        # Failed configs go last
+        return ("error" in row, sign * row.get(metric, 0.0))
+
+    return key
+
+
+def optimize(strategy_name: str, candles: OHLCV, param_space: Dict[str, Sequence[Any]],
+             venue: str = "iqoption", samples: Optional[int] = None, seed: Optional[int] = None,
+             rank_by: str = "total_pnl", max_workers: Optional[int] = None,
+             **backtest_kwargs: Any) -> List[Dict[str, Any]]:
+    """
+    Backtest every config of ``param_space`` in parallel and rank the results.
+
+    The candles are written once to ``.npy`` files and every worker process
+    memory-maps them, so the dataset is shared by all cores instead of being
+    pickled per task.
+
+    Args:
+        strategy_name: Strategy name as used in ``STRATEGIES``/``get_binance_strategy``
+        candles: Historical candles, oldest bar first
+        param_space: Values to try per config key, e.g. {"fast_period": [5, 8], "slow_period": [20, 30]}
+        venue: "iqoption" (``backtest_binary``) or "binance" (``backtest_spot``)
+        samples: Random search over this many configs instead of the full grid
+        seed: Random search seed
+        rank_by: ``BacktestResult.summary()`` metric to rank by
+        max_workers: Worker processes (defaults to one per core)
+        **backtest_kwargs: Passed to the backtest function (payout, fee_rate, ...)
+
+    Returns:
+        Result rows, best first: {"config": {...}, "total_pnl": ..., "win_rate": ..., ...}.
+        Configs that failed carry an "error" key and come last.
+
+    Raises:
+        ValueError: Unknown venue or strategy, or a ``param_space`` key the strategy does not read
+    """
+    if venue not in VENUES:
+        raise ValueError(f"Unknown venue: {venue}")
+    factory = get_binance_strategy if venue == "binance" else get_strategy
+    # Build one config to learn which keys the strategy reads: a misspelt key
+    # would silently sweep identical default configs
+    probe = _ReadTracker({name: values[0] for name, values in param_space.items() if len(values)})
+    if factory(strategy_name, probe) is None:
+        raise ValueError(f"Unknown strategy: {strategy_name}")
+    unused = sorted(set(param_space) - probe.read)
+    if unused:
+        raise ValueError(f"Strategy {strategy_name} does not use config keys: {', '.join(unused)}")
+
+    configs = grid(param_space) if samples is None else random_configs(param_space, samples, seed)
+    max_workers = max_workers or os.cpu_count() or 1
+    logger.info(f"Optimizing {strategy_name} ({venue}): {len(configs)} configs "
+                f"on {len(candles)} bars with {max_workers} workers")
+
+    with tempfile.TemporaryDirectory(prefix="optimizer-") as directory:
+        _save_candles(candles, directory)
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(directory,)) as executor:
+            rows = list(executor.map(
+                _evaluate,
+                itertools.repeat(venue),
+                itertools.repeat(strategy_name),
+                configs,
+                itertools.repeat(backtest_kwargs),
+                chunksize=max(1, len(configs) // (max_workers * 4)),
+            ))
+
+    rows.sort(key=_sort_key(rank_by))
+    return rows
@@ -0,0 +1,97 @@
+"""In-memory daily risk ledger shared by the bot services."""
+
+from __future__ import annotations
+
+import logging
+import time
+from datetime import datetime
+from threading import Lock
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def utc_day_start(now: Optional[datetime] = None) -> datetime:
+    """Return midnight (UTC) of the day containing ``now``."""
+    now = now or datetime.utcnow()
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class DailyRiskLedger:
+    """
+    Running trade count and realized PnL for one bot during the current UTC day.
+
+    The ledger is seeded once from an aggregate query and then updated in
+    place as trades open and close, so limit checks never touch the database.
+    It resets itself at UTC midnight.
+    """
+
+    def __init__(self, bot_id: int, reconcile_seconds: Optional[float] = None):
+        """
+        Initialize an empty ledger.
+
+        Args:
+            bot_id: Database ID of the bot this ledger belongs to
+            reconcile_seconds: If set, ``needs_reconcile`` turns True after this
+                many seconds so the owner can re-seed from the database
+        """
+        self.bot_id = bot_id
+        self.reconcile_seconds = reconcile_seconds
+        self.day_start = utc_day_start()
+        self.trade_count = 0
+        self.realized_pnl = 0.0
+        self._seeded_at: Optional[float] = None
+        self._lock = Lock()
+
+    @property
+    def is_seeded(self) -> bool:
+        """True once the ledger has been loaded from the database."""
+        return self._seeded_at is not None
+
+    def seed(self, trade_count: int, realized_pnl: Optional[float], day_start: Optional[datetime] = None):
+        """Replace the ledger totals with values loaded from the database."""
+        with self._lock:
+            self.day_start = day_start or utc_day_start()
+            self.trade_count = int(trade_count or 0)
+            self.realized_pnl = float(realized_pnl or 0.0)
+            self._seeded_at = time.monotonic()
+        logger.debug(
+            f"Ledger for bot {self.bot_id} seeded: {self.trade_count} trades, PnL {self.realized_pnl:.2f}"
+        )
+
+    def roll_over(self, now: Optional[datetime] = None) -> bool:
+        """Reset the totals if a new UTC day has started. Returns True on reset."""
+        today = utc_day_start(now)
+        with self._lock:
+            if today <= self.day_start:
+                return False
+            self.day_start = today
+            self.trade_count = 0
+            self.realized_pnl = 0.0
+        logger.info(f"Ledger for bot {self.bot_id} reset for new UTC day {today.date()}")
+        return True
+
+    def needs_reconcile(self) -> bool:
+        """True when the ledger was never seeded or its reconcile interval elapsed."""
+        if self._seeded_at is None:
+            return True
+        if self.reconcile_seconds is None:
+            return False
+        return time.monotonic() - self._seeded_at >= self.reconcile_seconds
+
+    def _counts_today(self, opened_at: Optional[datetime]) -> bool:
+        return opened_at is None or opened_at >= self.day_start
+
+    def record_trade(self, opened_at: Optional[datetime] = None):
+        """Count a newly executed trade."""
+        with self._lock:
+            if self._counts_today(opened_at):
+                self.trade_count += 1
+
+    def record_result(self, profit_loss: Optional[float], opened_at: Optional[datetime] = None):
+        """Add the realized PnL of a closed trade opened today."""
+        if not profit_loss:
+            return
+        with self._lock:
+            if self._counts_today(opened_at):
+                self.realized_pnl += float(profit_loss)
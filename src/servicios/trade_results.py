@@ -0,0 +1,193 @@
+"""Resolution of IQ Option trade results for every bot sharing a client."""
+
+from __future__ import annotations
+
+import logging
+import time
+from itertools import count
+from threading import Event, Lock
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from src.servicios.bot_scheduler import get_bot_scheduler
+
+logger = logging.getLogger(__name__)
+
+# Called with the result dict ({"result": "won"|"lost"|"equal", "profit_loss": float}),
+# or None if the result could not be determined before the timeout
+ResultCallback = Callable[[Optional[Dict[str, Any]]], None]
+
+# How often pushed socket results are checked while orders are pending
+SOCKET_CHECK_SECONDS = 1.0
+# Grace period after expiry before asking the SDK, how often to ask and when to give up
+POLL_GRACE_SECONDS = 5.0
+POLL_INTERVAL_SECONDS = 5.0
+RESULT_TIMEOUT_SECONDS = 300.0
+# Closed options requested per batched poll on top of the orders being polled,
+# for options of the account that closed after them (other bots, manual trades)
+POLL_MARGIN = 30
+
+
+def parse_closed_option(message: Any) -> Optional[Dict[str, Any]]:
+    """
+    Turn an IQ Option closed-option payload into a result dict.
+
+    Accepts the ``option-closed`` socket message (``win``/``sum``/``win_amount``)
+    and the entries of ``get_optioninfo_v2()["msg"]["closed_options"]``
+    (``win``/``amount``/``win_amount``).
+    """
+    if not isinstance(message, dict):
+        return None
+    message = message.get("msg", message)
+    outcome = message.get("win") or message.get("result")
+    if outcome not in ("win", "loose", "lose", "equal"):
+        return None
+
+    stake = float(message.get("sum", message.get("amount")) or 0.0)
+    if outcome == "equal":
+        return {"result": "equal", "profit_loss": 0.0}
+    if outcome == "win":
+        return {"result": "won", "profit_loss": float(message.get("win_amount") or 0.0) - stake}
+    return {"result": "lost", "profit_loss": -stake}
+
+
+class _PendingOrder:
+    def __init__(self, order_id: str, expires_at: float, on_result: ResultCallback):
+        self.order_id = order_id
+        self.expires_at = expires_at
+        self.on_result = on_result
+        self.next_poll = expires_at + POLL_GRACE_SECONDS
+
+
+class TradeResultResolver:
+    """
+    Tracks the open orders of one IQ Option client and resolves them in one place.
+
+    Results pushed by the SDK's websocket (``option-closed``/position-changed
+    messages) are picked up as soon as they arrive. Orders still open after
+    expiry are resolved with one batched ``get_optioninfo_v2`` request for all
+    of them. Resolution runs as a job on the bot scheduler, so no bot waits
+    for its own trade.
+    """
+
+    _generations = count()
+
+    def __init__(self, client: Any):
+        self.client = client
+        self._pending: Dict[str, _PendingOrder] = {}
+        self._lock = Lock()
+        self._job_active = False
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def track(self, order_id: str, expires_at: float, on_result: ResultCallback):
+        """
+        Resolve ``order_id`` and call ``on_result`` once its result is known.
+
+        Args:
+            order_id: Order ID returned by ``buy()``
+            expires_at: Epoch seconds at which the option expires
+            on_result: Callback run on the scheduler's executor with the result
+        """
+        with self._lock:
+            self._pending[str(order_id)] = _PendingOrder(str(order_id), expires_at, on_result)
+            if self._job_active:
+                return
+            self._job_active = True
+        key = ("iq-results", id(self.client), next(self._generations))
+        get_bot_scheduler().add(key, self.tick, Event(), first_delay=SOCKET_CHECK_SECONDS)
+
+    def _pushed_result(self, order_id: str) -> Optional[Dict[str, Any]]:
+        """Result already pushed through the websocket, without any request."""
+        try:
+            order = self.client.get_async_order(int(order_id))
+            result = parse_closed_option((order or {}).get("option-closed"))
+            if result:
+                return result
+        except Exception:
+            pass
+        closed = getattr(getattr(self.client, "api", None), "socket_option_closed", None)
+        if isinstance(closed, dict):
+            return parse_closed_option(closed.get(int(order_id)) or closed.get(order_id))
+        return None
+
+    def _poll_closed_options(self, count: int) -> Dict[str, Dict[str, Any]]:
+        """One batched request for the most recently closed options, sized for ``count`` orders."""
+        try:
+            info = self.client.get_optioninfo_v2(count + POLL_MARGIN)
+        except Exception as e:
+            logger.warning(f"Error polling closed options: {e}")
+            return {}
+        results = {}
+        for option in ((info or {}).get("msg") or {}).get("closed_options") or []:
+            option_ids = option.get("id")
+            option_ids = option_ids if isinstance(option_ids, list) else [option_ids]
+            result = parse_closed_option(option)
+            if result:
+                results.update({str(option_id): result for option_id in option_ids})
+        return results
+
+    def _resolve(self, orders: Iterable[_PendingOrder], results: Dict[str, Optional[Dict[str, Any]]]):
+        for order in orders:
+            if order.order_id not in results:
+                continue
+            with self._lock:
+                self._pending.pop(order.order_id, None)
+            try:
+                order.on_result(results[order.order_id])
+            except Exception as e:
+                logger.error(f"Error handling result of order {order.order_id}: {e}", exc_info=True)
+
+    def tick(self) -> Optional[float]:
+        """Resolve what can be resolved now. Returns None once nothing is pending."""
+        now = time.time()
+        with self._lock:
+            orders = list(self._pending.values())
+
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        for order in orders:
+            result = self._pushed_result(order.order_id)
+            if result:
+                results[order.order_id] = result
+
+        due = [o for o in orders if o.order_id not in results and now >= o.next_poll]
+        if due:
+            polled = self._poll_closed_options(len(due))
+            for order in due:
+                if order.order_id in polled:
+                    results[order.order_id] = polled[order.order_id]
+                elif now - order.expires_at >= RESULT_TIMEOUT_SECONDS:
+                    logger.warning(f"Timeout checking trade result for order {order.order_id}")
+                    results[order.order_id] = None
+                else:
+                    order.next_poll = now + POLL_INTERVAL_SECONDS
+
+        self._resolve(orders, results)
+
+        with self._lock:
+            if not self._pending:
+                self._job_active = False
+                return None
+        return SOCKET_CHECK_SECONDS
+
+
+# Keyed by id(client); each resolver holds its client, so the id cannot be reused while cached
+_resolvers: Dict[int, TradeResultResolver] = {}
+_resolvers_lock = Lock()
+
+
+def get_trade_resolver(client: Any) -> TradeResultResolver:
+    """Return the trade result resolver of an IQ Option client, shared by its bots."""
+    with _resolvers_lock:
+        resolver = _resolvers.get(id(client))
+        if resolver is None:
+            resolver = TradeResultResolver(client)
+            _resolvers[id(client)] = resolver
+        return resolver
+
+
+def drop_trade_resolver(client: Any):
+    """Forget the resolver of a client that logged out (a running job still settles its orders)."""
+    with _resolvers_lock:
+        _resolvers.pop(id(client), None)
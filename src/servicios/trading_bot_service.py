@@ -6,15 +6,34 @@ import logging
 import time
 import json
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
-from threading import Thread, Event
+from typing import Optional, Dict, Any, List, Tuple
+from threading import Event, Lock
 
+from sqlalchemy import case, func
+
+from src.servicios.bot_scheduler import get_bot_scheduler
+from src.servicios.candle_history import iqoption_page_fetcher
+from src.servicios.candles import OHLCV
 from src.servicios.database import get_session
+from src.servicios.iq_account import get_account_session
+from src.servicios.market_data import FETCH_LIMIT, FeedKey, get_market_data_hub
+from src.servicios.market_status import get_market_status_cache
 from src.servicios.models import TradingBot, TradingSignal, BotStatus, SignalStatus, SignalType
+from src.servicios.risk_ledger import DailyRiskLedger, utc_day_start
+from src.servicios.trade_results import get_trade_resolver
 from src.servicios.trading_strategies import get_strategy, TradingStrategy
 
 logger = logging.getLogger(__name__)
 
+# Retry delays when market data is missing, the market is closed or a tick fails
+NO_DATA_RETRY_SECONDS = 10
+MARKET_CLOSED_RETRY_SECONDS = 300
+ERROR_RETRY_SECONDS = 60
+# Open positions allowed per bot unless config_json sets "max_open_positions"
+DEFAULT_MAX_OPEN_POSITIONS = 1
+# Margin added to the option duration to estimate its expiry (turbo expiries round up)
+EXPIRY_BUFFER_SECONDS = 30
+
 
 class TradingBotService:
     """Service for managing trading bot operations."""
@@ -32,8 +51,23 @@ class TradingBotService:
         self.bot_config: Optional[TradingBot] = None
         self.strategy: Optional[TradingStrategy] = None
         self.stop_event = Event()
-        self.thread: Optional[Thread] = None
         self.is_running = False
+        self.job_key = ("iqoption", bot_id)
+        self.ledger = DailyRiskLedger(bot_id)
+        self.feed_key: Optional[FeedKey] = None
+        
+        # Loop state carried between ticks
+        self._iteration = 0
+        self._last_trade_amount: Optional[float] = None
+        self._last_trade_result: Optional[str] = None
+        # Trades waiting for their result, by order ID (settled by the trade resolver)
+        self.max_open_positions = DEFAULT_MAX_OPEN_POSITIONS
+        self._open_trades: Dict[str, Dict[str, Any]] = {}
+        self._trades_lock = Lock()
+        # Results can arrive out of order; martingale sizing consumes them in opening order
+        self._trade_seq = 0
+        self._next_settled_seq = 0
+        self._settled: Dict[int, Tuple[float, Optional[Dict[str, Any]]]] = {}
         
         # Load bot configuration
         self._load_config()
@@ -67,19 +101,60 @@ class TradingBotService:
             if not self.strategy:
                 raise ValueError(f"Unknown strategy: {self.bot_config.strategy}")
             
+            self.max_open_positions = self._parse_max_open_positions(
+                strategy_config.get("max_open_positions", DEFAULT_MAX_OPEN_POSITIONS)
+            )
+            
+            self.feed_key = ("iqoption", active_id, f"{self.bot_config.duration}m")
+            
             logger.info(f"Loaded bot config: {self.bot_config.name} with strategy {self.bot_config.strategy}")
         finally:
             session.close()
     
+    def _parse_max_open_positions(self, value: Any) -> int:
+        """``max_open_positions`` from config_json: the default if not an integer, at least 1."""
+        try:
+            limit = int(value)
+        except (TypeError, ValueError):
+            logger.warning(f"Bot {self.bot_id}: invalid max_open_positions {value!r}, "
+                           f"using {DEFAULT_MAX_OPEN_POSITIONS}")
+            return DEFAULT_MAX_OPEN_POSITIONS
+        if limit < 1:
+            logger.warning(f"Bot {self.bot_id}: max_open_positions {limit} would block every trade, using 1")
+            return 1
+        return limit
+    
     def start(self):
-        """Start the trading bot in a separate thread."""
+        """Start the trading bot on the shared bot scheduler."""
         if self.is_running:
             logger.warning("Bot is already running")
             return False
         
+        if not self.bot_config or not self.strategy:
+            logger.error("Bot configuration or strategy not loaded")
+            self._update_bot_status(BotStatus.ERROR.value)
+            return False
+        
+        logger.info(f"Bot {self.bot_id} main loop started")
+        logger.info(f"Trading on: {self.bot_config.active_id}")
+        logger.info(f"Strategy: {self.bot_config.strategy}")
+        
+        # Arm the account mode once so orders go straight to buy()
+        try:
+            get_account_session(self.client).ensure_mode(self.bot_config.account_type or "PRACTICE")
+        except Exception as e:
+            logger.warning(f"Could not set account type for bot {self.bot_id}: {e}")
+        
         self.stop_event.clear()
-        self.thread = Thread(target=self._run, daemon=True)
-        self.thread.start()
+        self._iteration = 0
+        self._last_trade_amount = self.bot_config.initial_amount
+        self._last_trade_result = None
+        get_market_data_hub().subscribe(self.feed_key, self.bot_id, self._fetch_candles)
+        self._warm_start()
+        if not get_bot_scheduler().add(self.job_key, self._tick, self.stop_event, on_exit=self._finish):
+            logger.warning(f"Bot {self.bot_id} is already scheduled")
+            get_market_data_hub().unsubscribe(self.feed_key, self.bot_id)
+            return False
         self.is_running = True
         
         # Update bot status in database
@@ -94,11 +169,10 @@ class TradingBotService:
             logger.warning("Bot is not running")
             return False
         
-        self.stop_event.set()
-        if self.thread:
-            self.thread.join(timeout=10)
+        get_bot_scheduler().cancel(self.job_key, timeout=10)
         
         self.is_running = False
+        get_market_data_hub().unsubscribe(self.feed_key, self.bot_id)
         self._update_bot_status(BotStatus.STOPPED.value)
         
         logger.info(f"Trading bot {self.bot_id} stopped")
@@ -119,105 +193,100 @@ class TradingBotService:
         finally:
             session.close()
     
+    def _seed_ledger(self, session):
+        """Load today's trade count and realized PnL with a single aggregate query."""
+        today_start = utc_day_start()
+        executed_statuses = [SignalStatus.EXECUTED.value, SignalStatus.WON.value, SignalStatus.LOST.value]
+        trade_count, total_pnl = session.query(
+            func.count(case((TradingSignal.status.in_(executed_statuses), 1))),
+            func.coalesce(func.sum(TradingSignal.profit_loss), 0.0),
+        ).filter(
+            TradingSignal.bot_id == self.bot_id,
+            TradingSignal.created_at >= today_start
+        ).one()
+        self.ledger.seed(trade_count, total_pnl, today_start)
+    
     def _check_limits(self, session) -> bool:
         """Check if bot has reached daily limits."""
         if not self.bot_config:
             return False
         
-        # Check max trades per day
-        today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        today_trades = session.query(TradingSignal).filter(
-            TradingSignal.bot_id == self.bot_id,
-            TradingSignal.created_at >= today_start,
-            TradingSignal.status.in_([SignalStatus.EXECUTED.value, SignalStatus.WON.value, SignalStatus.LOST.value])
-        ).count()
+        self.ledger.roll_over()
+        if self.ledger.needs_reconcile():
+            self._seed_ledger(session)
         
+        # Check max trades per day
+        today_trades = self.ledger.trade_count
         if today_trades >= self.bot_config.max_trades_per_day:
             logger.info(f"Bot {self.bot_id} reached max trades per day: {today_trades}")
             return False
         
+        total_pnl = self.ledger.realized_pnl
+        
         # Check stop loss
-        if self.bot_config.stop_loss:
-            signals = session.query(TradingSignal).filter(
-                TradingSignal.bot_id == self.bot_id,
-                TradingSignal.created_at >= today_start,
-                TradingSignal.profit_loss.isnot(None)
-            ).all()
-            
-            total_pnl = sum(s.profit_loss for s in signals if s.profit_loss)
-            
-            if total_pnl <= -abs(self.bot_config.stop_loss):
-                logger.info(f"Bot {self.bot_id} hit stop loss: {total_pnl}")
-                return False
+        if self.bot_config.stop_loss and total_pnl <= -abs(self.bot_config.stop_loss):
+            logger.info(f"Bot {self.bot_id} hit stop loss: {total_pnl}")
+            return False
         
         # Check stop gain
-        if self.bot_config.stop_gain:
-            signals = session.query(TradingSignal).filter(
-                TradingSignal.bot_id == self.bot_id,
-                TradingSignal.created_at >= today_start,
-                TradingSignal.profit_loss.isnot(None)
-            ).all()
-            
-            total_pnl = sum(s.profit_loss for s in signals if s.profit_loss)
-            
-            if total_pnl >= self.bot_config.stop_gain:
-                logger.info(f"Bot {self.bot_id} hit stop gain: {total_pnl}")
-                return False
+        if self.bot_config.stop_gain and total_pnl >= self.bot_config.stop_gain:
+            logger.info(f"Bot {self.bot_id} hit stop gain: {total_pnl}")
+            return False
         
         return True
     
-    def _get_candles(self, active_id: str, duration: int, count: int = 100) -> List[Dict]:
-        """Get historical candle data."""
+    def _fetch_candles(self, since: Optional[int] = None) -> OHLCV:
+        """Fetch candles opened at or after ``since`` (ms) for the shared market data feed."""
+        active_id = self.bot_config.active_id
+        duration = self.bot_config.duration
         try:
             # Get candles from IQ Option API
             # duration is in minutes, API expects seconds
             end_time = time.time()
+            count = FETCH_LIMIT
+            if since is not None:
+                # Only the bars closed since the last fetch plus the forming one
+                elapsed_bars = int((end_time - since / 1000) // (duration * 60))
+                count = max(1, min(FETCH_LIMIT, elapsed_bars + 1))
             logger.info(f"Requesting {count} candles for {active_id} (duration: {duration}m)")
             candles = self.client.get_candles(active_id, duration * 60, count, end_time)
             
             if candles and isinstance(candles, list):
                 logger.info(f"Received {len(candles)} candles for {active_id}")
-                # Convert to list of dicts if needed
-                result = []
-                for candle in candles:
-                    if isinstance(candle, dict):
-                        result.append(candle)
-                    else:
-                        # If it's an object, convert to dict
-                        result.append({
-                            'open': float(getattr(candle, 'open', 0)),
-                            'high': float(getattr(candle, 'max', 0)),
-                            'low': float(getattr(candle, 'min', 0)),
-                            'close': float(getattr(candle, 'close', 0)),
-                            'volume': float(getattr(candle, 'volume', 0)),
-                        })
-                logger.debug(f"Latest candle close: {result[-1]['close']}")
+                result = OHLCV.from_iq_candles(candles)
+                if len(result):
+                    logger.debug(f"Latest candle close: {result.last_close}")
                 return result
             else:
                 logger.warning(f"No candles received for {active_id} or invalid format")
         except Exception as e:
             logger.error(f"Error getting candles for {active_id}: {e}", exc_info=True)
         
-        return []
+        return OHLCV.empty()
+    
+    def _warm_start(self):
+        """Seed the candle feed from the local candle history plus a short gap fill."""
+        try:
+            fetch_page = iqoption_page_fetcher(self.client, self.bot_config.active_id, self.feed_key[2])
+            get_market_data_hub().warm_start(self.feed_key, fetch_page)
+        except Exception as e:
+            logger.warning(f"Could not warm-start candles for bot {self.bot_id}: {e}")
+    
+    def _get_candles(self, count: Optional[int] = FETCH_LIMIT) -> OHLCV:
+        """Get historical candle data from the shared market data hub."""
+        return get_market_data_hub().get_candles(self.feed_key, count)
     
     def _is_market_open(self, active_id: str) -> bool:
         """Check if a market is currently open for trading."""
         try:
-            all_actives = self.client.get_all_open_time()
+            status = get_market_status_cache(self.client).get(active_id)
             
-            if not all_actives or active_id not in all_actives:
+            if not status:
                 logger.warning(f"Market {active_id} not found in active list")
                 return False
             
-            active_info = all_actives[active_id]
-            if not isinstance(active_info, dict):
-                return False
-            
-            binary = active_info.get("binary", {})
-            turbo = active_info.get("turbo", {})
-            
-            binary_enabled = binary.get("enabled", False)
-            turbo_enabled = turbo.get("enabled", False)
+            binary_enabled = status["binary"]
+            turbo_enabled = status["turbo"]
             
             is_open = binary_enabled or turbo_enabled
             
@@ -243,22 +312,6 @@ class TradingBotService:
                 logger.error(f"   Please check market hours or try a different active")
                 return None
             
-            # Set account type (PRACTICE or REAL)
-            account_type = self.bot_config.account_type if self.bot_config else "PRACTICE"
-            logger.info(f"Setting account type to: {account_type}")
-            self.client.change_balance(account_type)
-            
-            # Wait a moment for balance change
-            time.sleep(1)
-            
-            # Verify balance
-            balance = self.client.get_balance()
-            logger.info(f"Current balance: ${balance}")
-            
-            if balance < amount:
-                logger.error(f"Insufficient balance: ${balance} < ${amount}")
-                return None
-            
             # Log trade parameters
             logger.info(f"Executing trade:")
             logger.info(f"  Type: {signal_type.upper()}")
@@ -266,55 +319,68 @@ class TradingBotService:
             logger.info(f"  Amount: ${amount}")
             logger.info(f"  Duration: {duration} minute(s)")
             
-            # Check which type of options are available
-            all_actives = None
+            # Check which type of options are available (same cached snapshot as above)
+            status = None
             try:
-                all_actives = self.client.get_all_open_time()
+                status = get_market_status_cache(self.client).get(active_id)
             except Exception as e:
                 logger.warning(f"Could not get market status: {e}")
                 logger.info("Proceeding with trade attempt anyway...")
             
             option_type = "binary"  # default
             
-            if all_actives and active_id in all_actives:
-                active_info = all_actives[active_id]
-                if isinstance(active_info, dict):
-                    turbo_enabled = active_info.get("turbo", {}).get("enabled", False)
-                    binary_enabled = active_info.get("binary", {}).get("enabled", False)
-                    
-                    if duration <= 5 and turbo_enabled:
-                        option_type = "turbo"
-                        logger.info(f"Using TURBO options (duration <= 5 min)")
-                    elif binary_enabled:
-                        option_type = "binary"
-                        logger.info(f"Using BINARY options")
-                    else:
-                        logger.warning(f"⚠️  Market {active_id} may be closed")
-                        logger.warning(f"   Binary enabled: {binary_enabled}")
-                        logger.warning(f"   Turbo enabled: {turbo_enabled}")
-                        logger.info("Attempting trade anyway - IQ Option will reject if truly closed")
+            if status:
+                turbo_enabled = status["turbo"]
+                binary_enabled = status["binary"]
+                
+                if duration <= 5 and turbo_enabled:
+                    option_type = "turbo"
+                    logger.info(f"Using TURBO options (duration <= 5 min)")
+                elif binary_enabled:
+                    option_type = "binary"
+                    logger.info(f"Using BINARY options")
+                else:
+                    logger.warning(f"⚠️  Market {active_id} may be closed")
+                    logger.warning(f"   Binary enabled: {binary_enabled}")
+                    logger.warning(f"   Turbo enabled: {turbo_enabled}")
+                    logger.info("Attempting trade anyway - IQ Option will reject if truly closed")
             else:
                 logger.info(f"Could not verify market status, attempting trade anyway...")
             
-            # Buy option based on duration
-            if duration <= 5:
-                # For short durations (1-5 min), use buy() which typically uses turbo
-                logger.info(f"Attempting to buy option (duration: {duration}m)...")
-                check, order_id = self.client.buy(
-                    amount,
-                    active_id,
-                    signal_type.lower(),
-                    duration
-                )
-            else:
-                # For longer durations, might need different method
-                logger.info(f"Attempting to buy digital option...")
-                check, order_id = self.client.buy_digital_spot(
-                    active_id,
-                    amount,
-                    signal_type.lower(),
-                    duration
-                )
+            # The account mode was armed at start; this only switches if another bot changed it
+            account_type = self.bot_config.account_type if self.bot_config else "PRACTICE"
+            account = get_account_session(self.client)
+            with account.armed(account_type):
+                # Verify balance (tracked locally, reconciled periodically)
+                balance = account.get_balance()
+                logger.info(f"Current balance: ${balance}")
+                
+                if balance < amount:
+                    logger.error(f"Insufficient balance: ${balance} < ${amount}")
+                    return None
+                
+                # Buy option based on duration
+                if duration <= 5:
+                    # For short durations (1-5 min), use buy() which typically uses turbo
+                    logger.info(f"Attempting to buy option (duration: {duration}m)...")
+                    check, order_id = self.client.buy(
+                        amount,
+                        active_id,
+                        signal_type.lower(),
+                        duration
+                    )
+                else:
+                    # For longer durations, might need different method
+                    logger.info(f"Attempting to buy digital option...")
+                    check, order_id = self.client.buy_digital_spot(
+                        active_id,
+                        amount,
+                        signal_type.lower(),
+                        duration
+                    )
+                
+                if check:
+                    account.record_open(amount)
             
             logger.info(f"Buy response - check: {check}, order_id: {order_id}")
             
@@ -343,182 +409,195 @@ class TradingBotService:
             logger.error(f"❌ Exception executing trade: {e}", exc_info=True)
             return None
     
-    def _check_trade_result(self, order_id: str, timeout: int = 300) -> Optional[Dict[str, Any]]:
-        """Check the result of a trade."""
-        try:
-            start_time = time.time()
-            while time.time() - start_time < timeout:
-                # Check if option is closed
-                result = self.client.check_win_v3(order_id)
-                
-                if result is not None and result != 0:
-                    return {
-                        "result": "won" if result > 0 else "lost",
-                        "profit_loss": float(result)
-                    }
-                
-                time.sleep(5)  # Check every 5 seconds
-            
-            logger.warning(f"Timeout checking trade result for order {order_id}")
-            return None
+    def _on_trade_result(self, trade: Dict[str, Any], result: Optional[Dict[str, Any]]):
+        """Record the result of a trade once the trade resolver settles it."""
+        with self._trades_lock:
+            self._open_trades.pop(trade["order_id"], None)
+            self._settled[trade["seq"]] = (trade["amount"], result)
+            self._drain_settled()
+        
+        if not result:
+            logger.warning(f"Could not determine trade result for order {trade['order_id']}")
+            return
         
+        session = get_session()
+        try:
+            db_signal = session.query(TradingSignal).filter_by(id=trade["signal_id"]).first()
+            if db_signal:
+                # A tie refunds the stake: the signal stays EXECUTED with zero PnL
+                if result["result"] == "won":
+                    db_signal.status = SignalStatus.WON.value
+                elif result["result"] == "lost":
+                    db_signal.status = SignalStatus.LOST.value
+                db_signal.profit_loss = result["profit_loss"]
+                db_signal.closed_at = datetime.utcnow()
+                session.commit()
         except Exception as e:
-            logger.error(f"Error checking trade result: {e}")
-            return None
-    
-    def _run(self):
-        """Main bot loop."""
-        logger.info(f"Bot {self.bot_id} main loop started")
-        logger.info(f"Trading on: {self.bot_config.active_id if self.bot_config else 'Unknown'}")
-        logger.info(f"Strategy: {self.bot_config.strategy if self.bot_config else 'Unknown'}")
+            logger.error(f"Error saving trade result: {e}")
+            session.rollback()
+        finally:
+            session.close()
         
-        if not self.bot_config or not self.strategy:
-            logger.error("Bot configuration or strategy not loaded")
-            self._update_bot_status(BotStatus.ERROR.value)
-            return
+        self.ledger.record_result(result["profit_loss"], trade["opened_at"])
+        get_account_session(self.client).record_close(
+            trade["amount"], result["profit_loss"], self.bot_config.account_type or "PRACTICE"
+        )
         
-        last_trade_amount = self.bot_config.initial_amount
-        last_trade_result = None
-        iteration = 0
+        logger.info(f"Trade {result['result']}: PnL = {result['profit_loss']}")
+    
+    def _drain_settled(self):
+        """Feed settled results to the martingale state in the order the trades were opened."""
+        while self._next_settled_seq in self._settled:
+            amount, result = self._settled.pop(self._next_settled_seq)
+            self._next_settled_seq += 1
+            # Unknown results leave the martingale state unchanged
+            if result:
+                self._last_trade_result = result["result"]
+                self._last_trade_amount = amount
+    
+    def _until_next_bar(self) -> float:
+        """Seconds until the bot should analyze again: right after the current bar closes."""
+        delay = get_bot_scheduler().until_bar_close(self.bot_config.duration * 60)
+        logger.info(f"Waiting {delay:.0f} seconds for the next {self.bot_config.duration}m bar close...")
+        return delay
+    
+    def _tick(self) -> Optional[float]:
+        """
+        Run one iteration of the bot loop.
         
-        while not self.stop_event.is_set():
+        Returns:
+            Seconds until the next iteration, or None to stop the bot
+        """
+        try:
+            session = get_session()
             try:
-                iteration += 1
-                logger.info(f"=== Bot iteration {iteration} ===")
+                self._iteration += 1
+                logger.info(f"=== Bot iteration {self._iteration} ===")
                 
-                session = get_session()
-                try:
-                    # Check limits
-                    if not self._check_limits(session):
-                        logger.info(f"Bot {self.bot_id} stopped due to limits")
-                        break
-                    
-                    # Get market data
-                    logger.info(f"Fetching market data for {self.bot_config.active_id}...")
-                    candles = self._get_candles(
-                        self.bot_config.active_id,
-                        self.bot_config.duration,
-                        100
-                    )
-                    
-                    if not candles:
-                        logger.warning("No candles received, waiting 10 seconds...")
-                        time.sleep(10)
-                        continue
-                    
-                    logger.info(f"Successfully retrieved {len(candles)} candles")
-                    
-                    # Get current price from the last candle
-                    current_price = candles[-1].get("close")
-                    if not current_price or current_price <= 0:
-                        logger.warning(f"Invalid current price ({current_price}), waiting 10 seconds...")
-                        time.sleep(10)
-                        continue
-                    
-                    logger.info(f"Current price: {current_price}")
-                    
-                    # Analyze with strategy
-                    logger.info(f"Analyzing market with {self.bot_config.strategy} strategy...")
-                    signal = self.strategy.analyze(candles, current_price)
+                # Check limits
+                if not self._check_limits(session):
+                    logger.info(f"Bot {self.bot_id} stopped due to limits")
+                    return None
+                
+                # Get market data
+                logger.info(f"Fetching market data for {self.bot_config.active_id}...")
+                # The first window holds every buffered bar so indicators start fully warmed up
+                candles = self._get_candles(None if self._iteration == 1 else FETCH_LIMIT)
+                
+                if not candles:
+                    logger.warning(f"No candles received, waiting {NO_DATA_RETRY_SECONDS} seconds...")
+                    return NO_DATA_RETRY_SECONDS
+                
+                logger.info(f"Successfully retrieved {len(candles)} candles")
+                
+                # Get current price from the last candle
+                current_price = candles.last_close
+                if not current_price or current_price <= 0:
+                    logger.warning(f"Invalid current price ({current_price}), waiting {NO_DATA_RETRY_SECONDS} seconds...")
+                    return NO_DATA_RETRY_SECONDS
+                
+                logger.info(f"Current price: {current_price}")
+                
+                # Analyze with strategy
+                logger.info(f"Analyzing market with {self.bot_config.strategy} strategy...")
+                # Evaluate the bar that just closed, not the one that has just opened
+                signal = self.strategy.analyze(candles.closed(self.bot_config.duration * 60), current_price)
+                
+                if not signal:
+                    logger.info("No signal detected, continuing to monitor...")
+                    return self._until_next_bar()
+                
+                logger.info(f"🎯 Signal detected: {signal.signal_type.upper()} - {signal.reason} (confidence: {signal.confidence:.2f})")
+                
+                if len(self._open_trades) >= self.max_open_positions:
+                    logger.info(f"Signal ignored: {len(self._open_trades)} open position(s), "
+                                f"max_open_positions is {self.max_open_positions}")
+                    return self._until_next_bar()
+                
+                # Calculate trade amount
+                trade_amount = self.strategy.get_next_amount(
+                    self._last_trade_result,
+                    self._last_trade_amount,
+                    self.bot_config.initial_amount,
+                    self.bot_config.max_amount
+                )
+                
+                logger.info(f"💰 Trade amount: ${trade_amount}")
+                
+                # Create signal record in database
+                opened_at = datetime.utcnow()
+                db_signal = TradingSignal(
+                    bot_id=self.bot_id,
+                    active_id=self.bot_config.active_id,
+                    signal_type=signal.signal_type.upper(),
+                    status=SignalStatus.PENDING.value,
+                    amount=trade_amount,
+                    duration=self.bot_config.duration,
+                    entry_price=current_price,
+                    created_at=opened_at
+                )
+                session.add(db_signal)
+                session.commit()
+                
+                # Execute trade
+                trade_result = self._execute_trade(
+                    signal.signal_type,
+                    trade_amount,
+                    self.bot_config.duration,
+                    self.bot_config.active_id
+                )
+                
+                if not trade_result:
+                    # Trade execution failed
+                    db_signal.status = SignalStatus.CANCELLED.value
+                    db_signal.error_message = "Trade execution failed"
+                    session.commit()
+                    logger.error("❌ Trade execution failed")
                     
-                    if signal:
-                        logger.info(f"🎯 Signal detected: {signal.signal_type.upper()} - {signal.reason} (confidence: {signal.confidence:.2f})")
-                        
-                        # Calculate trade amount
-                        trade_amount = self.strategy.get_next_amount(
-                            last_trade_result,
-                            last_trade_amount,
-                            self.bot_config.initial_amount,
-                            self.bot_config.max_amount
-                        )
-                        
-                        logger.info(f"💰 Trade amount: ${trade_amount}")
-                        
-                        # Create signal record in database
-                        db_signal = TradingSignal(
-                            bot_id=self.bot_id,
-                            active_id=self.bot_config.active_id,
-                            signal_type=signal.signal_type.upper(),
-                            status=SignalStatus.PENDING.value,
-                            amount=trade_amount,
-                            duration=self.bot_config.duration,
-                            entry_price=current_price
-                        )
-                        session.add(db_signal)
-                        session.commit()
-                        
-                        # Execute trade
-                        trade_result = self._execute_trade(
-                            signal.signal_type,
-                            trade_amount,
-                            self.bot_config.duration,
-                            self.bot_config.active_id
-                        )
-                        
-                        if trade_result:
-                            # Update signal with execution info
-                            db_signal.status = SignalStatus.EXECUTED.value
-                            db_signal.order_id = trade_result["order_id"]
-                            db_signal.executed_at = datetime.utcnow()
-                            session.commit()
-                            
-                            last_trade_amount = trade_amount
-                            
-                            # Wait for trade to complete
-                            wait_time = self.bot_config.duration * 60 + 30  # duration + 30 seconds buffer
-                            logger.info(f"Waiting {wait_time} seconds for trade to complete...")
-                            
-                            for _ in range(wait_time):
-                                if self.stop_event.is_set():
-                                    break
-                                time.sleep(1)
-                            
-                            # Check result
-                            result = self._check_trade_result(trade_result["order_id"])
-                            
-                            if result:
-                                db_signal.status = SignalStatus.WON.value if result["result"] == "won" else SignalStatus.LOST.value
-                                db_signal.profit_loss = result["profit_loss"]
-                                db_signal.closed_at = datetime.utcnow()
-                                session.commit()
-                                
-                                last_trade_result = result["result"]
-                                logger.info(f"Trade {result['result']}: PnL = {result['profit_loss']}")
-                            else:
-                                logger.warning("Could not determine trade result")
-                        else:
-                            # Trade execution failed
-                            db_signal.status = SignalStatus.CANCELLED.value
-                            db_signal.error_message = "Trade execution failed"
-                            session.commit()
-                            logger.error("❌ Trade execution failed")
-                            
-                            # Check if market is closed - wait longer before retrying
-                            if not self._is_market_open(self.bot_config.active_id):
-                                logger.warning(f"⏸️  Market {self.bot_config.active_id} is CLOSED")
-                                logger.warning(f"   Bot will wait 5 minutes before checking again...")
-                                logger.warning(f"   (You can stop the bot anytime with /bot/{self.bot_id}/stop)")
-                                
-                                # Wait 5 minutes with stop check
-                                for _ in range(300):  # 5 minutes = 300 seconds
-                                    if self.stop_event.is_set():
-                                        break
-                                    time.sleep(1)
-                                continue  # Skip the normal wait time
-                    else:
-                        logger.info("No signal detected, continuing to monitor...")
+                    # Check if market is closed - wait longer before retrying
+                    if not self._is_market_open(self.bot_config.active_id):
+                        logger.warning(f"⏸️  Market {self.bot_config.active_id} is CLOSED")
+                        logger.warning(f"   Bot will wait 5 minutes before checking again...")
+                        logger.warning(f"   (You can stop the bot anytime with /bot/{self.bot_id}/stop)")
+                        return MARKET_CLOSED_RETRY_SECONDS
                     
-                    # Wait before next analysis
-                    logger.info("Waiting 30 seconds before next analysis...")
-                    time.sleep(30)  # Check for signals every 30 seconds
+                    return self._until_next_bar()
+                
+                # Update signal with execution info
+                db_signal.status = SignalStatus.EXECUTED.value
+                db_signal.order_id = trade_result["order_id"]
+                db_signal.executed_at = datetime.utcnow()
+                session.commit()
+                self.ledger.record_trade(opened_at)
                 
-                finally:
-                    session.close()
+                # The result is settled in the background; keep analyzing meanwhile
+                trade = {
+                    "seq": self._trade_seq,
+                    "signal_id": db_signal.id,
+                    "order_id": trade_result["order_id"],
+                    "amount": trade_amount,
+                    "opened_at": opened_at,
+                }
+                with self._trades_lock:
+                    self._trade_seq += 1
+                    self._open_trades[trade["order_id"]] = trade
+                get_trade_resolver(self.client).track(
+                    trade["order_id"],
+                    expires_at=time.time() + self.bot_config.duration * 60 + EXPIRY_BUFFER_SECONDS,
+                    on_result=lambda result: self._on_trade_result(trade, result),
+                )
+                return self._until_next_bar()
             
-            except Exception as e:
-                logger.error(f"Error in bot loop: {e}", exc_info=True)
-                self._update_bot_status(BotStatus.ERROR.value)
-                time.sleep(60)  # Wait 1 minute before retrying
+            finally:
+                session.close()
         
+        except Exception as e:
+            logger.error(f"Error in bot loop: {e}", exc_info=True)
+            self._update_bot_status(BotStatus.ERROR.value)
+            return ERROR_RETRY_SECONDS  # Wait 1 minute before retrying
+    
+    def _finish(self):
+        """Release shared resources once the bot's scheduler job ends."""
+        get_market_data_hub().unsubscribe(self.feed_key, self.bot_id)
         self._update_bot_status(BotStatus.STOPPED.value)
         logger.info(f"Bot {self.bot_id} main loop ended")
@@ -8,9 +8,21 @@ from dataclasses import dataclass
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
 
+import numpy as np
+
+from src.servicios.candles import OHLCV
+from src.servicios.indicators import RSI, SMA, BarSync, lagged
+
 logger = logging.getLogger(__name__)
 
 
+def _zero_close_in_window(closes: np.ndarray, window: int) -> np.ndarray:
+    """For every bar, whether any of the ``window`` closes ending at it is zero (a missing quote)."""
+    zeros = np.concatenate(([0], np.cumsum(closes == 0)))
+    starts = np.maximum(np.arange(1, len(closes) + 1) - window, 0)
+    return zeros[1:] > zeros[starts]
+
+
 @dataclass
 class TradingSignal:
     """Represents a trading signal."""
@@ -28,8 +40,8 @@ class TradingStrategy(ABC):
         self.last_signals: List[TradingSignal] = []
     
     @abstractmethod
-    def analyze(self, candles: List[Dict], current_price: float) -> Optional[TradingSignal]:
-        """Analyze market data and return a trading signal if found."""
+    def analyze(self, candles: OHLCV, current_price: float) -> Optional[TradingSignal]:
+        """Analyze market data (oldest bar first) and return a trading signal if found."""
         pass
     
     @abstractmethod
@@ -37,6 +49,17 @@ class TradingStrategy(ABC):
         """Calculate the next trade amount based on strategy and previous result."""
         pass
     
+    def signal_series(self, candles: OHLCV, lookback: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        Signals for every bar of ``candles`` in one pass, for backtesting.
+
+        Element ``i`` is what ``analyze`` returns when bar ``i`` is the newest
+        bar of a window of ``lookback`` bars (all bars up to ``i`` if None):
+        1 for "call", -1 for "put", 0 for no signal. Strategies without a
+        vectorized form return None and are replayed through ``analyze`` bar by bar.
+        """
+        return None
+    
     def get_name(self) -> str:
         """Return strategy name."""
         return self.__class__.__name__
@@ -49,33 +72,36 @@ class SimpleMovingAverageCrossStrategy(TradingStrategy):
         super().__init__(config)
         self.fast_period = self.config.get("fast_period", 5)
         self.slow_period = self.config.get("slow_period", 20)
+        self.fast_sma = SMA(self.fast_period)
+        self.slow_sma = SMA(self.slow_period)
+        self._bar_sync = BarSync()
     
-    def analyze(self, candles: List[Dict], current_price: float) -> Optional[TradingSignal]:
+    def analyze(self, candles: OHLCV, current_price: float) -> Optional[TradingSignal]:
         """
         Analyze using SMA crossover.
         BUY (CALL) when fast SMA crosses above slow SMA.
         SELL (PUT) when fast SMA crosses below slow SMA.
         """
-        if len(candles) < self.slow_period:
+        if len(candles) < self.slow_period + 1:
             logger.debug("Not enough candles for SMA strategy")
             return None
         
-        # Calculate SMAs
-        closes = [float(c.get("close", 0)) for c in candles[-self.slow_period:]]
-        
-        if not closes or any(c == 0 for c in closes):
+        # Both the committed and the forming-bar SMAs must come from real quotes
+        if np.any(candles.close[-(self.slow_period + 1):] == 0):
             return None
+        close = float(candles.close[-1])
         
-        fast_sma = sum(closes[-self.fast_period:]) / self.fast_period
-        slow_sma = sum(closes) / self.slow_period
+        # Commit newly closed bars, then evaluate the forming bar
+        self._bar_sync.feed(candles, self.fast_sma, self.slow_sma)
         
-        # Previous SMAs (for crossover detection)
-        prev_closes = closes[:-1]
-        if len(prev_closes) < self.slow_period:
+        # Previous SMAs (for crossover detection) are the committed values
+        prev_fast_sma = self.fast_sma.value
+        prev_slow_sma = self.slow_sma.value
+        fast_sma = self.fast_sma.peek(close)
+        slow_sma = self.slow_sma.peek(close)
+        
+        if None in (prev_fast_sma, prev_slow_sma, fast_sma, slow_sma):
             return None
-            
-        prev_fast_sma = sum(prev_closes[-self.fast_period:]) / self.fast_period
-        prev_slow_sma = sum(prev_closes) / self.slow_period
         
         # Detect crossover
         if prev_fast_sma <= prev_slow_sma and fast_sma > slow_sma:
@@ -102,6 +128,20 @@ class SimpleMovingAverageCrossStrategy(TradingStrategy):
         
         return None
     
+    def signal_series(self, candles: OHLCV, lookback: Optional[int] = None) -> Optional[np.ndarray]:
+        """Vectorized ``analyze``: fast/slow SMA crossovers of every bar."""
+        closes = candles.close
+        fast = SMA(self.fast_period).series(closes)
+        slow = SMA(self.slow_period).series(closes)
+        prev_fast, prev_slow = lagged(fast), lagged(slow)
+        
+        signals = np.zeros(len(closes), dtype=np.int8)
+        signals[(prev_fast <= prev_slow) & (fast > slow)] = 1
+        signals[(prev_fast >= prev_slow) & (fast < slow)] = -1
+        signals[:self.slow_period] = 0
+        signals[_zero_close_in_window(closes, self.slow_period + 1)] = 0
+        return signals
+    
     def get_next_amount(self, last_result: Optional[str], current_amount: float, initial_amount: float, max_amount: float) -> float:
         """Fixed amount strategy - always use initial amount."""
         return min(initial_amount, max_amount)
@@ -115,7 +155,7 @@ class MartingaleStrategy(TradingStrategy):
         self.multiplier = self.config.get("multiplier", 2.2)
         self.reset_on_win = self.config.get("reset_on_win", True)
     
-    def analyze(self, candles: List[Dict], current_price: float) -> Optional[TradingSignal]:
+    def analyze(self, candles: OHLCV, current_price: float) -> Optional[TradingSignal]:
         """
         Simple trend following based on recent candles.
         Uses the last 3 candles to determine trend.
@@ -124,10 +164,9 @@ class MartingaleStrategy(TradingStrategy):
             logger.debug("Not enough candles for Martingale strategy")
             return None
         
-        recent_candles = candles[-5:]
-        closes = [float(c.get("close", 0)) for c in recent_candles]
+        closes = candles.close[-5:].tolist()
         
-        if not closes or any(c == 0 for c in closes):
+        if any(c == 0 for c in closes):
             return None
         
         # Simple trend detection
@@ -160,6 +199,23 @@ class MartingaleStrategy(TradingStrategy):
             self.last_signals.append(signal)
             return signal
     
+    def signal_series(self, candles: OHLCV, lookback: Optional[int] = None) -> Optional[np.ndarray]:
+        """Vectorized ``analyze``: trend of the last 5 closes at every bar."""
+        closes = candles.close
+        signals = np.zeros(len(closes), dtype=np.int8)
+        if len(closes) < 5:
+            return signals
+        
+        # Same summation order as analyze, so thresholds compare identically
+        c0, c1, c2, c3, c4 = (closes[i:len(closes) - 4 + i] for i in range(5))
+        avg_early = (c0 + c1 + c2) / 3
+        avg_recent = (c2 + c3 + c4) / 3
+        with np.errstate(divide="ignore", invalid="ignore"):
+            trend_strength = np.abs(avg_recent - avg_early) / avg_early
+        tradable = (trend_strength >= 0.001) & (c0 != 0) & (c1 != 0) & (c2 != 0) & (c3 != 0) & (c4 != 0)
+        signals[4:] = np.where(tradable, np.where(avg_recent > avg_early, 1, -1), 0)
+        return signals
+    
     def get_next_amount(self, last_result: Optional[str], current_amount: float, initial_amount: float, max_amount: float) -> float:
         """
         Martingale: multiply amount after loss, reset to initial after win.
@@ -184,30 +240,11 @@ class RSIStrategy(TradingStrategy):
         self.period = self.config.get("period", 14)
         self.oversold = self.config.get("oversold", 30)
         self.overbought = self.config.get("overbought", 70)
+        # Plain (non-Wilder) averages of the last `period` changes, as the strategy always used
+        self.rsi = RSI(self.period, wilder=False)
+        self._bar_sync = BarSync()
     
-    def calculate_rsi(self, closes: List[float]) -> Optional[float]:
-        """Calculate RSI."""
-        if len(closes) < self.period + 1:
-            return None
-        
-        # Calculate price changes
-        changes = [closes[i] - closes[i-1] for i in range(1, len(closes))]
-        
-        gains = [c if c > 0 else 0 for c in changes[-self.period:]]
-        losses = [-c if c < 0 else 0 for c in changes[-self.period:]]
-        
-        avg_gain = sum(gains) / self.period
-        avg_loss = sum(losses) / self.period
-        
-        if avg_loss == 0:
-            return 100
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi
-    
-    def analyze(self, candles: List[Dict], current_price: float) -> Optional[TradingSignal]:
+    def analyze(self, candles: OHLCV, current_price: float) -> Optional[TradingSignal]:
         """
         Analyze using RSI.
         BUY (CALL) when RSI crosses above oversold level.
@@ -217,13 +254,13 @@ class RSIStrategy(TradingStrategy):
             logger.debug("Not enough candles for RSI strategy")
             return None
         
-        closes = [float(c.get("close", 0)) for c in candles]
-        
-        if not closes or any(c == 0 for c in closes):
+        if np.any(candles.close == 0):
             return None
+        close = float(candles.close[-1])
         
-        rsi = self.calculate_rsi(closes)
-        prev_rsi = self.calculate_rsi(closes[:-1])
+        self._bar_sync.feed(candles, self.rsi)
+        rsi = self.rsi.peek(close)
+        prev_rsi = self.rsi.value
         
         if rsi is None or prev_rsi is None:
             return None
@@ -252,6 +289,20 @@ class RSIStrategy(TradingStrategy):
         
         return None
     
+    def signal_series(self, candles: OHLCV, lookback: Optional[int] = None) -> Optional[np.ndarray]:
+        """Vectorized ``analyze``: RSI leaving the oversold/overbought zones at every bar."""
+        closes = candles.close
+        rsi = RSI(self.period, wilder=False).series(closes)
+        prev_rsi = lagged(rsi)
+        
+        signals = np.zeros(len(closes), dtype=np.int8)
+        signals[(prev_rsi <= self.oversold) & (rsi > self.oversold)] = 1
+        signals[(prev_rsi >= self.overbought) & (rsi < self.overbought)] = -1
+        signals[:self.period + 1] = 0
+        # analyze rejects a window with any zero close
+        signals[_zero_close_in_window(closes, lookback or len(closes))] = 0
+        return signals
+    
     def get_next_amount(self, last_result: Optional[str], current_amount: float, initial_amount: float, max_amount: float) -> float:
         """Fixed amount strategy."""
         return min(initial_amount, max_amount)
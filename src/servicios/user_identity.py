@@ -0,0 +1,124 @@
+"""Read-through cache from a token's username to the user's database ID."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import event
+
+from src.servicios.database import get_settings
+from src.servicios.models import User
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 10000
+# Bounds how long a deactivation made outside this process goes unnoticed
+DEFAULT_TTL_SECONDS = 300
+
+
+class UserIdentityCache:
+    """
+    Bounded LRU of ``email -> (user_id, is_active)`` with a TTL.
+
+    Token-protected endpoints only need the user's ID, so a hit costs no
+    query. Entries for inactive users are kept too, so a deactivated user is
+    refused without a query until the entry expires. Deactivations done
+    through the ORM in this process update the entry at once; ``invalidate``
+    drops one (e.g. on logout).
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, ttl: float = DEFAULT_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[Optional[int], bool, float]]" = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, email: str) -> Optional[Tuple[Optional[int], bool]]:
+        """(user_id, is_active) of a cached user, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None:
+                return None
+            if entry[2] < time.monotonic():
+                del self._entries[email]
+                return None
+            self._entries.move_to_end(email)
+            return entry[0], entry[1]
+
+    def put(self, email: str, user_id: Optional[int], is_active: bool):
+        with self._lock:
+            self._entries[email] = (user_id, is_active, time.monotonic() + self.ttl)
+            self._entries.move_to_end(email)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, email: str):
+        with self._lock:
+            self._entries.pop(email, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def resolve(self, session: Any, email: str, claimed_id: Optional[int] = None) -> Optional[int]:
+        """
+        ID of the active user ``email``, querying the database only on a miss.
+
+        Args:
+            session: SQLAlchemy session used on a miss
+            email: Username from the token
+            claimed_id: ``user_id`` claim of the token, if it has one (looked up
+                by primary key, which the session may answer from its identity map)
+
+        Returns:
+            The user ID, or None if the user does not exist or is inactive
+        """
+        cached = self.get(email)
+        if cached is None:
+            user = session.get(User, claimed_id) if claimed_id is not None else None
+            if user is None or user.email != email:
+                user = session.query(User).filter_by(email=email).first()
+            if user is None:
+                return None
+            cached = (user.id, bool(user.is_active))
+            self.put(email, *cached)
+        user_id, is_active = cached
+        return user_id if is_active else None
+
+
+_cache: Optional[UserIdentityCache] = None
+_cache_lock = Lock()
+
+
+def get_identity_cache() -> UserIdentityCache:
+    """Return the process-wide identity cache configured from settings.yaml."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                cache_settings = get_settings().get("identity_cache") or {}
+                _cache = UserIdentityCache(
+                    max_size=int(cache_settings.get("max_size", DEFAULT_MAX_SIZE)),
+                    ttl=float(cache_settings.get("ttl_seconds", DEFAULT_TTL_SECONDS)),
+                )
+    return _cache
+
+
+@event.listens_for(User.is_active, "set")
+def _on_active_changed(target: User, value: Any, oldvalue: Any, initiator: Any):
+    """Keep cached entries in step with (de)activations made through the ORM."""
+    if not target.email:
+        return
+    cache = get_identity_cache()
+    if value:
+        cache.invalidate(target.email)
+    else:
+        cache.put(target.email, target.id, False)
+        logger.info(f"User {target.email} deactivated; cached identity revoked")
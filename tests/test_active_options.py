@@ -0,0 +1,57 @@
+import unittest
+from unittest.mock import MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+from src.servicios import active_options
+from src.servicios.active_options import opcode_map_hash, sync_active_options, upsert_statement
+
+
+def make_session(inserted_flags):
+    session = MagicMock()
+    session.execute.return_value.scalars.return_value.all.return_value = inserted_flags
+    return session
+
+
+class ActiveOptionsSyncTestCase(unittest.TestCase):
+    def setUp(self):
+        active_options.reset_sync_state()
+        self.addCleanup(active_options.reset_sync_state)
+
+    def test_hash_ignores_key_order(self):
+        self.assertEqual(opcode_map_hash({"EURUSD": 1, "GBPUSD": 2}), opcode_map_hash({"GBPUSD": 2, "EURUSD": 1}))
+        self.assertNotEqual(opcode_map_hash({"EURUSD": 1}), opcode_map_hash({"EURUSD": 2}))
+
+    def test_upsert_is_one_statement(self):
+        sql = str(upsert_statement({"EURUSD": 1, "GBPUSD": 2}).compile(dialect=postgresql.dialect()))
+        self.assertIn("INSERT INTO active_options", sql)
+        self.assertIn("ON CONFLICT (opcode) DO UPDATE SET is_enabled", sql)
+        self.assertIn("RETURNING xmax = 0 AS inserted", sql)
+        self.assertNotIn("name = excluded.name", sql)
+
+    def test_counts_inserted_and_updated_rows(self):
+        session = make_session([True, False, True])
+        self.assertEqual(sync_active_options(session, {"A": 1, "B": 2, "C": 3}), (2, 1))
+        session.execute.assert_called_once()
+        session.commit.assert_called_once()
+
+    def test_unchanged_map_skips_the_write(self):
+        session = make_session([True])
+        sync_active_options(session, {"EURUSD": 1})
+        self.assertIsNone(sync_active_options(session, {"EURUSD": 1}))
+        self.assertEqual(session.execute.call_count, 1)
+
+        self.assertEqual(sync_active_options(session, {"EURUSD": 1}, force=True), (1, 0))
+        self.assertEqual(session.execute.call_count, 2)
+
+    def test_failed_write_is_retried(self):
+        session = make_session([True])
+        session.execute.side_effect = RuntimeError("db down")
+        with self.assertRaises(RuntimeError):
+            sync_active_options(session, {"EURUSD": 1})
+        session.execute.side_effect = None
+        self.assertEqual(sync_active_options(session, {"EURUSD": 1}), (1, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+
+import numpy as np
+
+from src.servicios.backtest import DEFAULT_LOOKBACK, backtest_binary, backtest_spot, replay_signals
+from src.servicios.binance_strategies import get_binance_strategy
+from src.servicios.candles import OHLCV
+from src.servicios.trading_strategies import MartingaleStrategy, TradingStrategy, get_strategy
+
+
+def make_candles(closes):
+    closes = np.asarray(closes, dtype=float)
+    timestamps = np.arange(len(closes)) * 60000
+    return OHLCV(timestamps, closes, closes, closes, closes, np.ones(len(closes)))
+
+
+class FixedSignalStrategy(TradingStrategy):
+    """Emits a preset signal per bar and has no vectorized form."""
+
+    def __init__(self, signals, multiplier=2.0):
+        super().__init__()
+        self.signals = signals
+        self.multiplier = multiplier
+
+    def analyze(self, candles, current_price):
+        signal = self.signals[len(candles) - 1] if len(candles) <= len(self.signals) else None
+        if not signal:
+            return None
+        return type("Signal", (), {"signal_type": signal})()
+
+    def get_next_amount(self, last_result, current_amount, initial_amount, max_amount):
+        if last_result == "lost":
+            return min(current_amount * self.multiplier, max_amount)
+        return initial_amount
+
+
+class SignalParityTestCase(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        self.candles = make_candles(100 + np.cumsum(rng.normal(scale=0.5, size=600)))
+
+    def assert_parity(self, make_strategy):
+        vectorized = make_strategy().signal_series(self.candles, DEFAULT_LOOKBACK)
+        replayed = replay_signals(make_strategy(), self.candles)
+        self.assertGreater(np.count_nonzero(replayed), 0)
+        np.testing.assert_array_equal(vectorized, replayed)
+
+    def test_iq_strategies(self):
+        for name in ("sma_cross", "martingale", "rsi"):
+            with self.subTest(strategy=name):
+                self.assert_parity(lambda: get_strategy(name))
+
+    def test_iq_strategies_skip_windows_with_missing_quotes(self):
+        closes = self.candles.close.copy()
+        closes[[150, 420]] = 0
+        self.candles = make_candles(closes)
+        for name in ("sma_cross", "rsi"):
+            with self.subTest(strategy=name):
+                self.assert_parity(lambda: get_strategy(name))
+                signals = get_strategy(name).signal_series(self.candles, DEFAULT_LOOKBACK)
+                self.assertEqual(np.count_nonzero(signals[150:172]), 0)
+
+    def test_binance_strategies(self):
+        for name in ("rsi", "macd", "bollinger"):
+            with self.subTest(strategy=name):
+                self.assert_parity(lambda: get_binance_strategy(name, {}))
+
+
+class BinaryBacktestTestCase(unittest.TestCase):
+    def test_payout_and_martingale_amounts(self):
+        candles = make_candles([10, 11, 12, 11, 12, 11])
+        # call 10->11 wins, put 11->12 loses, call 12->11 loses, call 11->12 wins, put 12->11 wins
+        strategy = FixedSignalStrategy(["call", "put", "call", "call", "put", None])
+        result = backtest_binary(strategy, candles, payout=0.8, initial_amount=1.0)
+
+        self.assertEqual([t.result for t in result.trades], ["won", "lost", "lost", "won", "won"])
+        self.assertEqual([t.amount for t in result.trades], [1.0, 1.0, 2.0, 4.0, 1.0])
+        self.assertAlmostEqual(result.total_pnl, 0.8 - 1 - 2 + 3.2 + 0.8)
+        self.assertAlmostEqual(result.max_drawdown, 3.0)
+        self.assertAlmostEqual(result.win_rate, 0.6)
+
+    def test_open_position_limit_and_expiry(self):
+        candles = make_candles([10, 11, 12, 13, 14])
+        strategy = FixedSignalStrategy(["call"] * 5)
+        result = backtest_binary(strategy, candles, duration_bars=2)
+        # Bars 0 and 2 open (1 is skipped while 0 is open); 3 and 4 cannot expire in the data
+        self.assertEqual([(t.entry_index, t.exit_index) for t in result.trades], [(0, 2), (2, 4)])
+
+        result = backtest_binary(FixedSignalStrategy(["call"] * 5), candles, duration_bars=2,
+                                 max_open_positions=2)
+        self.assertEqual([t.entry_index for t in result.trades], [0, 1, 2])
+
+    def test_tie_returns_stake(self):
+        result = backtest_binary(FixedSignalStrategy(["put"]), make_candles([5, 5]))
+        self.assertEqual(result.trades[0].result, "equal")
+        self.assertEqual(result.final_balance, 1000.0)
+
+    def test_vectorized_and_replay_give_same_result(self):
+        rng = np.random.default_rng(3)
+        candles = make_candles(100 + np.cumsum(rng.normal(size=500)))
+        fast = backtest_binary(MartingaleStrategy(), candles, max_amount=50)
+        slow = backtest_binary(MartingaleStrategy(), candles, max_amount=50, vectorized=False)
+        self.assertGreater(len(fast.trades), 0)
+        self.assertEqual(fast.summary(), slow.summary())
+
+
+class SpotBacktestTestCase(unittest.TestCase):
+    def test_buy_then_sell_with_fees(self):
+        strategy = get_binance_strategy("rsi", {"position_size_percent": 10})
+        strategy.signal_series = lambda candles, lookback=None: np.array([1, 1, 0, -1, -1], dtype=np.int8)
+        candles = make_candles([100, 90, 95, 110, 120])
+
+        result = backtest_spot(strategy, candles, initial_balance=1000, initial_amount=10, fee_rate=0.001)
+
+        self.assertEqual(len(result.trades), 1)
+        trade = result.trades[0]
+        self.assertEqual((trade.entry_index, trade.exit_index, trade.amount), (0, 3, 100.0))
+        expected = 100 * 0.999 / 100 * 110 * 0.999 - 100
+        self.assertAlmostEqual(trade.profit_loss, expected)
+        self.assertEqual(trade.result, "won")
+        self.assertAlmostEqual(result.final_balance, 1000 + expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
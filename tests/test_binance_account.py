@@ -0,0 +1,92 @@
+import unittest
+from unittest.mock import MagicMock
+
+from src.servicios.binance_account import BinanceAccountStream
+
+
+class FakeUserManager:
+    def __init__(self):
+        self.callbacks = []
+
+    def start_user_socket(self, callback):
+        self.callbacks.append(callback)
+        return f"user-{len(self.callbacks)}"
+
+    def stop(self):
+        pass
+
+
+def make_client():
+    client = MagicMock(api_key="key", api_secret="secret", testnet=True)
+    client.get_account_state.return_value = ({"balances": [
+        {"asset": "USDT", "free": "100.0", "locked": "0.0"},
+        {"asset": "BTC", "free": "0.5", "locked": "0.1"},
+    ]}, [{"orderId": 7, "symbol": "BTCUSDT"}])
+    return client
+
+
+def execution_report(order_id, status, execution="TRADE", quantity="0.01", price="100"):
+    return {"e": "executionReport", "i": order_id, "s": "BTCUSDT", "S": "BUY", "X": status, "x": execution,
+            "l": quantity, "L": price, "n": "0.00001", "N": "BTC", "T": 1000}
+
+
+class BinanceAccountStreamTestCase(unittest.TestCase):
+    def setUp(self):
+        self.manager = FakeUserManager()
+        self.client = make_client()
+        self.account = BinanceAccountStream(self.client, manager_factory=lambda *args: self.manager)
+        self.addCleanup(self.account.close)
+
+    def send(self, event):
+        self.manager.callbacks[-1](event)
+
+    def test_seeded_snapshot_and_balance_events(self):
+        self.assertIsNone(self.account.get_free("USDT"))
+        self.assertTrue(self.account.acquire(1))
+
+        self.assertEqual(self.account.get_free("USDT"), 100.0)
+        self.assertEqual(self.account.get_balance("BTC"), (0.5, 0.1))
+        self.assertEqual(self.account.get_free("ETH"), 0.0)
+
+        self.send({"e": "outboundAccountPosition", "B": [{"a": "USDT", "f": "90.0", "l": "0.0"}]})
+        self.send({"e": "balanceUpdate", "a": "BTC", "d": "0.25"})
+        self.assertEqual(self.account.get_free("USDT"), 90.0)
+        self.assertEqual(self.account.get_free("BTC"), 0.75)
+        # No signed REST calls after the seed
+        self.assertEqual(self.client.get_account_state.call_count, 1)
+        self.client.get_account_balance.assert_not_called()
+
+    def test_orders_and_fills(self):
+        fills = []
+        self.account.acquire(1, on_fill=fills.append)
+        self.assertEqual(len(self.account.open_orders("BTCUSDT")), 1)
+
+        self.send(execution_report(8, "NEW", execution="NEW"))
+        self.assertEqual(len(self.account.open_orders()), 2)
+        self.send(execution_report(8, "PARTIALLY_FILLED"))
+        self.send(execution_report(8, "FILLED", quantity="0.02", price="101"))
+
+        self.assertEqual(len(self.account.open_orders()), 1)
+        self.assertEqual([(f["quantity"], f["price"]) for f in fills], [(0.01, 100.0), (0.02, 101.0)])
+        self.assertEqual(len(self.account.fills("BTCUSDT", order_id=8)), 2)
+
+    def test_error_marks_snapshot_not_live_until_reseeded(self):
+        self.account.acquire(1)
+        self.send({"e": "error", "m": "boom"})
+        self.assertIsNone(self.account.get_free("USDT"))
+
+        self.assertTrue(self.account.start())
+        self.assertEqual(self.client.get_account_state.call_count, 2)
+        self.assertEqual(self.account.get_free("USDT"), 100.0)
+
+    def test_release_closes_after_last_user(self):
+        self.account.acquire(1)
+        self.account.acquire(2)
+        self.assertFalse(self.account.release(1))
+        self.assertTrue(self.account.live)
+        self.assertTrue(self.account.release(2))
+        self.assertFalse(self.account.live)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from src.servicios.binance_bot_service import BinanceBotService
+from src.servicios.bot_scheduler import BotScheduler
+from src.servicios.candles import OHLCV
+
+
+def make_fill(quantity, price, status="PARTIALLY_FILLED", symbol="BTCUSDT"):
+    return {"order_id": 42, "symbol": symbol, "side": "BUY", "quantity": quantity, "price": price,
+            "commission": 0.001, "commission_asset": "BNB", "status": status, "time": 1700000000000}
+
+
+class FillListenerTestCase(unittest.TestCase):
+    def setUp(self):
+        with patch.object(BinanceBotService, "_load_config"):
+            self.service = BinanceBotService(bot_id=1)
+        self.service.bot_config = MagicMock(symbol="BTCUSDT")
+        self.service.account = MagicMock()
+        self.trade = SimpleNamespace(id=5, order_side="buy", status="executed", quantity=None,
+                                     quote_quantity=10.0, entry_price=None, exit_price=None,
+                                     commission=None, commission_asset=None, executed_at=None)
+        self.session = MagicMock()
+        self.session.query.return_value.filter_by.return_value.first.return_value = self.trade
+        patcher = patch("src.servicios.binance_bot_service.get_session", return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_fills_update_the_trade_row(self):
+        fills = [make_fill(1.0, 100.0), make_fill(3.0, 104.0, status="FILLED")]
+        self.service.account.fills.return_value = fills
+        self.service._on_fill(fills[-1])
+
+        self.session.query.return_value.filter_by.assert_called_with(bot_id=1, order_id="42")
+        self.service.account.fills.assert_called_with(order_id=42)
+        self.assertEqual(self.trade.quantity, 4.0)
+        self.assertEqual(self.trade.quote_quantity, 412.0)
+        self.assertEqual(self.trade.entry_price, 103.0)
+        self.assertAlmostEqual(self.trade.commission, 0.002)
+        self.assertEqual(self.trade.commission_asset, "BNB")
+        self.assertEqual(self.trade.status, "filled")
+        self.session.commit.assert_called_once()
+
+    def test_fills_of_other_symbols_are_ignored(self):
+        self.service._on_fill(make_fill(1.0, 100.0, symbol="ETHUSDT"))
+        self.session.query.assert_not_called()
+
+    def test_unknown_order_is_ignored(self):
+        self.session.query.return_value.filter_by.return_value.first.return_value = None
+        self.service._on_fill(make_fill(1.0, 100.0))
+        self.session.commit.assert_not_called()
+
+
+class StartTestCase(unittest.TestCase):
+    def setUp(self):
+        with patch.object(BinanceBotService, "_load_config"):
+            self.service = BinanceBotService(bot_id=1)
+        self.service.bot_config = MagicMock(symbol="BTCUSDT")
+        self.service.strategy = MagicMock()
+        self.service.client = MagicMock(api_key="key", testnet=True)
+        self.service.feed_key = ("binance-testnet", "BTCUSDT", "1m")
+        self.mocks = {}
+        for name in ("get_market_data_hub", "get_binance_stream", "acquire_account_stream",
+                     "release_account_stream", "get_bot_scheduler", "get_binance_client_pool"):
+            patcher = patch(f"src.servicios.binance_bot_service.{name}")
+            self.mocks[name] = patcher.start()
+            self.addCleanup(patcher.stop)
+        for name in ("_warm_start", "_update_bot_status"):
+            patcher = patch.object(BinanceBotService, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_everything_is_released_when_the_job_cannot_be_scheduled(self):
+        self.mocks["get_bot_scheduler"].return_value.add.return_value = False
+        self.assertFalse(self.service.start())
+
+        self.mocks["get_market_data_hub"].return_value.unsubscribe.assert_called_once_with(
+            self.service.feed_key, 1)
+        self.mocks["get_binance_stream"].return_value.unsubscribe.assert_called_once_with(
+            "BTCUSDT", self.service.interval, 1)
+        self.mocks["release_account_stream"].assert_called_once_with("key", 1)
+        self.mocks["get_binance_client_pool"].return_value.hold.assert_not_called()
+        self.assertFalse(self.service.is_running)
+
+
+
+class StreamWakeTestCase(unittest.TestCase):
+    START = 1_700_000_000 // 60 * 60  # A bar open time (epoch seconds)
+
+    def setUp(self):
+        with patch.object(BinanceBotService, "_load_config"):
+            self.service = BinanceBotService(bot_id=1)
+        self.service.bot_config = MagicMock(symbol="BTCUSDT")
+        self.service.strategy = MagicMock(**{"analyze.return_value": None})
+        self.service.interval = "1m"
+        self.now = float(self.START)
+
+        hub = MagicMock()
+        hub.get_candles.side_effect = lambda key, count: self.window()
+        patches = [
+            patch("src.servicios.binance_bot_service.get_session"),
+            patch("src.servicios.binance_bot_service.get_market_data_hub", return_value=hub),
+            patch("src.servicios.binance_bot_service.get_bot_scheduler", return_value=BotScheduler()),
+            patch("src.servicios.bot_scheduler.time.time", side_effect=lambda: self.now),
+            patch("src.servicios.candles.time.time", side_effect=lambda: self.now),
+            patch.object(self.service, "_check_limits", return_value=True),
+            patch.object(self.service, "_get_current_position", return_value=None),
+            patch.object(self.service, "_current_price", return_value=100.0),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def window(self):
+        opened = int((self.now - self.START) // 60) + 1
+        closes = np.full(opened, 100.0)
+        return OHLCV((self.START + np.arange(opened) * 60) * 1000, closes, closes, closes, closes, closes)
+
+    def test_timer_tick_after_a_stream_wake_does_not_analyze_again(self):
+        for bar in (5, 6):
+            # Stream wake on the first kline of the new bar, then the bar-close timer
+            self.now = self.START + bar * 60 + 0.1
+            self.now += self.service._tick()
+            self.assertAlmostEqual(self.now, self.START + bar * 60 + 2)
+            self.service._tick()
+
+        analyzed = [call.args[0].timestamp[-1] for call in self.service.strategy.analyze.call_args_list]
+        self.assertEqual(analyzed, [(self.START + 4 * 60) * 1000, (self.START + 5 * 60) * 1000])
+
+
+if __name__ == "__main__":
+    unittest.main()
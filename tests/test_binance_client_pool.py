@@ -0,0 +1,92 @@
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from src.servicios.binance_client_pool import BinanceClientPool
+
+
+def make_client(api_key, api_secret, testnet):
+    client = MagicMock(api_key=api_key, api_secret=api_secret, testnet=testnet)
+    client.test_connection.return_value = True
+    return client
+
+
+class BinanceClientPoolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.factory = MagicMock(side_effect=make_client)
+        self.pool = BinanceClientPool(idle_ttl=60, health_check_seconds=60, client_factory=self.factory)
+
+    def test_reuses_client_per_key_and_venue(self):
+        client = self.pool.get("key", "secret", True)
+        self.assertIs(self.pool.get("key", "secret", True), client)
+        self.assertIsNot(self.pool.get("key", "secret", False), client)
+        self.assertEqual(self.factory.call_count, 2)
+
+    def test_new_secret_replaces_client(self):
+        old = self.pool.get("key", "secret", True)
+        new = self.pool.get("key", "other", True)
+        self.assertIsNot(new, old)
+        old.client.close_connection.assert_called_once()
+        self.assertEqual(len(self.pool), 1)
+
+    def test_held_client_survives_a_new_secret(self):
+        old = self.pool.get("key", "secret", True)
+        self.pool.hold(old, "bot-1")
+        new = self.pool.get("key", "other", True)
+        new.test_connection.assert_called_once()
+        self.assertIs(self.pool.get("key", "other", True), new)
+        old.client.close_connection.assert_not_called()
+
+        self.pool.release(old, "bot-1")
+        old.client.close_connection.assert_called_once()
+        new.client.close_connection.assert_not_called()
+
+    def test_rejected_secret_keeps_the_pooled_client(self):
+        old = self.pool.get("key", "secret", True)
+        self.pool.hold(old, "bot-1")
+        self.factory.side_effect = lambda *args: MagicMock(**{"test_connection.return_value": False})
+        rejected = self.pool.get("key", "wrong", True)
+
+        self.assertIsNot(rejected, old)
+        self.assertFalse(self.pool.check_health(rejected))
+        self.factory.side_effect = make_client
+        self.assertIs(self.pool.get("key", "secret", True), old)
+        old.client.close_connection.assert_not_called()
+
+    def test_health_check_is_cached_until_marked_unhealthy(self):
+        client = self.pool.get("key", "secret", True)
+        self.assertTrue(self.pool.check_health(client))
+        self.assertTrue(self.pool.check_health(client))
+        self.assertEqual(client.test_connection.call_count, 1)
+
+        self.pool.mark_unhealthy(client)
+        self.assertTrue(self.pool.check_health(client))
+        self.assertTrue(self.pool.check_health(client, force=True))
+        self.assertEqual(client.test_connection.call_count, 3)
+
+    def test_failed_check_is_retried(self):
+        client = self.pool.get("key", "secret", True)
+        client.test_connection.return_value = False
+        self.assertFalse(self.pool.check_health(client))
+        client.test_connection.return_value = True
+        self.assertTrue(self.pool.check_health(client))
+
+    def test_idle_clients_are_evicted_unless_held(self):
+        held = self.pool.get("held", "secret", True)
+        idle = self.pool.get("idle", "secret", True)
+        self.pool.hold(held, "bot-1")
+        self.pool.idle_ttl = 0
+        time.sleep(0.01)
+
+        self.assertEqual(self.pool.evict_idle(), 1)
+        idle.client.close_connection.assert_called_once()
+        held.client.close_connection.assert_not_called()
+
+        self.pool.release(held, "bot-1")
+        time.sleep(0.01)
+        self.assertEqual(self.pool.evict_idle(), 1)
+        self.assertEqual(len(self.pool), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
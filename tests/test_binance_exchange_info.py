@@ -0,0 +1,93 @@
+import unittest
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+from src.servicios.binance_exchange_info import ExchangeInfoCache, SymbolRules
+
+
+def symbol_info(symbol, step="0.00001000", tick="0.01000000"):
+    return {
+        "symbol": symbol, "status": "TRADING", "baseAsset": symbol[:-4], "quoteAsset": "USDT",
+        "filters": [
+            {"filterType": "PRICE_FILTER", "minPrice": "0.01000000", "maxPrice": "1000000.00000000", "tickSize": tick},
+            {"filterType": "LOT_SIZE", "minQty": step, "maxQty": "9000.00000000", "stepSize": step},
+            {"filterType": "NOTIONAL", "minNotional": "5.00000000", "applyMinToMarket": True},
+        ],
+    }
+
+
+class SymbolRulesTestCase(unittest.TestCase):
+    def test_compiles_filters(self):
+        rules = SymbolRules.from_symbol_info(symbol_info("BTCUSDT"))
+        self.assertEqual(rules.step_size, Decimal("0.00001"))
+        self.assertEqual(rules.quantity_precision, 5)
+        self.assertEqual(rules.price_precision, 2)
+        self.assertEqual(rules.min_notional, Decimal("5"))
+        self.assertEqual(rules.base_asset, "BTC")
+
+    def test_rounds_down_to_step_and_tick(self):
+        rules = SymbolRules.from_symbol_info(symbol_info("BTCUSDT"))
+        self.assertEqual(rules.format_quantity(0.123456789), "0.12345")
+        self.assertEqual(rules.format_price(43210.129), "43210.12")
+        whole = SymbolRules.from_symbol_info(symbol_info("SHIBUSDT", step="1.00000000", tick="0.00000001"))
+        self.assertEqual(whole.format_quantity(1234.9), "1234")
+        self.assertEqual(whole.format_price(0.0000123456), "0.00001234")
+
+    def test_min_notional(self):
+        rules = SymbolRules.from_symbol_info(symbol_info("BTCUSDT"))
+        self.assertTrue(rules.meets_min_notional(5.0))
+        self.assertFalse(rules.meets_min_notional(4.99))
+        self.assertFalse(rules.meets_min_notional(4.99, market=True))
+        rules.min_notional_market = False
+        self.assertTrue(rules.meets_min_notional(4.99, market=True))
+
+    def test_without_filters_keeps_values(self):
+        rules = SymbolRules.from_symbol_info({"symbol": "XUSDT", "filters": []})
+        self.assertEqual(rules.format_quantity(0.5), "0.5")
+        self.assertEqual(rules.format_price(1.25), "1.25")
+
+
+class ExchangeInfoCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.fetch = MagicMock(return_value={"symbols": [symbol_info("BTCUSDT"), symbol_info("ETHUSDT")]})
+        self.cache = ExchangeInfoCache(ttl=60)
+
+    def test_one_request_for_all_symbols(self):
+        self.assertEqual(self.cache.get("btcusdt", self.fetch).symbol, "BTCUSDT")
+        self.assertEqual(self.cache.get("ETHUSDT", self.fetch).symbol, "ETHUSDT")
+        self.assertEqual(self.fetch.call_count, 1)
+
+    def test_unknown_symbol_refreshes_once(self):
+        self.cache.get("BTCUSDT", self.fetch)
+        self.assertIsNone(self.cache.get("NOPEUSDT", self.fetch))
+        self.assertIsNone(self.cache.get("NOPEUSDT", self.fetch))
+        self.assertEqual(self.fetch.call_count, 2)
+
+    def test_expired_rules_are_reloaded_and_kept_on_failure(self):
+        self.cache.get("BTCUSDT", self.fetch)
+        self.cache.ttl = -1
+        self.cache.get("BTCUSDT", self.fetch)
+        self.assertEqual(self.fetch.call_count, 2)
+
+        self.fetch.side_effect = ConnectionError("down")
+        self.assertEqual(self.cache.get("BTCUSDT", self.fetch).symbol, "BTCUSDT")
+        with self.assertRaises(ConnectionError):
+            self.cache.get("NOPEUSDT", self.fetch)
+
+    def test_failed_refresh_is_not_retried_on_every_call(self):
+        self.cache.get("BTCUSDT", self.fetch)
+        self.cache._loaded_at -= 61
+        self.fetch.side_effect = ConnectionError("down")
+        for _ in range(3):
+            self.assertEqual(self.cache.get("BTCUSDT", self.fetch).symbol, "BTCUSDT")
+        self.assertEqual(self.fetch.call_count, 2)
+
+        # Retried once the backoff is over
+        self.cache._loaded_at -= 61
+        self.fetch.side_effect = None
+        self.cache.get("BTCUSDT", self.fetch)
+        self.assertEqual(self.fetch.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
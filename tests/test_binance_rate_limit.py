@@ -0,0 +1,85 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from src.servicios.binance_rate_limit import (
+    PRIORITY_MARKET_DATA, PRIORITY_ORDER, WeightGovernor
+)
+
+
+def response(status=200, **headers):
+    resp = MagicMock(status_code=status, headers=headers)
+    resp.request.headers = {"X-MBX-APIKEY": "key"}
+    return resp
+
+
+class WeightGovernorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.now = 120.0
+        self.governor = WeightGovernor(weight_per_minute=100, orders_per_10s=2, safety_margin=1.0,
+                                       order_reserve=0.2, max_wait_seconds=0, clock=lambda: self.now)
+
+    def test_charges_weight_and_keeps_reserve_for_orders(self):
+        self.assertTrue(self.governor.acquire(80))
+        self.assertEqual(self.governor.used_weight, 80)
+        self.assertFalse(self.governor.acquire(1, PRIORITY_MARKET_DATA))
+        self.assertTrue(self.governor.acquire(20, PRIORITY_ORDER))
+        self.assertFalse(self.governor.acquire(1, PRIORITY_ORDER))
+
+    def test_budget_refills_each_minute(self):
+        self.assertTrue(self.governor.acquire(80))
+        self.now += 60
+        self.assertEqual(self.governor.used_weight, 0)
+        self.assertTrue(self.governor.acquire(80))
+
+    def test_server_headers_raise_the_count(self):
+        self.governor.acquire(10)
+        self.governor.observe(response(**{"X-MBX-USED-WEIGHT-1M": "75"}))
+        self.assertEqual(self.governor.used_weight, 75)
+        # A lower server count (charged calls still in flight) does not lower it
+        self.governor.observe(response(**{"X-MBX-USED-WEIGHT-1M": "5"}))
+        self.assertEqual(self.governor.used_weight, 75)
+
+    def test_order_count_per_account(self):
+        self.assertTrue(self.governor.acquire(1, PRIORITY_ORDER, orders=2, account="key"))
+        self.assertFalse(self.governor.acquire(1, PRIORITY_ORDER, orders=1, account="key"))
+        self.assertTrue(self.governor.acquire(1, PRIORITY_ORDER, orders=1, account="other"))
+        self.now += 10
+        self.assertTrue(self.governor.acquire(1, PRIORITY_ORDER, orders=1, account="key"))
+
+        self.governor.observe(response(**{"X-MBX-ORDER-COUNT-10S": "2"}))
+        self.assertFalse(self.governor.acquire(1, PRIORITY_ORDER, orders=1, account="key"))
+
+    def test_ban_blocks_until_retry_after(self):
+        self.governor.observe(response(429, **{"Retry-After": "30"}))
+        self.assertFalse(self.governor.acquire(1, PRIORITY_ORDER))
+        self.now += 30
+        self.assertTrue(self.governor.acquire(1, PRIORITY_ORDER))
+
+    def test_waits_for_the_next_window(self):
+        governor = WeightGovernor(weight_per_minute=10, safety_margin=1.0, order_reserve=0, max_wait_seconds=5)
+        governor.observe(response(429, **{"Retry-After": "0.05"}))
+        started = time.monotonic()
+        self.assertTrue(governor.acquire(1))
+        self.assertGreaterEqual(time.monotonic() - started, 0.04)
+
+    def test_orders_go_before_waiting_market_data(self):
+        governor = WeightGovernor(weight_per_minute=10, safety_margin=1.0, order_reserve=0, max_wait_seconds=5)
+        governor.observe(response(429, **{"Retry-After": "0.1"}))
+        charged_before_market = []
+
+        def market_call():
+            governor.acquire(1, PRIORITY_MARKET_DATA)
+            charged_before_market.append(governor.used_weight - 1)
+
+        market = threading.Thread(target=market_call)
+        market.start()
+        time.sleep(0.02)
+        self.assertTrue(governor.acquire(1, PRIORITY_ORDER))
+        market.join(timeout=5)
+        # The order queued after the market data call but was charged first
+        self.assertEqual(charged_before_market, [1])
+
+if __name__ == "__main__":
+    unittest.main()
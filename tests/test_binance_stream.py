@@ -0,0 +1,150 @@
+import time
+import unittest
+from unittest.mock import patch
+
+from src.servicios.binance_stream import BinanceMarketStream
+from src.servicios.candles import OHLCV
+from src.servicios.market_data import MarketDataHub
+
+MINUTE = 60000
+
+
+class FakeManager:
+    def __init__(self):
+        self.sockets = {}
+        self.stopped = []
+
+    def start_multiplex_socket(self, callback, streams):
+        name = f"socket-{len(self.sockets)}"
+        self.sockets[name] = (callback, streams)
+        return name
+
+    def stop_socket(self, name):
+        self.stopped.append(name)
+
+    def stop(self):
+        pass
+
+
+def kline_message(open_bar, close, closed=False):
+    return {
+        "stream": "btcusdt@kline_1m",
+        "data": {"e": "kline", "s": "BTCUSDT", "k": {
+            "t": open_bar * MINUTE, "s": "BTCUSDT", "i": "1m",
+            "o": "1", "h": str(close), "l": "1", "c": str(close), "v": "2", "x": closed,
+        }},
+    }
+
+
+class BinanceMarketStreamTestCase(unittest.TestCase):
+    def setUp(self):
+        self.manager = FakeManager()
+        self.stream = BinanceMarketStream(testnet=False, manager_factory=lambda testnet: self.manager)
+        self.hub = MarketDataHub()
+        patcher = patch("src.servicios.binance_stream.get_market_data_hub", return_value=self.hub)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.stream.close)
+        self.now_bar = int(time.time() * 1000) // MINUTE
+
+    def send(self, message):
+        callback, _ = self.manager.sockets[self.stream._socket]
+        callback(message)
+
+    def test_one_socket_for_all_streams(self):
+        self.stream.subscribe("BTCUSDT", "1m", 1)
+        self.stream.subscribe("ethusdt", "5m", 2)
+        self.stream._resubscribe()
+
+        self.assertEqual(len(self.manager.sockets), 1)
+        _, streams = self.manager.sockets[self.stream._socket]
+        self.assertEqual(streams, ["btcusdt@bookTicker", "btcusdt@kline_1m",
+                                   "ethusdt@bookTicker", "ethusdt@kline_5m"])
+
+        self.stream.unsubscribe("ETHUSDT", "5m", 2)
+        self.stream._resubscribe()
+        self.assertEqual(self.manager.stopped, ["socket-0"])
+        self.assertEqual(self.manager.sockets[self.stream._socket][1], ["btcusdt@bookTicker", "btcusdt@kline_1m"])
+
+    def history(self, since):
+        bars = range(self.now_bar - 3, self.now_bar - 1)
+        return OHLCV([b * MINUTE for b in bars], *([[5.0] * len(bars)] * 5))
+
+    def test_klines_feed_the_hub_and_wake_subscribers(self):
+        key = ("binance", "BTCUSDT", "1m")
+        woken = []
+        self.hub.subscribe(key, 1, self.history)
+        self.hub.get_candles(key)
+        self.stream.subscribe("BTCUSDT", "1m", 1, on_bar=lambda: woken.append(
+            self.hub.get_candles(key).closed(60, now=self.now_bar * 60 + 2).close.tolist()))
+        self.stream._resubscribe()
+
+        self.send(kline_message(self.now_bar - 1, 10.0))
+        self.send(kline_message(self.now_bar - 1, 11.0, closed=True))
+        self.send(kline_message(self.now_bar, 12.0))
+
+        self.assertEqual(self.hub.get_candles(key).close.tolist(), [5.0, 5.0, 11.0, 12.0])
+        # Woken at the close of bar now_bar-1, which is the one they evaluate
+        self.assertEqual(woken, [[5.0, 5.0, 11.0]])
+
+    def test_first_kline_on_an_empty_feed_fetches_the_history(self):
+        key = ("binance", "BTCUSDT", "1m")
+        fetched = []
+        self.hub.subscribe(key, 1, lambda since: fetched.append(since) or self.history(since))
+        self.stream.subscribe("BTCUSDT", "1m", 1)
+        self.stream._resubscribe()
+        self.send(kline_message(self.now_bar - 1, 11.0))
+
+        deadline = time.time() + 2
+        while (key in self.stream._gap_filling or not fetched) and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(fetched, [None])
+        self.assertEqual(self.hub.get_feed(key).snapshot().close.tolist(), [5.0, 5.0, 11.0])
+
+    def test_book_ticker_prices(self):
+        self.stream.subscribe("BTCUSDT", "1m", 1)
+        self.stream._resubscribe()
+        self.assertIsNone(self.stream.get_price("BTCUSDT"))
+        self.send({"stream": "btcusdt@bookTicker", "data": {"s": "BTCUSDT", "b": "99", "a": "101"}})
+        self.assertEqual(self.stream.get_book("BTCUSDT"), (99.0, 101.0))
+        self.assertEqual(self.stream.get_price("BTCUSDT"), 100.0)
+
+    def test_gap_is_recovered_over_rest(self):
+        fetched = []
+
+        def fetcher(since):
+            fetched.append(since)
+            first = self.now_bar - 6 if since is None else since // MINUTE
+            bars = range(first, self.now_bar - 4 if since is None else self.now_bar)
+            return OHLCV([b * MINUTE for b in bars], *([[5.0] * len(bars)] * 5))
+
+        key = ("binance", "BTCUSDT", "1m")
+        self.hub.subscribe(key, 1, fetcher)
+        self.hub.get_candles(key)
+        fetched.clear()
+        self.stream.subscribe("BTCUSDT", "1m", 1)
+        self.stream._resubscribe()
+        self.send(kline_message(self.now_bar - 5, 1.0, closed=True))
+        # Bars now_bar-4 .. now_bar-1 were missed while disconnected
+        self.send(kline_message(self.now_bar, 2.0))
+
+        deadline = time.time() + 2
+        while key in self.stream._gap_filling and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(fetched, [(self.now_bar - 5) * MINUTE])
+        timestamps = self.hub.get_feed(key).snapshot().timestamp.tolist()
+        self.assertEqual(timestamps, [b * MINUTE for b in range(self.now_bar - 6, self.now_bar + 1)])
+
+    def test_error_reopens_the_socket(self):
+        self.stream.subscribe("BTCUSDT", "1m", 1)
+        self.stream._resubscribe()
+        self.send({"e": "error", "m": "Max reconnect retries reached"})
+        self.assertFalse(self.stream.connected)
+
+        self.stream._resubscribe()
+        self.assertTrue(self.stream.connected)
+        self.assertEqual(len(self.manager.sockets), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
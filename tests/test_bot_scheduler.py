@@ -0,0 +1,83 @@
+import threading
+import unittest
+
+from src.servicios.bot_scheduler import BotScheduler, seconds_until_bar_close
+
+
+class BotSchedulerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = BotScheduler(max_workers=2)
+
+    def test_job_runs_until_tick_returns_none(self):
+        ticks = []
+        finished = threading.Event()
+
+        def tick():
+            ticks.append(threading.current_thread().name)
+            return None if len(ticks) == 3 else 0.01
+
+        self.assertTrue(self.scheduler.add("bot", tick, threading.Event(), on_exit=finished.set))
+        self.assertTrue(finished.wait(2))
+        self.assertEqual(len(ticks), 3)
+        self.assertTrue(all(name.startswith("bot-tick") for name in ticks))
+        self.assertTrue(self.scheduler.cancel("bot", timeout=2))
+        self.assertEqual(self.scheduler.job_count, 0)
+
+    def test_cancel_wakes_sleeping_job(self):
+        stop_event = threading.Event()
+        started = threading.Event()
+        exits = []
+
+        def tick():
+            started.set()
+            return 3600
+
+        self.scheduler.add("bot", tick, stop_event, on_exit=lambda: exits.append(True))
+        self.assertTrue(started.wait(2))
+        self.assertTrue(self.scheduler.cancel("bot", timeout=2))
+        self.assertTrue(stop_event.is_set())
+        self.assertEqual(exits, [True])
+
+    def test_duplicate_key_is_rejected(self):
+        stop_event = threading.Event()
+        self.assertTrue(self.scheduler.add("bot", lambda: 3600, stop_event))
+        self.assertFalse(self.scheduler.add("bot", lambda: 3600, threading.Event()))
+        self.scheduler.cancel("bot", timeout=2)
+
+    def test_failing_tick_is_retried_later(self):
+        stop_event = threading.Event()
+        calls = []
+
+        def tick():
+            calls.append(1)
+            raise RuntimeError("boom")
+
+        self.scheduler.add("bot", tick, stop_event)
+        self.assertTrue(self.scheduler.cancel("bot", timeout=2))
+        self.assertLessEqual(len(calls), 1)
+
+    def test_many_idle_bots_share_one_loop(self):
+        before = threading.active_count()
+        stop_events = [threading.Event() for _ in range(500)]
+        for i, stop_event in enumerate(stop_events):
+            self.scheduler.add(i, lambda: 3600, stop_event, first_delay=3600)
+        self.assertEqual(self.scheduler.job_count, 500)
+        # One loop thread, no per-bot threads
+        self.assertLessEqual(threading.active_count() - before, 1)
+        for i in range(500):
+            self.assertTrue(self.scheduler.cancel(i, timeout=2))
+
+
+class BarCloseTestCase(unittest.TestCase):
+    def test_waits_until_offset_after_next_close(self):
+        self.assertAlmostEqual(seconds_until_bar_close(60, 2, now=600.0), 2.0)
+        self.assertAlmostEqual(seconds_until_bar_close(60, 2, now=630.0), 32.0)
+        self.assertAlmostEqual(seconds_until_bar_close(3600, 0, now=7200.5), 3599.5)
+
+    def test_never_returns_zero_delay(self):
+        self.assertAlmostEqual(seconds_until_bar_close(60, 2, now=602.0), 60.0)
+        self.assertAlmostEqual(seconds_until_bar_close(300, 0, now=900.0), 300.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from src.servicios.candle_history import CandleHistory, iqoption_page_fetcher
+from src.servicios.candles import OHLCV
+from src.servicios.market_data import MarketDataHub
+
+KEY = ("binance", "BTCUSDT", "1m")
+MINUTE = 60000
+
+
+def make_candles(start_bar, count):
+    timestamps = (np.arange(count) + start_bar) * MINUTE
+    closes = np.arange(count, dtype=float) + start_bar
+    return OHLCV(timestamps, closes, closes, closes, closes, np.ones(count))
+
+
+class CandleHistoryTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.history = CandleHistory(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_append_skips_known_bars_and_reads_ranges(self):
+        self.assertFalse(self.history.read(KEY))
+        self.assertEqual(self.history.append(KEY, make_candles(0, 5)), 5)
+        self.assertEqual(self.history.append(KEY, make_candles(3, 5)), 3)
+
+        candles = self.history.read(KEY)
+        self.assertEqual(candles.timestamp.tolist(), [i * MINUTE for i in range(8)])
+        # Read-only views of the mapped files, not copies
+        self.assertFalse(candles.close.flags.writeable)
+        self.assertEqual(self.history.read(KEY, start=2 * MINUTE, end=4 * MINUTE).close.tolist(), [2.0, 3.0])
+        self.assertEqual(self.history.last_timestamp(KEY), 7 * MINUTE)
+
+    def test_interrupted_append_is_repaired(self):
+        self.history.append(KEY, make_candles(0, 3))
+        # Simulate a crash after only the timestamp column was extended
+        with open(os.path.join(self.history.directory(KEY), "timestamp.i8"), "ab") as f:
+            f.write(np.array([3 * MINUTE], dtype="<i8").tobytes())
+        self.assertEqual(self.history.count(KEY), 3)
+
+        self.history.append(KEY, make_candles(3, 2))
+        self.assertEqual(self.history.read(KEY).close.tolist(), [0.0, 1.0, 2.0, 3.0, 4.0])
+
+    def test_backfill_pages_until_the_forming_bar(self):
+        now_bar = int(time.time() * 1000) // MINUTE
+        requested = []
+
+        def fetch_page(since):
+            requested.append(since)
+            # Up to 100 bars per page, including the still-forming one
+            return make_candles(since // MINUTE, min(100, now_bar - since // MINUTE + 1))
+
+        start_bar = now_bar - 250
+        appended = self.history.backfill(KEY, fetch_page, start=start_bar * MINUTE)
+
+        self.assertEqual(appended, 250)
+        self.assertEqual(requested[:3], [start_bar * MINUTE, (start_bar + 100) * MINUTE, (start_bar + 200) * MINUTE])
+        self.assertEqual(self.history.last_timestamp(KEY), (now_bar - 1) * MINUTE)
+        # Resumes from the newest stored bar
+        self.assertEqual(self.history.backfill(KEY, fetch_page), 0)
+
+    def test_backfill_requires_start_when_empty(self):
+        with self.assertRaises(ValueError):
+            self.history.backfill(KEY, lambda since: OHLCV.empty())
+
+
+class WarmStartTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.history = CandleHistory(self._tmp.name)
+        self.now_bar = int(time.time() * 1000) // MINUTE
+        self.page_requests = []
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def fetch_page(self, since):
+        self.page_requests.append(since)
+        return make_candles(since // MINUTE, self.now_bar - since // MINUTE + 1)
+
+    def test_catch_up_only_downloads_missing_bars(self):
+        self.history.append(KEY, make_candles(self.now_bar - 300, 295))
+
+        candles = self.history.catch_up(KEY, self.fetch_page, 200)
+
+        self.assertEqual(self.page_requests, [(self.now_bar - 5) * MINUTE])
+        self.assertEqual(len(candles), 200)
+        self.assertEqual(int(candles.timestamp[-1]), (self.now_bar - 1) * MINUTE)
+        # Store is current: a second bot starting does not hit the network
+        self.history.catch_up(KEY, self.fetch_page, 200)
+        self.assertEqual(len(self.page_requests), 1)
+
+    def test_feed_is_seeded_and_persists_closed_bars(self):
+        self.history.append(KEY, make_candles(self.now_bar - 50, 48))
+        hub = MarketDataHub(capacity=40, history=self.history)
+        fetched_since = []
+
+        def fetcher(since):
+            fetched_since.append(since)
+            return make_candles(since // MINUTE, self.now_bar - since // MINUTE + 1)
+
+        hub.subscribe(KEY, "bot", fetcher)
+        self.assertEqual(hub.warm_start(KEY, self.fetch_page), 40)
+        candles = hub.get_candles(KEY)
+
+        # The refresh only asked for bars after the newest stored one
+        self.assertEqual(fetched_since, [(self.now_bar - 1) * MINUTE])
+        self.assertEqual(int(candles.timestamp[-1]), self.now_bar * MINUTE)
+        # The forming bar is not stored
+        self.assertEqual(self.history.last_timestamp(KEY), (self.now_bar - 1) * MINUTE)
+        self.assertEqual(hub.warm_start(KEY, self.fetch_page), 0)
+
+
+class IQOptionPageFetcherTestCase(unittest.TestCase):
+    def test_skips_ranges_without_bars(self):
+        now = int(time.time()) // 60 * 60
+        open_from = now - 600
+
+        class FakeClient:
+            calls = 0
+
+            def get_candles(self, active_id, size, count, end_time):
+                FakeClient.calls += 1
+                start = max(end_time - count * size, open_from)
+                return [{"from": t, "open": 1, "max": 1, "min": 1, "close": 1, "volume": 1}
+                        for t in range(int(start) // 60 * 60, int(end_time), 60) if t >= open_from]
+
+        fetch = iqoption_page_fetcher(FakeClient(), "EURUSD", "1m")
+        # Market closed for the first ~5 pages
+        candles = fetch((now - 5 * 1000 * 60 - 600) * 1000)
+
+        self.assertEqual(int(candles.timestamp[0]), open_from * 1000)
+        self.assertGreater(FakeClient.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+
+from src.servicios.candles import OHLCV, CandleRingBuffer, interval_to_seconds
+
+
+def _series(timestamps, closes):
+    return OHLCV(timestamps, closes, closes, closes, closes, [1.0] * len(closes))
+
+
+class OHLCVTestCase(unittest.TestCase):
+    def test_from_klines_parses_binance_rows(self):
+        klines = [
+            [1000, "1.0", "2.0", "0.5", "1.5", "10.0", 1999, "15.0", 3],
+            [2000, "1.5", "2.5", "1.0", "2.0", "12.0", 2999, "24.0", 4],
+        ]
+        candles = OHLCV.from_klines(klines)
+
+        self.assertEqual(candles.timestamp.tolist(), [1000, 2000])
+        self.assertEqual(candles.high.tolist(), [2.0, 2.5])
+        self.assertEqual(candles.close.tolist(), [1.5, 2.0])
+        self.assertEqual(candles.last_close, 2.0)
+
+    def test_from_iq_candles_parses_sdk_rows(self):
+        rows = [
+            {"from": 60, "open": 1.0, "max": 2.0, "min": 0.5, "close": 1.5, "volume": 3},
+            {"from": 120, "open": 1.5, "max": 2.5, "min": 1.0, "close": 2.0, "volume": 4},
+            {"open": 9.0},
+        ]
+        candles = OHLCV.from_iq_candles(rows)
+
+        self.assertEqual(candles.timestamp.tolist(), [60000, 120000])
+        self.assertEqual(candles.high.tolist(), [2.0, 2.5])
+        self.assertEqual(candles.low.tolist(), [0.5, 1.0])
+        self.assertFalse(OHLCV.from_iq_candles(None))
+
+    def test_empty_series_is_falsy(self):
+        self.assertFalse(OHLCV.from_klines([]))
+        self.assertIsNone(OHLCV.empty().last_close)
+
+    def test_slicing_returns_views(self):
+        candles = _series([1, 2, 3, 4], [1.0, 2.0, 3.0, 4.0])
+        tail = candles.tail(2)
+
+        self.assertEqual(tail.close.tolist(), [3.0, 4.0])
+        self.assertTrue(tail.close.base is candles.close)
+        self.assertEqual(candles[:2].timestamp.tolist(), [1, 2])
+
+    def test_closed_drops_only_a_forming_bar(self):
+        candles = _series([0, 60_000, 120_000], [1.0, 2.0, 3.0])
+        self.assertEqual(candles.closed(60, now=122).close.tolist(), [1.0, 2.0])
+        self.assertEqual(candles.closed(60, now=180).close.tolist(), [1.0, 2.0, 3.0])
+        self.assertFalse(OHLCV.empty().closed(60))
+
+    def test_from_dicts_round_trip(self):
+        candles = _series([1, 2], [1.0, 2.0])
+        self.assertEqual(OHLCV.from_dicts(candles.to_dicts()).close.tolist(), [1.0, 2.0])
+
+
+class CandleRingBufferTestCase(unittest.TestCase):
+    def test_merge_appends_updates_and_skips_old_bars(self):
+        buffer = CandleRingBuffer(capacity=5)
+        self.assertEqual(buffer.merge(_series([1, 2], [10.0, 11.0])), 2)
+        self.assertEqual(buffer.merge(_series([1, 2, 3], [99.0, 12.0, 13.0])), 1)
+
+        snapshot = buffer.snapshot()
+        self.assertEqual(snapshot.timestamp.tolist(), [1, 2, 3])
+        self.assertEqual(snapshot.close.tolist(), [10.0, 12.0, 13.0])
+        self.assertEqual(buffer.last_timestamp, 3)
+
+    def test_wraps_around_keeping_newest_bars_in_order(self):
+        buffer = CandleRingBuffer(capacity=3)
+        buffer.merge(_series([1, 2], [1.0, 2.0]))
+        buffer.merge(_series(list(range(3, 8)), [float(t) for t in range(3, 8)]))
+
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer.snapshot().timestamp.tolist(), [5, 6, 7])
+        self.assertEqual(buffer.snapshot(2).close.tolist(), [6.0, 7.0])
+
+    def test_clear(self):
+        buffer = CandleRingBuffer(capacity=3)
+        buffer.merge(_series([1], [1.0]))
+        buffer.clear()
+        self.assertEqual(len(buffer), 0)
+        self.assertIsNone(buffer.last_timestamp)
+
+    def test_interval_to_seconds(self):
+        self.assertEqual(interval_to_seconds("1m"), 60)
+        self.assertEqual(interval_to_seconds("4h"), 14400)
+        self.assertEqual(interval_to_seconds("1d"), 86400)
+        with self.assertRaises(ValueError):
+            interval_to_seconds("5x")
+
+
+if __name__ == "__main__":
+    unittest.main()
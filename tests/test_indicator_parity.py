@@ -0,0 +1,89 @@
+import unittest
+
+import numpy as np
+
+from src.servicios.binance_strategies import BinanceMACDStrategy, BinanceRSIStrategy
+from src.servicios.candles import OHLCV
+from src.servicios.indicators import MACD, RSI, BollingerBands
+
+try:
+    import pandas as pd
+    import ta
+except ImportError:  # pragma: no cover - parity checks need the reference library
+    ta = None
+
+
+def run(indicator, prices, *attributes):
+    """Feed every price and collect the requested attributes (NaN while warming up)."""
+    columns = {name: [] for name in attributes}
+    for price in prices:
+        indicator.update(price)
+        for name in attributes:
+            value = getattr(indicator, name)
+            columns[name].append(np.nan if value is None else value)
+    return [np.array(columns[name]) for name in attributes]
+
+
+@unittest.skipUnless(ta, "ta is not installed")
+class TaParityTestCase(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(42)
+        self.prices = 30000 + np.cumsum(rng.normal(scale=50, size=500))
+        self.series = pd.Series(self.prices)
+
+    def assertSeriesEqual(self, actual, expected):
+        expected = np.asarray(expected, dtype=float)
+        np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+        np.testing.assert_allclose(actual, expected, rtol=1e-9, equal_nan=True)
+
+    def test_rsi(self):
+        for period in (6, 14, 21):
+            (actual,) = run(RSI(period), self.prices, "value")
+            self.assertSeriesEqual(actual, ta.momentum.RSIIndicator(self.series, window=period).rsi())
+
+    def test_macd(self):
+        reference = ta.trend.MACD(self.series, window_fast=12, window_slow=26, window_sign=9)
+        macd, signal, histogram = run(MACD(12, 26, 9), self.prices, "value", "signal", "histogram")
+        self.assertSeriesEqual(macd, reference.macd())
+        self.assertSeriesEqual(signal, reference.macd_signal())
+        self.assertSeriesEqual(histogram, reference.macd_diff())
+
+    def test_bollinger_bands(self):
+        reference = ta.volatility.BollingerBands(self.series, window=20, window_dev=2.0)
+        upper, middle, lower = run(BollingerBands(20, 2.0), self.prices, "upper", "value", "lower")
+        self.assertSeriesEqual(middle, reference.bollinger_mavg())
+        # The bands are only defined once the middle band is
+        valid = ~np.isnan(middle)
+        np.testing.assert_allclose(upper[valid], reference.bollinger_hband()[valid], rtol=1e-9)
+        np.testing.assert_allclose(lower[valid], reference.bollinger_lband()[valid], rtol=1e-9)
+
+    def test_rsi_strategy_reads_same_value_as_ta(self):
+        window = self.prices[-100:]
+        candles = OHLCV(np.arange(100) * 60000, window, window, window, window, np.ones(100))
+        expected = ta.momentum.RSIIndicator(pd.Series(window), window=14).rsi().iloc[-1]
+
+        strategy = BinanceRSIStrategy({"oversold_level": expected + 1})
+        signal = strategy.analyze(candles, window[-1])
+        self.assertEqual(signal.signal_type, "BUY")
+        self.assertIn(f"{expected:.2f}", signal.reason)
+
+    def test_macd_strategy_crossovers_match_ta(self):
+        candles = OHLCV(np.arange(len(self.prices)) * 60000, self.prices, self.prices,
+                        self.prices, self.prices, np.ones(len(self.prices)))
+        reference = ta.trend.MACD(self.series)
+        diff = (reference.macd() - reference.macd_signal()).to_numpy()
+
+        strategy = BinanceMACDStrategy({})
+        for end in range(40, len(self.prices)):
+            signal = strategy.analyze(candles[:end], self.prices[end - 1])
+            if diff[end - 2] < 0 < diff[end - 1]:
+                expected = "BUY"
+            elif diff[end - 2] > 0 > diff[end - 1]:
+                expected = "SELL"
+            else:
+                expected = None
+            self.assertEqual(signal.signal_type if signal else None, expected, end)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+
+import numpy as np
+
+from src.servicios.candles import OHLCV
+from src.servicios.indicators import MACD, RSI, SMA, BarSync, BollingerBands, EMA
+
+
+def legacy_rsi(closes, period):
+    """RSI as RSIStrategy computed it before the streaming indicators: plain averages of the last changes."""
+    if len(closes) < period + 1:
+        return None
+    changes = np.diff(closes)[-period:]
+    avg_gain = changes[changes > 0].sum() / period
+    avg_loss = -changes[changes < 0].sum() / period
+    if avg_loss == 0:
+        return 100
+    return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+def make_candles(closes, start=0):
+    closes = np.asarray(closes, dtype=float)
+    timestamps = (np.arange(len(closes)) + start) * 60000
+    return OHLCV(timestamps, closes, closes, closes, closes, np.ones(len(closes)))
+
+
+class IndicatorTestCase(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.prices = (100 + np.cumsum(rng.normal(size=200))).tolist()
+
+    def test_sma_matches_window_mean(self):
+        sma = SMA(5)
+        for i, price in enumerate(self.prices):
+            value = sma.update(price)
+            if i < 4:
+                self.assertIsNone(value)
+            else:
+                self.assertAlmostEqual(value, np.mean(self.prices[i - 4:i + 1]))
+
+    def test_peek_matches_update_without_mutating(self):
+        for indicator in (SMA(10), EMA(10), RSI(14), RSI(14, wilder=False), MACD(), BollingerBands()):
+            for price in self.prices:
+                peeked = indicator.peek(price)
+                before = indicator.value
+                self.assertEqual(indicator.value, before)
+                updated = indicator.update(price)
+                if updated is None:
+                    self.assertIsNone(peeked)
+                else:
+                    self.assertAlmostEqual(peeked, updated)
+
+    def test_series_matches_bar_by_bar_updates(self):
+        for make in (lambda: SMA(10), lambda: EMA(10), lambda: RSI(14), lambda: RSI(14, wilder=False)):
+            streamed = make()
+            expected = [streamed.update(price) for price in self.prices]
+            series = make().series(np.array(self.prices))
+            self.assertEqual([None if np.isnan(v) else v for v in series], expected)
+
+        macd, signal, _ = MACD().series_all(np.array(self.prices))
+        streamed = MACD()
+        for price in self.prices:
+            streamed.update(price)
+        self.assertEqual((macd[-1], signal[-1]), (streamed.value, streamed.signal))
+
+    def test_simple_rsi_matches_legacy_calculation(self):
+        rsi = RSI(14, wilder=False)
+        for i, price in enumerate(self.prices):
+            value = rsi.update(price)
+            expected = legacy_rsi(self.prices[:i + 1], 14)
+            if expected is None:
+                self.assertIsNone(value)
+            else:
+                self.assertAlmostEqual(value, expected)
+
+    def test_bollinger_bands_use_population_std(self):
+        bands = BollingerBands(20, 2.0)
+        for price in self.prices:
+            bands.update(price)
+        window = np.array(self.prices[-20:])
+        self.assertAlmostEqual(bands.value, window.mean())
+        self.assertAlmostEqual(bands.upper, window.mean() + 2 * window.std())
+        self.assertAlmostEqual(bands.lower, window.mean() - 2 * window.std())
+
+    def test_reset_forgets_state(self):
+        sma = SMA(3)
+        for price in (1.0, 2.0, 3.0):
+            sma.update(price)
+        sma.reset()
+        self.assertFalse(sma.ready)
+        self.assertIsNone(sma.peek(1.0))
+
+
+class BarSyncTestCase(unittest.TestCase):
+    def test_commits_each_closed_bar_once(self):
+        sync = BarSync()
+        closes, reset = sync.new_closes(make_candles([1, 2, 3, 4]))
+        self.assertTrue(reset)
+        self.assertEqual(closes.tolist(), [1, 2, 3])
+
+        # Same window polled again: the forming bar is never committed
+        closes, reset = sync.new_closes(make_candles([1, 2, 3, 4.5]))
+        self.assertFalse(reset)
+        self.assertEqual(closes.tolist(), [])
+
+        # Window slides by two bars
+        closes, reset = sync.new_closes(make_candles([3, 4, 5, 6], start=2))
+        self.assertFalse(reset)
+        self.assertEqual(closes.tolist(), [4, 5])
+
+    def test_gap_requests_reset(self):
+        sync = BarSync()
+        sync.new_closes(make_candles([1, 2, 3]))
+        closes, reset = sync.new_closes(make_candles([7, 8, 9], start=50))
+        self.assertTrue(reset)
+        self.assertEqual(closes.tolist(), [7, 8])
+
+
+if __name__ == "__main__":
+    unittest.main()
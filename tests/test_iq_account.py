@@ -0,0 +1,65 @@
+import unittest
+
+from src.servicios.iq_account import AccountSession
+
+
+class FakeClient:
+    def __init__(self, balance=100.0):
+        self.balance = balance
+        self.mode_changes = []
+        self.balance_reads = 0
+
+    def change_balance(self, mode):
+        self.mode_changes.append(mode)
+
+    def get_balance(self):
+        self.balance_reads += 1
+        return self.balance
+
+
+class AccountSessionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeClient()
+        self.account = AccountSession(self.client, reconcile_seconds=300)
+
+    def test_mode_is_switched_only_when_it_changes(self):
+        self.account.ensure_mode("PRACTICE")
+        with self.account.armed("practice"):
+            pass
+        with self.account.armed("REAL"):
+            pass
+        self.assertEqual(self.client.mode_changes, ["PRACTICE", "REAL"])
+
+    def test_balance_is_tracked_locally_between_reconciles(self):
+        self.account.ensure_mode("PRACTICE")
+        self.assertEqual(self.account.get_balance(), 100.0)
+
+        self.account.record_open(10.0)
+        self.account.record_close(10.0, 8.5, "PRACTICE")  # Win: stake back plus profit
+        self.account.record_open(10.0)
+        self.account.record_close(10.0, -10.0, "PRACTICE")  # Loss: stake is gone
+
+        self.assertAlmostEqual(self.account.get_balance(), 98.5)
+        self.assertEqual(self.client.balance_reads, 1)
+
+    def test_mode_switch_and_invalidate_force_a_read(self):
+        self.account.ensure_mode("PRACTICE")
+        self.account.get_balance()
+        self.account.ensure_mode("REAL")
+        self.client.balance = 50.0
+        self.assertEqual(self.account.get_balance(), 50.0)
+
+        self.client.balance = 75.0
+        self.account.invalidate_balance()
+        self.assertEqual(self.account.get_balance(), 75.0)
+        self.assertEqual(self.client.balance_reads, 3)
+
+    def test_results_from_other_mode_are_ignored(self):
+        self.account.ensure_mode("REAL")
+        self.account.get_balance()
+        self.account.record_close(10.0, 8.5, "PRACTICE")
+        self.assertEqual(self.account.get_balance(), 100.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
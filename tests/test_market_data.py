@@ -0,0 +1,75 @@
+import threading
+import time
+import unittest
+
+from src.servicios.candles import OHLCV
+from src.servicios.market_data import MarketDataHub
+
+MINUTE = 60000
+
+
+def bars(count):
+    first = int(time.time() * 1000) // MINUTE - count
+    return OHLCV([(first + i) * MINUTE for i in range(count)], *([[1.0] * count] * 5))
+
+
+class CandleFeedSubscribersTestCase(unittest.TestCase):
+    def setUp(self):
+        self.hub = MarketDataHub()
+        self.key = ("binance", "BTCUSDT", "1m")
+
+    def test_subscribers_change_while_a_fetch_is_in_flight(self):
+        fetching, release = threading.Event(), threading.Event()
+
+        def slow_fetcher(since):
+            fetching.set()
+            release.wait(2)
+            return bars(3)
+
+        feed = self.hub.subscribe(self.key, 1, slow_fetcher)
+        refresh = threading.Thread(target=feed.refresh)
+        refresh.start()
+        self.assertTrue(fetching.wait(2))
+
+        # Neither call waits for the fetch to finish
+        started = time.monotonic()
+        for subscriber_id in range(2, 50):
+            self.hub.subscribe(self.key, subscriber_id, slow_fetcher, listener=lambda key, candles: None)
+        for subscriber_id in range(2, 50):
+            self.hub.unsubscribe(self.key, subscriber_id)
+        self.assertLess(time.monotonic() - started, 1)
+
+        release.set()
+        refresh.join(2)
+        self.assertEqual(len(feed.snapshot()), 3)
+        self.assertEqual(feed.subscriber_count, 1)
+
+    def test_listener_may_unsubscribe_during_notify(self):
+        received = []
+
+        def listener(key, candles):
+            received.append(len(candles))
+            self.hub.unsubscribe(self.key, 2)
+
+        feed = self.hub.subscribe(self.key, 1, lambda since: bars(2), listener=listener)
+        self.hub.subscribe(self.key, 2, lambda since: bars(2), listener=listener)
+        self.assertTrue(feed.refresh())
+        self.assertEqual(received, [2, 2])
+        self.assertEqual(feed.subscriber_count, 1)
+
+    def test_snapshot_waits_for_a_write_in_progress(self):
+        feed = self.hub.subscribe(self.key, 1, lambda since: bars(3))
+        feed.refresh()
+        copies = []
+        with feed._lock:
+            # A push or refresh is halfway through writing the buffer
+            reader = threading.Thread(target=lambda: copies.append(feed.snapshot()))
+            reader.start()
+            reader.join(0.1)
+            self.assertEqual(copies, [])
+        reader.join(2)
+        self.assertEqual(len(copies[0]), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import threading
+import time
+import unittest
+
+from src.servicios.market_status import MarketStatusCache, index_open_times
+
+
+class FakeClient:
+    def __init__(self, payload):
+        self.payload = payload
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def get_all_open_time(self):
+        self.calls += 1
+        self.release.wait(2)
+        return self.payload
+
+
+SDK_PAYLOAD = {
+    "binary": {"EURUSD": {"open": True}, "GBPUSD": {"open": False}},
+    "turbo": {"EURUSD": {"open": True}, "GBPUSD": {"open": False}},
+    "digital": {"EURUSD": {"open": False}},
+}
+
+
+class IndexOpenTimesTestCase(unittest.TestCase):
+    def test_indexes_option_type_layout_by_instrument(self):
+        index = index_open_times(SDK_PAYLOAD)
+        self.assertEqual(index["EURUSD"], {"binary": True, "turbo": True, "digital": False})
+        self.assertEqual(index["GBPUSD"], {"binary": False, "turbo": False, "digital": False})
+
+    def test_accepts_instrument_layout(self):
+        index = index_open_times({"EURUSD": {"binary": {"enabled": False}, "turbo": {"enabled": True}}})
+        self.assertEqual(index["EURUSD"], {"binary": False, "turbo": True, "digital": False})
+
+    def test_ignores_invalid_payload(self):
+        self.assertEqual(index_open_times(None), {})
+
+
+class MarketStatusCacheTestCase(unittest.TestCase):
+    def test_reads_within_ttl_hit_the_sdk_once(self):
+        client = FakeClient(SDK_PAYLOAD)
+        cache = MarketStatusCache(client, ttl_seconds=60)
+        self.assertTrue(cache.is_open("EURUSD"))
+        self.assertFalse(cache.is_open("GBPUSD"))
+        self.assertIsNone(cache.get("USDJPY"))
+        self.assertEqual(client.calls, 1)
+
+    def test_stale_snapshot_is_served_while_refreshing(self):
+        client = FakeClient(SDK_PAYLOAD)
+        cache = MarketStatusCache(client, ttl_seconds=0)
+        cache.get_all()
+        client.payload = {"turbo": {"EURUSD": {"open": False}}}
+        client.release.clear()
+        # The stale snapshot is returned immediately and refreshed in the background
+        self.assertTrue(cache.is_open("EURUSD"))
+        client.release.set()
+        deadline = time.monotonic() + 2
+        while cache.is_open("EURUSD") and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(cache.is_open("EURUSD"))
+
+    def test_failed_refresh_keeps_previous_snapshot(self):
+        client = FakeClient(SDK_PAYLOAD)
+        cache = MarketStatusCache(client, ttl_seconds=60)
+        cache.get_all()
+        client.payload = {}
+        self.assertFalse(cache.refresh(force=True))
+        self.assertTrue(cache.is_open("EURUSD"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+
+from src.servicios.backtest import backtest_binary
+from src.servicios.candles import OHLCV
+from src.servicios.optimizer import grid, optimize, random_configs
+from src.servicios.trading_strategies import get_strategy
+
+
+def make_candles(closes):
+    closes = np.asarray(closes, dtype=float)
+    timestamps = np.arange(len(closes)) * 60000
+    return OHLCV(timestamps, closes, closes, closes, closes, np.ones(len(closes)))
+
+
+class OptimizerTestCase(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self.candles = make_candles(100 + np.cumsum(rng.normal(scale=0.5, size=400)))
+        self.space = {"fast_period": [3, 5], "slow_period": [10, 20]}
+
+    def test_grid_and_random_configs(self):
+        self.assertEqual(len(grid(self.space)), 4)
+        self.assertIn({"fast_period": 5, "slow_period": 10}, grid(self.space))
+        sampled = random_configs(self.space, 2, seed=1)
+        self.assertEqual(len(sampled), 2)
+        self.assertEqual(sampled, random_configs(self.space, 2, seed=1))
+
+    def test_rows_match_direct_backtests_and_are_ranked(self):
+        rows = optimize("sma_cross", self.candles, self.space, max_workers=2, payout=0.85)
+
+        self.assertEqual(len(rows), 4)
+        pnls = [row["total_pnl"] for row in rows]
+        self.assertEqual(pnls, sorted(pnls, reverse=True))
+        for row in rows:
+            expected = backtest_binary(get_strategy("sma_cross", row["config"]), self.candles, payout=0.85)
+            self.assertEqual(row["total_pnl"], expected.total_pnl)
+
+    def test_rank_by_drawdown_is_ascending(self):
+        rows = optimize("rsi", self.candles, {"rsi_period": [3, 14]}, venue="binance",
+                        rank_by="max_drawdown", max_workers=2)
+        drawdowns = [row["max_drawdown"] for row in rows]
+        self.assertEqual(drawdowns, sorted(drawdowns))
+        # The swept key reaches the strategy: the two configs trade differently
+        self.assertNotEqual({k: v for k, v in rows[0].items() if k != "config"},
+                            {k: v for k, v in rows[1].items() if k != "config"})
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            optimize("nope", self.candles, self.space)
+
+    def test_keys_the_strategy_does_not_read_are_rejected(self):
+        with self.assertRaisesRegex(ValueError, "period"):
+            optimize("rsi", self.candles, {"period": [7, 14]}, venue="binance")
+
+
+if __name__ == "__main__":
+    unittest.main()
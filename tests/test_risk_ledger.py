@@ -0,0 +1,48 @@
+import unittest
+from datetime import datetime, timedelta
+
+from src.servicios.risk_ledger import DailyRiskLedger, utc_day_start
+
+
+class DailyRiskLedgerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ledger = DailyRiskLedger(bot_id=1)
+
+    def test_needs_reconcile_until_seeded(self):
+        self.assertTrue(self.ledger.needs_reconcile())
+        self.ledger.seed(3, -4.5)
+        self.assertFalse(self.ledger.needs_reconcile())
+        self.assertEqual(self.ledger.trade_count, 3)
+        self.assertEqual(self.ledger.realized_pnl, -4.5)
+
+    def test_reconcile_interval_elapsed(self):
+        ledger = DailyRiskLedger(bot_id=1, reconcile_seconds=0)
+        ledger.seed(0, None)
+        self.assertTrue(ledger.needs_reconcile())
+
+    def test_record_trade_and_result(self):
+        self.ledger.seed(0, 0.0)
+        self.ledger.record_trade()
+        self.ledger.record_result(8.5)
+        self.ledger.record_result(-10.0)
+        self.assertEqual(self.ledger.trade_count, 1)
+        self.assertAlmostEqual(self.ledger.realized_pnl, -1.5)
+
+    def test_results_of_trades_opened_yesterday_are_ignored(self):
+        self.ledger.seed(0, 0.0)
+        yesterday = utc_day_start() - timedelta(hours=1)
+        self.ledger.record_result(5.0, opened_at=yesterday)
+        self.assertEqual(self.ledger.realized_pnl, 0.0)
+
+    def test_roll_over_resets_totals_on_new_day(self):
+        self.ledger.seed(7, 12.0)
+        self.assertFalse(self.ledger.roll_over())
+        tomorrow = datetime.utcnow() + timedelta(days=1)
+        self.assertTrue(self.ledger.roll_over(tomorrow))
+        self.assertEqual(self.ledger.trade_count, 0)
+        self.assertEqual(self.ledger.realized_pnl, 0.0)
+        self.assertEqual(self.ledger.day_start, utc_day_start(tomorrow))
+
+
+if __name__ == "__main__":
+    unittest.main()
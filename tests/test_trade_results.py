@@ -0,0 +1,101 @@
+import time
+import unittest
+from unittest import mock
+
+from src.servicios.trade_results import TradeResultResolver, parse_closed_option
+
+
+class FakeApi:
+    def __init__(self):
+        self.socket_option_closed = {}
+
+
+class FakeClient:
+    def __init__(self):
+        self.api = FakeApi()
+        self.async_orders = {}
+        self.closed_options = []
+        self.polls = 0
+
+    def get_async_order(self, order_id):
+        return self.async_orders.get(order_id, {})
+
+    def get_optioninfo_v2(self, limit):
+        self.polls += 1
+        # Most recent first, like the SDK
+        return {"msg": {"closed_options": self.closed_options[:limit]}}
+
+
+class ParseClosedOptionTestCase(unittest.TestCase):
+    def test_socket_message(self):
+        message = {"name": "option-closed", "msg": {"win": "win", "sum": 10, "win_amount": 18.5}}
+        self.assertEqual(parse_closed_option(message), {"result": "won", "profit_loss": 8.5})
+
+    def test_closed_options_entry(self):
+        self.assertEqual(parse_closed_option({"id": [1], "win": "loose", "amount": 10}),
+                         {"result": "lost", "profit_loss": -10.0})
+        self.assertEqual(parse_closed_option({"win": "equal", "amount": 10})["profit_loss"], 0.0)
+
+    def test_open_option_has_no_result(self):
+        self.assertIsNone(parse_closed_option({"name": "option-opened", "msg": {}}))
+        self.assertIsNone(parse_closed_option(None))
+
+
+@mock.patch("src.servicios.trade_results.get_bot_scheduler")
+class TradeResultResolverTestCase(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeClient()
+        self.resolver = TradeResultResolver(self.client)
+        self.results = {}
+
+    def track(self, order_id, expires_in):
+        self.resolver.track(order_id, time.time() + expires_in,
+                            lambda result: self.results.__setitem__(order_id, result))
+
+    def test_one_job_for_all_pending_orders(self, get_scheduler):
+        self.track("1", 60)
+        self.track("2", 60)
+        self.assertEqual(get_scheduler.return_value.add.call_count, 1)
+
+    def test_pushed_results_resolve_without_polling(self, get_scheduler):
+        self.track("1", 60)
+        self.track("2", 60)
+        self.client.async_orders[1] = {"option-closed": {"msg": {"win": "win", "sum": 5, "win_amount": 9}}}
+        self.client.api.socket_option_closed[2] = {"msg": {"win": "loose", "sum": 5}}
+
+        self.assertIsNone(self.resolver.tick())
+        self.assertEqual(self.results, {"1": {"result": "won", "profit_loss": 4.0},
+                                        "2": {"result": "lost", "profit_loss": -5.0}})
+        self.assertEqual(self.client.polls, 0)
+
+    def test_expired_orders_share_one_poll(self, get_scheduler):
+        self.track("1", -10)
+        self.track("2", -10)
+        self.track("3", 60)
+        self.client.closed_options = [{"id": [1], "win": "win", "amount": 5, "win_amount": 9},
+                                      {"id": [2], "win": "equal", "amount": 5}]
+
+        self.assertIsNotNone(self.resolver.tick())
+        self.assertEqual(self.client.polls, 1)
+        self.assertEqual(set(self.results), {"1", "2"})
+        self.assertEqual(self.resolver.pending_count, 1)
+
+    def test_poll_covers_every_due_order(self, get_scheduler):
+        for order_id in range(1, 61):
+            self.track(str(order_id), -10)
+        self.client.closed_options = [{"id": [order_id], "win": "equal", "amount": 5}
+                                      for order_id in range(60, 0, -1)]
+
+        self.assertIsNone(self.resolver.tick())
+        self.assertEqual(self.client.polls, 1)
+        self.assertEqual(len(self.results), 60)
+        self.assertNotIn(None, self.results.values())
+
+    def test_gives_up_after_timeout(self, get_scheduler):
+        self.track("1", -400)
+        self.assertIsNone(self.resolver.tick())
+        self.assertEqual(self.results, {"1": None})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from src.servicios.bot_scheduler import BotScheduler
+from src.servicios.candles import OHLCV
+from src.servicios.trading_bot_service import TradingBotService
+from src.servicios.trading_strategies import get_strategy
+
+
+class OpenPositionsTestCase(unittest.TestCase):
+    def setUp(self):
+        with patch.object(TradingBotService, "_load_config"):
+            self.service = TradingBotService(bot_id=1, iq_client=MagicMock())
+        self.service.bot_config = MagicMock(account_type="PRACTICE")
+        self.service._last_trade_amount = 1.0
+        self.service.ledger.seed(0, 0.0)
+
+        patches = [
+            patch("src.servicios.trading_bot_service.get_session"),
+            patch("src.servicios.trading_bot_service.get_account_session"),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def open_trade(self, order_id, amount):
+        trade = {
+            "seq": self.service._trade_seq,
+            "signal_id": int(order_id),
+            "order_id": order_id,
+            "amount": amount,
+            "opened_at": datetime.utcnow(),
+        }
+        self.service._trade_seq += 1
+        self.service._open_trades[order_id] = trade
+        return trade
+
+    def test_results_are_applied_in_opening_order(self):
+        first = self.open_trade("1", 1.0)
+        second = self.open_trade("2", 2.2)
+
+        # The second trade settles first: martingale state waits for the first one
+        self.service._on_trade_result(second, {"result": "won", "profit_loss": 1.8})
+        self.assertIsNone(self.service._last_trade_result)
+        self.assertEqual(len(self.service._open_trades), 1)
+
+        self.service._on_trade_result(first, {"result": "lost", "profit_loss": -1.0})
+        self.assertEqual(self.service._last_trade_result, "won")
+        self.assertEqual(self.service._last_trade_amount, 2.2)
+        self.assertAlmostEqual(self.service.ledger.realized_pnl, 0.8)
+        self.assertEqual(self.service._open_trades, {})
+
+    def test_unknown_result_keeps_previous_state(self):
+        first = self.open_trade("1", 1.0)
+        second = self.open_trade("2", 2.2)
+        self.service._on_trade_result(first, {"result": "lost", "profit_loss": -1.0})
+        self.service._on_trade_result(second, None)
+        self.assertEqual(self.service._last_trade_result, "lost")
+        self.assertEqual(self.service._last_trade_amount, 1.0)
+
+    @patch("src.servicios.trading_bot_service.get_account_session")
+    @patch("src.servicios.trading_bot_service.get_bot_scheduler")
+    @patch("src.servicios.trading_bot_service.get_market_data_hub")
+    def test_feed_is_released_when_the_job_cannot_be_scheduled(self, get_hub, get_scheduler, _):
+        self.service.strategy = MagicMock()
+        self.service.feed_key = ("iqoption", "EURUSD", 60)
+        get_scheduler.return_value.add.return_value = False
+        with patch.object(TradingBotService, "_warm_start"):
+            self.assertFalse(self.service.start())
+        get_hub.return_value.unsubscribe.assert_called_once_with(self.service.feed_key, 1)
+        self.assertFalse(self.service.is_running)
+
+
+class LoadConfigTestCase(unittest.TestCase):
+    def load(self, config_json, strategy="sma_cross"):
+        bot = MagicMock(active_id="EURUSD", strategy=strategy, duration=1, config_json=config_json)
+        with patch("src.servicios.trading_bot_service.get_session") as get_session:
+            get_session.return_value.query.return_value.filter_by.return_value.first.return_value = bot
+            return TradingBotService(bot_id=1, iq_client=MagicMock())
+
+    def test_max_open_positions(self):
+        for config_json, expected in (('{"max_open_positions": 3}', 3),
+                                      ('{"max_open_positions": "2"}', 2),
+                                      ('{"max_open_positions": "many"}', 1),
+                                      ('{"max_open_positions": null}', 1),
+                                      ('{"max_open_positions": 0}', 1),
+                                      ('{"max_open_positions": -4}', 1),
+                                      (None, 1)):
+            with self.subTest(config_json=config_json):
+                self.assertEqual(self.load(config_json).max_open_positions, expected)
+
+    def test_unknown_strategy_is_reported_before_the_position_limit(self):
+        with self.assertRaisesRegex(ValueError, "Unknown strategy"):
+            self.load('{"max_open_positions": "many"}', strategy="nope")
+
+
+class BarCloseWakeTestCase(unittest.TestCase):
+    """Drive ``_tick`` on the schedule it returns, as the bot scheduler would."""
+
+    TIMEFRAME = 60
+    START = 1_700_000_000 // 60 * 60  # A bar open time (epoch seconds)
+
+    def setUp(self):
+        with patch.object(TradingBotService, "_load_config"):
+            self.service = TradingBotService(bot_id=1, iq_client=MagicMock())
+        self.service.bot_config = MagicMock(duration=1, active_id="EURUSD", strategy="sma_cross",
+                                            initial_amount=1.0, max_amount=10.0)
+        self.service.strategy = get_strategy("sma_cross", {"fast_period": 3, "slow_period": 10})
+        self.signals = []
+        analyze = self.service.strategy.analyze
+
+        def record(candles, current_price):
+            signal = analyze(candles, current_price)
+            if signal:
+                self.signals.append((self.now, signal.signal_type))
+            return signal
+
+        self.service.strategy.analyze = record
+        # Falling prices with a jump on bar 25
+        self.closes = np.array([100.0 - i for i in range(40)])
+        self.closes[25:] += 30.0
+        self.now = float(self.START)
+
+        scheduler = BotScheduler()
+        patches = [
+            patch("src.servicios.trading_bot_service.get_session"),
+            patch("src.servicios.trading_bot_service.get_bot_scheduler", return_value=scheduler),
+            patch("src.servicios.bot_scheduler.time.time", side_effect=lambda: self.now),
+            patch("src.servicios.candles.time.time", side_effect=lambda: self.now),
+            patch.object(self.service, "_check_limits", return_value=True),
+            patch.object(self.service, "_get_candles", side_effect=self.window),
+            patch.object(self.service, "_execute_trade", return_value=None),
+            patch.object(self.service, "_is_market_open", return_value=True),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def window(self, count=None):
+        """Bars opened by now; the forming bar has not moved from its open yet."""
+        opened = int((self.now - self.START) // self.TIMEFRAME) + 1
+        closes = self.closes[:opened].copy()
+        if opened > 1:
+            closes[-1] = closes[-2]
+        timestamps = (self.START + np.arange(opened) * self.TIMEFRAME) * 1000
+        return OHLCV(timestamps, closes, closes, closes, closes, np.zeros(opened))
+
+    def test_crossover_of_the_closed_bar_is_seen_at_the_next_wake(self):
+        self.now += 5
+        while self.now < self.START + 30 * self.TIMEFRAME:
+            self.now += self.service._tick()
+
+        self.assertEqual(len(self.signals), 1)
+        woke_at, signal_type = self.signals[0]
+        self.assertEqual(signal_type, "call")
+        # Two seconds after bar 25 closed
+        self.assertEqual(woke_at, self.START + 26 * self.TIMEFRAME + 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from unittest.mock import MagicMock
+
+from src.servicios.models import User
+from src.servicios.user_identity import UserIdentityCache, get_identity_cache
+
+
+def make_session(user):
+    session = MagicMock()
+    session.get.return_value = user
+    session.query.return_value.filter_by.return_value.first.return_value = user
+    return session
+
+
+class UserIdentityCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache = UserIdentityCache(max_size=2, ttl=60)
+
+    def test_resolves_once_then_hits_the_cache(self):
+        session = make_session(User(id=7, email="a@x.com", is_active=True))
+        self.assertEqual(self.cache.resolve(session, "a@x.com"), 7)
+        self.assertEqual(self.cache.resolve(session, "a@x.com"), 7)
+        session.query.assert_called_once()
+
+    def test_token_claim_uses_primary_key_lookup(self):
+        session = make_session(User(id=7, email="a@x.com", is_active=True))
+        self.assertEqual(self.cache.resolve(session, "a@x.com", claimed_id=7), 7)
+        session.get.assert_called_once_with(User, 7)
+        session.query.assert_not_called()
+
+    def test_claim_for_another_user_is_not_trusted(self):
+        session = make_session(User(id=8, email="b@x.com", is_active=True))
+        session.query.return_value.filter_by.return_value.first.return_value = None
+        self.assertIsNone(self.cache.resolve(session, "a@x.com", claimed_id=8))
+
+    def test_inactive_and_unknown_users_are_refused(self):
+        self.assertIsNone(self.cache.resolve(make_session(None), "nobody@x.com"))
+        session = make_session(User(id=7, email="a@x.com", is_active=False))
+        self.assertIsNone(self.cache.resolve(session, "a@x.com"))
+        self.assertIsNone(self.cache.resolve(session, "a@x.com"))
+        session.query.assert_called_once()
+
+    def test_lru_eviction_and_ttl(self):
+        self.cache.put("a", 1, True)
+        self.cache.put("b", 2, True)
+        self.cache.get("a")
+        self.cache.put("c", 3, True)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a"), (1, True))
+
+        self.cache.ttl = -1
+        self.cache.put("d", 4, True)
+        self.assertIsNone(self.cache.get("d"))
+
+    def test_orm_deactivation_revokes_cached_identity(self):
+        cache = get_identity_cache()
+        self.addCleanup(cache.invalidate, "deactivated@x.com")
+        cache.put("deactivated@x.com", 9, True)
+        user = User(id=9, email="deactivated@x.com", is_active=True)
+        user.is_active = False
+        self.assertEqual(cache.get("deactivated@x.com"), (9, False))
+        user.is_active = True
+        self.assertIsNone(cache.get("deactivated@x.com"))
+
+
+if __name__ == "__main__":
+    unittest.main()